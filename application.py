@@ -1,6 +1,7 @@
 import sys
 from flask import Flask, request, render_template, redirect, url_for, flash
 from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.components.Data_transformation import nlp_ready, warm_up_spacy_model
 from src.exception import customException
 from src.logger import logging
 import os
@@ -11,11 +12,22 @@ app = application
 # This is needed for flashing messages (e.g., error messages)
 app.secret_key = "ats_project_secret_key" 
 
+# Load the spaCy model in the background so the worker boots immediately;
+# /ready reports when the first prediction will not have to wait for it.
+warm_up_spacy_model()
+
 # Route for the main welcome page (index.html)
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# Readiness probe for the load balancer / process manager
+@app.route('/ready')
+def ready():
+    if nlp_ready.is_set():
+        return {"status": "ready"}, 200
+    return {"status": "loading"}, 503
+
 # Route for the prediction form (home.html)
 # This route handles both GET (showing the form) and POST (submitting the form)
 @app.route('/home', methods=['GET', 'POST'])
@@ -51,19 +63,33 @@ def home():
             # 4. Call your Prediction Pipeline
             logging.info("Initializing Prediction Pipeline...")
             pipeline = PredictionPipeline()
-            score = pipeline.predict_score(
+            result = pipeline.predict_score_with_skills(
                 resume_file_bytes=resume_bytes,
                 resume_filename=resume_filename,
                 jd_file_bytes=jd_bytes,
                 jd_filename=jd_filename
             )
+            score = result['score']
             logging.info(f"Prediction successful. Score: {score}")
 
-            # 5. Format the result text
+            # 5. Format the result text, with the rank among the applicants of a known job
             result_text = f"Your ATS Match Score is: {score:.2f}%"
+            percentile_text = None
+            job_id = request.form.get('job_id', '').strip()
+            if job_id:
+                # Anonymous submissions are ranked but never recorded
+                rank = pipeline.percentile_rank(job_id, score)
+                if rank is not None:
+                    percentile_text = f"You rank better than {rank:.0f}% of applicants for job {job_id}."
 
             # 6. Render the result page
-            return render_template('result.html', prediction_text=result_text)
+            return render_template(
+                'result.html',
+                prediction_text=result_text,
+                percentile_text=percentile_text,
+                matched_skills=result['matched_skills'],
+                missing_skills=result['missing_skills']
+            )
 
         except Exception as e:
             logging.error("Error occurred in /home POST route")
@@ -74,7 +100,7 @@ def home():
 
 if __name__ == "__main__":
     # To run:
-    # 1. Make sure your 'artifacts/preprocessor.pkl' exists (by running training_pipeline.py once)
+    # 1. Make sure an artifact version is published (by running training_pipeline.py once)
     # 2. Run this file: python app.py
     # 3. Open http://127.0.0.1:5000 in your browser
     app.run(host="0.0.0.0", port=5006, debug=True)
\ No newline at end of file
@@ -0,0 +1,25 @@
+import random
+import pandas as pd
+from src.components.Data_ingestion import DataIngestionConfig
+
+
+def load_lines():
+    """
+    Returns every non-empty line of the processed corpus, used as
+    building blocks for the synthetic benchmark documents.
+    """
+    df = pd.read_csv(DataIngestionConfig().processed_data_path)
+    lines = []
+    for text in df['text'].astype(str):
+        lines.extend(line.strip() for line in text.splitlines() if line.strip())
+    return lines
+
+
+def synthetic_corpus(n_docs=10000, lines_per_doc=12, seed=42):
+    """
+    Builds a reproducible corpus of n_docs resume/JD-like documents by
+    sampling lines from the processed data.
+    """
+    rng = random.Random(seed)
+    lines = load_lines()
+    return ["\n".join(rng.choices(lines, k=lines_per_doc)) for _ in range(n_docs)]
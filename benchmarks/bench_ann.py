@@ -0,0 +1,55 @@
+"""
+Recall@k and query time of the LSH resume index against exact
+cosine_similarity, for a grid of tables / bits / probes. The first
+--jobs documents of the synthetic corpus are the queries, the rest are
+indexed as resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_ann --docs 20000 --jobs 200 --vectors lsa
+"""
+import argparse
+import itertools
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.ann_index import LSHIndex, recall_at_k
+from src.components.lsa import fit_lsa
+from src.components.vectorizers import tfidf_from_counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--vectors", choices=["lsa", "tfidf"], default="lsa")
+    parser.add_argument("--components", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--tables", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--bits", type=int, nargs="+", default=[8, 12, 16])
+    parser.add_argument("--probes", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    vectors = tfidf_from_counts(vectorizer, transformation.fit_vectorizer(vectorizer, lemmas))
+    if args.vectors == "lsa":
+        _, vectors = fit_lsa(vectors, args.components)
+    queries, items = vectors[:args.jobs], vectors[args.jobs:]
+    ids = [f"resume{i}" for i in range(items.shape[0])]
+
+    print(f"{args.vectors} vectors: {items.shape[0]} items x {items.shape[1]} dims, {queries.shape[0]} queries")
+    print(f"{'tables':>6} {'bits':>4} {'probes':>6} {'recall@' + str(args.k):>9} {'reranked':>9} "
+          f"{'ann ms':>8} {'exact ms':>9}")
+    for n_tables, n_bits in itertools.product(args.tables, args.bits):
+        index = LSHIndex(items.shape[1], n_tables=n_tables, n_bits=n_bits).add(items, ids)
+        for n_probes in args.probes:
+            report = recall_at_k(index, queries, items, k=args.k, n_probes=n_probes)
+            print(f"{n_tables:6d} {n_bits:4d} {n_probes:6d} {report['recall_at_k']:9.3f} "
+                  f"{report['candidate_fraction']:9.1%} {report['ann_ms_per_query']:8.2f} "
+                  f"{report['exact_ms_per_query']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
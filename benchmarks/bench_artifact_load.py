@@ -0,0 +1,73 @@
+"""
+Cold load time of the fitted vectorizer: the pickle versus the
+memory-mapped preprocessor directory. Each load runs in a fresh
+interpreter, so imports and unpickling are measured as a worker sees them.
+
+Run from the repository root:
+    python -m benchmarks.bench_artifact_load --docs 10000 --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import DataTransformation
+from src.components.fast_tokenizer import FastTokenizer
+from src.components.mapped_vectorizer import save_mapped_vectorizer
+from src.utils import save_object
+
+LOAD_SNIPPETS = {
+    "pickle": (
+        "from src.utils import load_object\n"
+        "vectorizer = load_object(file_path={path!r})\n"
+    ),
+    "mapped": (
+        "from src.components.mapped_vectorizer import load_mapped_vectorizer\n"
+        "vectorizer = load_mapped_vectorizer({path!r})\n"
+    ),
+}
+
+TIMED = (
+    "import time, resource\n"
+    "start = time.perf_counter()\n"
+    "{load}"
+    "print((time.perf_counter() - start) * 1000, "
+    "resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+
+def cold_load(kind, path):
+    code = TIMED.format(load=LOAD_SNIPPETS[kind].format(path=path))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    milliseconds, max_rss_kib = output.split()
+    return float(milliseconds), int(max_rss_kib)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = synthetic_corpus(args.docs)
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=FastTokenizer.from_corpus(texts[:500]))
+    vectorizer.set_params(ngram_range=(1, 2))
+    transformation.fit_vectorizer(vectorizer, texts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"pickle": os.path.join(tmp, "preprocessor.pkl"), "mapped": os.path.join(tmp, "preprocessor")}
+        save_object(file_path=paths["pickle"], obj=vectorizer)
+        save_mapped_vectorizer(paths["mapped"], vectorizer)
+
+        print(f"vocabulary: {len(vectorizer.vocabulary_)} terms")
+        for kind, path in paths.items():
+            runs = [cold_load(kind, path) for _ in range(args.repeat)]
+            best_ms = min(ms for ms, _ in runs)
+            max_rss = max(rss for _, rss in runs)
+            print(f"{kind:7s}: best cold load {best_ms:8.2f} ms, peak RSS {max_rss / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Peak memory and time of the blocked top-k engine against the dense
+resume x job cosine_similarity matrix, for a few memory budgets. Peak
+memory is measured with tracemalloc (numpy and scipy allocations are
+traced) on top of the already built TF-IDF matrices.
+
+Run from the repository root:
+    python -m benchmarks.bench_blocked_top_k --docs 20000 --jobs 2000 --budgets 16 64 256
+"""
+import argparse
+import time
+import tracemalloc
+from sklearn.metrics.pairwise import cosine_similarity
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.similarity import blocked_top_k
+from src.components.vectorizers import tfidf_from_counts
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    tfidf = tfidf_from_counts(vectorizer, transformation.fit_vectorizer(vectorizer, lemmas))
+    jobs, resumes = tfidf[:args.jobs], tfidf[args.jobs:]
+    print(f"{resumes.shape[0]} resumes x {jobs.shape[0]} jobs, k={args.k}")
+
+    full, seconds, peak_mb = measure(lambda: cosine_similarity(resumes, jobs))
+    print(f"dense matrix      : {seconds:7.2f} s, peak {peak_mb:9.1f} MiB")
+
+    for budget in args.budgets:
+        top_k, seconds, peak_mb = measure(
+            lambda: blocked_top_k(resumes, jobs, k_per_job=args.k, k_per_resume=args.k, memory_budget_mb=budget)
+        )
+        print(f"blocked {budget:5d} MiB : {seconds:7.2f} s, peak {peak_mb:9.1f} MiB, "
+              f"{top_k.n_blocks} blocks of {top_k.block_rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Throughput of BM25 scoring against TF-IDF cosine on the same cached term
+counts: all resume x job pairs (as ModelTrainer scores them, in blocks
+through blocked_top_k) and single job descriptions against every resume
+(as a query at serving time). The first --jobs documents of the
+synthetic corpus are the job descriptions, the rest are the resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_bm25 --docs 20000 --jobs 2000
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.retrieval import BM25Index, bm25_query_matrix
+from src.components.similarity import blocked_top_k
+from src.components.vectorizers import tfidf_from_counts, vocabulary_terms
+
+
+def timed(function, repeat=3):
+    # Best of a few runs
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    term_counts = transformation.fit_vectorizer(vectorizer, lemmas)
+    job_rows, resume_rows = np.arange(args.jobs), np.arange(args.jobs, args.docs)
+
+    # Set-up of either model: vectors for cosine, postings for BM25
+    tfidf, seconds = timed(lambda: tfidf_from_counts(vectorizer, term_counts))
+    print(f"TF-IDF vectors built in {seconds:.2f} s")
+    index, seconds = timed(lambda: BM25Index.build(
+        term_counts[resume_rows], resume_rows.astype(str), rows=resume_rows,
+        terms=vocabulary_terms(vectorizer.vocabulary_).tolist()
+    ))
+    print(f"BM25 index built in {seconds:.2f} s ({index.postings.nnz} postings)")
+    bm25_resumes, bm25_jobs = index.postings.tocsr(), bm25_query_matrix(index, term_counts[job_rows])
+
+    models = {
+        "cosine": (tfidf[resume_rows], tfidf[job_rows], True),
+        "bm25": (bm25_resumes, bm25_jobs, False),
+    }
+    n_pairs = len(resume_rows) * len(job_rows)
+    print(f"\n{len(resume_rows)} resumes x {len(job_rows)} jobs, top-{args.k} per job")
+    print(f"{'model':>7} {'all pairs s':>12} {'Mpairs/s':>9} {'ms/query':>9}")
+    for name, (resumes, jobs, cosine) in models.items():
+        _, all_pairs_seconds = timed(lambda: blocked_top_k(resumes, jobs, k_per_job=args.k, cosine=cosine))
+        queries = jobs[:args.queries]
+        _, query_seconds = timed(lambda: [
+            blocked_top_k(resumes, queries[i], k_per_job=args.k, cosine=cosine) for i in range(queries.shape[0])
+        ], repeat=1)
+        print(f"{name:>7} {all_pairs_seconds:12.2f} {n_pairs / all_pairs_seconds / 1e6:9.1f} "
+              f"{1000 * query_seconds / queries.shape[0]:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
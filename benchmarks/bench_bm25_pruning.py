@@ -0,0 +1,79 @@
+"""
+MaxScore pruning of BM25 top-k queries against exhaustive scoring of
+every posting of the query terms: postings visited and skipped, query
+time, and a check that both return the same documents and scores.
+
+The sampled-lines corpus has a small vocabulary in which every term is
+common, which leaves little to prune; --zipf instead draws term counts
+from a Zipf distribution over a large vocabulary, closer to real resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_bm25_pruning --docs 20000 --jobs 200 --k 10 100 1000
+    python -m benchmarks.bench_bm25_pruning --zipf --docs 100000 --jobs 100
+"""
+import argparse
+import time
+import numpy as np
+import scipy.sparse as sp
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.retrieval import BM25Index
+from src.components.vectorizers import vocabulary_terms
+
+
+def zipf_term_counts(n_docs, n_terms=50000, doc_length=300, seed=0):
+    rng = np.random.default_rng(seed)
+    probabilities = 1 / np.arange(1, n_terms + 1)
+    columns = rng.choice(n_terms, size=n_docs * doc_length, p=probabilities / probabilities.sum())
+    rows = np.repeat(np.arange(n_docs), doc_length)
+    counts = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(n_docs, n_terms))
+    counts.sum_duplicates()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--zipf", action="store_true")
+    args = parser.parse_args()
+
+    if args.zipf:
+        term_counts, terms = zipf_term_counts(args.docs), None
+    else:
+        lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+        transformation = DataTransformation()
+        vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+        term_counts = transformation.fit_vectorizer(vectorizer, lemmas)
+        terms = vocabulary_terms(vectorizer.vocabulary_).tolist()
+
+    resume_rows = np.arange(args.jobs, args.docs)
+    index = BM25Index.build(term_counts[resume_rows], resume_rows.astype(str), rows=resume_rows, terms=terms)
+    queries = [term_counts[i] for i in range(args.jobs)]
+    n_postings = sum(int(np.diff(index.postings.indptr)[index.query_terms(query)[0]].sum()) for query in queries)
+    print(f"{len(index)} resumes, {index.postings.nnz} postings; {len(queries)} job queries with "
+          f"{n_postings / len(queries):.0f} postings each on average")
+
+    print(f"{'k':>6} {'visited':>9} {'skipped':>8} {'exhaustive ms':>14} {'pruned ms':>10} {'mismatches':>11}")
+    for k in args.k:
+        start = time.perf_counter()
+        exhaustive = [index.top(query, k) for query in queries]
+        exhaustive_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        start = time.perf_counter()
+        pruned = [index.top_pruned(query, k) for query in queries]
+        pruned_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        visited = sum(n_visited for _, _, n_visited in pruned) / n_postings
+        mismatches = sum(
+            not (np.array_equal(positions, expected) and np.array_equal(scores, expected_scores))
+            for (positions, scores, _), (expected, expected_scores) in zip(pruned, exhaustive)
+        )
+        print(f"{k:6d} {visited:9.1%} {1 - visited:8.1%} {exhaustive_ms:14.2f} {pruned_ms:10.2f} {mismatches:11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Two-stage ranking cascade (BM25 candidates, exact TF-IDF cosine rerank)
+against brute-force cosine over every resume: recall@k and query time
+for a range of candidate cut-offs. The first --jobs documents of the
+synthetic corpus are the job descriptions, the rest are the resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_cascade --docs 20000 --jobs 200 --cutoffs 100 500 2000
+"""
+import argparse
+import time
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.retrieval import BM25Index, CascadeRanker, recall_report
+from src.components.vectorizers import vocabulary_terms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cutoffs", type=int, nargs="+", default=[100, 500, 2000])
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    term_counts = transformation.fit_vectorizer(vectorizer, lemmas)
+    resume_rows = list(range(args.jobs, args.docs))
+
+    start = time.perf_counter()
+    index = BM25Index.build(
+        term_counts[resume_rows], [f"resume{i}" for i in resume_rows], rows=resume_rows,
+        terms=vocabulary_terms(vectorizer.vocabulary_).tolist()
+    )
+    print(f"{len(index)} resumes, {len(index.columns)} unigram terms, {index.postings.nnz} postings, "
+          f"indexed in {time.perf_counter() - start:.2f} s")
+
+    ranker = CascadeRanker(index, vectorizer, term_counts)
+    report = recall_report(ranker, term_counts[:args.jobs], k=args.k, cutoffs=args.cutoffs)
+    print(f"{'cut-off':>8} {'recall@' + str(args.k):>10} {'candidates':>11} {'cascade ms':>11} {'brute ms':>9}")
+    for row in report:
+        print(f"{row['cutoff']:8d} {row['recall_at_k']:10.3f} {row['mean_candidates']:11.0f} "
+              f"{row['cascade_ms_per_query']:11.2f} {row['brute_force_ms_per_query']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
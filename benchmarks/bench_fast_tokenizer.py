@@ -0,0 +1,45 @@
+"""
+Agreement and throughput of the fast tokenizer against spacy_tokenizer.
+The lemma table is built on one half of the corpus and evaluated on the
+other half; score drift is measured on TF-IDF cosine scores between
+consecutive document pairs.
+
+Run from the repository root:
+    python -m benchmarks.bench_fast_tokenizer --docs 20000
+"""
+import argparse
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import identity_preprocessor, spacy_tokenize_corpus
+from src.components.fast_tokenizer import FastTokenizer, agreement_report
+
+
+def pair_scores(lemmas):
+    vectors = TfidfVectorizer(preprocessor=identity_preprocessor, ngram_range=(1, 3)).fit_transform(lemmas)
+    return np.asarray(vectors[0::2].multiply(vectors[1::2]).sum(axis=1)).ravel() * 100
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs)
+    half = len(corpus) // 2
+    build_texts, eval_texts = corpus[:half], corpus[half:]
+
+    tokenizer = FastTokenizer.from_corpus(build_texts)
+    reference = spacy_tokenize_corpus(eval_texts)
+    report = agreement_report(tokenizer, eval_texts, reference)
+    for key, value in report.items():
+        print(f"{key:<20}: {value:,.4f}" if isinstance(value, float) else f"{key:<20}: {value}")
+
+    fast_lemmas = [tokenizer(text) for text in eval_texts]
+    drift = np.abs(pair_scores(fast_lemmas) - pair_scores(reference))
+    print(f"{'score drift mean':<20}: {drift.mean():.4f} pp")
+    print(f"{'score drift max':<20}: {drift.max():.4f} pp")
+
+
+if __name__ == "__main__":
+    main()
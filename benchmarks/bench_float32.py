@@ -0,0 +1,54 @@
+"""
+Memory of the TF-IDF and similarity matrices in float64/int64 versus
+float32/int32, and the resulting drift of the percentage scores.
+
+Run from the repository root:
+    python -m benchmarks.bench_float32 --docs 10000 --jobs 500
+"""
+import argparse
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.vectorizers import tfidf_from_counts
+
+
+def sparse_nbytes(matrix):
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def score_run(lemmas, n_jobs, dtype):
+    transformation = DataTransformation()
+    transformation.transformation_config.dtype = dtype
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    term_counts = transformation.fit_vectorizer(vectorizer, lemmas)
+    vectors = tfidf_from_counts(vectorizer, term_counts)
+    if dtype == "float64":
+        # scipy's default int64 indices, i.e. what the original path could end up holding
+        vectors.indices = vectors.indices.astype(np.int64)
+        vectors.indptr = vectors.indptr.astype(np.int64)
+    scores = cosine_similarity(vectors[n_jobs:], vectors[:n_jobs]) * 100
+    return vectors, scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=500)
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    vectors64, scores64 = score_run(lemmas, args.jobs, "float64")
+    vectors32, scores32 = score_run(lemmas, args.jobs, "float32")
+
+    print(f"TF-IDF matrix     : {sparse_nbytes(vectors64) / 2**20:8.2f} MiB -> "
+          f"{sparse_nbytes(vectors32) / 2**20:8.2f} MiB  ({vectors32.data.dtype}, {vectors32.indices.dtype})")
+    print(f"similarity matrix : {scores64.nbytes / 2**20:8.2f} MiB -> {scores32.nbytes / 2**20:8.2f} MiB")
+    drift = np.abs(scores64 - scores32.astype(np.float64))
+    print(f"score drift       : max {drift.max():.6f} pp, mean {drift.mean():.6f} pp")
+
+
+if __name__ == "__main__":
+    main()
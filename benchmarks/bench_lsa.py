@@ -0,0 +1,62 @@
+"""
+LSA (TruncatedSVD) document vectors versus the sparse 1-3-gram TF-IDF
+vectors: memory, all-pairs scoring time, and how far the LSA rankings
+of resumes per job drift from the exact sparse ones.
+
+Run from the repository root:
+    python -m benchmarks.bench_lsa --docs 10000 --jobs 500 --components 100 200 300
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.lsa import dense_scores, fit_lsa, ranking_report
+from src.components.vectorizers import tfidf_from_counts
+
+
+def sparse_nbytes(matrix):
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--components", type=int, nargs="+", default=[100, 200, 300])
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    tfidf = tfidf_from_counts(vectorizer, transformation.fit_vectorizer(vectorizer, lemmas))
+    jobs, resumes = tfidf[:args.jobs], tfidf[args.jobs:]
+
+    start = time.perf_counter()
+    sparse_scores = cosine_similarity(resumes, jobs)
+    sparse_seconds = time.perf_counter() - start
+    print(f"sparse TF-IDF : {tfidf.shape[1]:8d} features, {sparse_nbytes(tfidf) / 2**20:8.2f} MiB, "
+          f"scoring {sparse_seconds * 1000:8.1f} ms")
+
+    for n_components in args.components:
+        start = time.perf_counter()
+        _, vectors = fit_lsa(tfidf, n_components)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lsa_scores = dense_scores(vectors[args.jobs:], vectors[:args.jobs])
+        dense_seconds = time.perf_counter() - start
+
+        report = ranking_report(sparse_scores, lsa_scores, k=args.top_k)
+        print(f"LSA {vectors.shape[1]:4d} dims : {vectors.nbytes / 2**20:8.2f} MiB, fit {fit_seconds:6.2f} s, "
+              f"scoring {dense_seconds * 1000:8.1f} ms, spearman {report['mean_spearman']:.3f}, "
+              f"top-{args.top_k} overlap {report[f'top_{args.top_k}_overlap']:.3f}, "
+              f"mean |diff| {report['mean_abs_score_diff'] * 100:.2f} pp")
+
+
+if __name__ == "__main__":
+    main()
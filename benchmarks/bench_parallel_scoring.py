@@ -0,0 +1,67 @@
+"""
+Scaling of the blocked top-k engine with the number of workers, for the
+thread and the process pool, against a single worker. Every run must
+return exactly the single-worker result.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel_scoring --docs 20000 --jobs 2000 --budget 64
+"""
+import argparse
+import os
+import time
+import numpy as np
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus
+)
+from src.components.similarity import blocked_top_k
+from src.components.vectorizers import tfidf_from_counts
+
+
+def same_result(a, b):
+    return all(
+        np.array_equal(getattr(a, name), getattr(b, name))
+        for name in ("job_scores", "job_resume_rows", "resume_scores", "resume_job_rows")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--budget", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+    workers = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    tfidf = tfidf_from_counts(vectorizer, transformation.fit_vectorizer(vectorizer, lemmas))
+    jobs, resumes = tfidf[:args.jobs], tfidf[args.jobs:]
+    print(f"{resumes.shape[0]} resumes x {jobs.shape[0]} jobs, k={args.k}, "
+          f"budget {args.budget} MiB, {os.cpu_count()} cores")
+
+    def run(n_workers, executor):
+        start = time.perf_counter()
+        result = blocked_top_k(
+            resumes, jobs, k_per_job=args.k, k_per_resume=args.k, memory_budget_mb=args.budget,
+            n_workers=n_workers, executor=executor
+        )
+        return result, time.perf_counter() - start
+
+    baseline, base_seconds = run(1, "thread")
+    print(f"{'executor':>8} {'workers':>7} {'seconds':>8} {'speedup':>8} {'identical':>9}")
+    print(f"{'-':>8} {1:7d} {base_seconds:8.2f} {1.0:8.2f} {'yes':>9}")
+    for executor in ("thread", "process"):
+        for n_workers in workers:
+            if n_workers == 1:
+                continue
+            result, seconds = run(n_workers, executor)
+            identical = "yes" if same_result(baseline, result) else "NO"
+            print(f"{executor:>8} {n_workers:7d} {seconds:8.2f} {base_seconds / seconds:8.2f} {identical:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Latency of percentile-rank queries on the saved per-job score
+distributions (memory-mapped, binary search) against counting over the
+job's column of the score grid, plus the cost of scores added at
+serving time before they are merged.
+
+Run from the repository root:
+    python -m benchmarks.bench_percentile_rank --resumes 20000 --jobs 1000 --queries 20000
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from src.components.score_distribution import ScoreDistributions
+
+
+def per_query_us(function, queries):
+    start = time.perf_counter()
+    for job_id, score in queries:
+        function(job_id, score)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--added", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    score_grid = np.round(rng.beta(2, 8, size=(args.resumes, args.jobs)) * 100, 2).astype(np.float32)
+    job_ids = [f"job{j}" for j in range(args.jobs)]
+    queries = [(f"job{j}", s) for j, s in zip(rng.integers(args.jobs, size=args.queries),
+                                                np.round(rng.uniform(0, 60, args.queries), 2))]
+
+    with tempfile.TemporaryDirectory() as distributions_dir:
+        start = time.perf_counter()
+        ScoreDistributions.from_score_grid(job_ids, score_grid).save(distributions_dir)
+        print(f"{args.resumes} resumes x {args.jobs} jobs: built and saved in {time.perf_counter() - start:.2f} s")
+
+        distributions = ScoreDistributions.load(distributions_dir)
+        columns = {job_id: np.ascontiguousarray(score_grid[:, j]) for j, job_id in enumerate(job_ids)}
+
+        def scan(job_id, score):
+            column = columns[job_id]
+            return 100 * (np.count_nonzero(column < score) + np.count_nonzero(column <= score)) / (2 * len(column))
+
+        print(f"binary search  : {per_query_us(distributions.percentile_rank, queries):8.1f} us/query")
+        print(f"column scan    : {per_query_us(scan, queries):8.1f} us/query")
+
+        for job_id, score in queries[:args.added]:
+            distributions.add(job_id, score)
+        print(f"+{args.added} added   : {per_query_us(distributions.percentile_rank, queries):8.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
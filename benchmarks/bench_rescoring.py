@@ -0,0 +1,42 @@
+"""
+Time to rebuild the corpus TF-IDF matrix after an IDF change: from text
+through the spaCy preprocessor versus rescaling the cached term counts.
+
+Run from the repository root:
+    python -m benchmarks.bench_rescoring --docs 10000
+"""
+import argparse
+import time
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus, spacy_tokenizer
+)
+from src.components.vectorizers import tfidf_from_counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs)
+    transformation = DataTransformation()
+    vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+    term_counts = transformation.fit_vectorizer(vectorizer, spacy_tokenize_corpus(corpus))
+    vectorizer.set_params(preprocessor=spacy_tokenizer)
+
+    start = time.perf_counter()
+    from_text = vectorizer.transform(corpus)
+    text_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from_counts = tfidf_from_counts(vectorizer, term_counts)
+    counts_seconds = time.perf_counter() - start
+
+    print(f"transform from text   : {text_seconds:8.3f}s")
+    print(f"rescale cached counts : {counts_seconds:8.3f}s  ({text_seconds / counts_seconds:,.0f}x faster)")
+    print(f"max abs difference    : {abs(from_text - from_counts).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
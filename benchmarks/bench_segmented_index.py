@@ -0,0 +1,87 @@
+"""
+Keeping a BM25 resume index current as resumes arrive and are withdrawn:
+the segmented index (add to the in-memory segment, flush, tombstone,
+merge) against rebuilding a monolithic BM25Index after every batch. Also
+times reopening the segments after a restart, compares query latency and
+checks that both indexes rank the same resumes.
+
+Run from the repository root:
+    python -m benchmarks.bench_segmented_index --docs 50000 --batch 1000 --withdraw 100
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_bm25_pruning import zipf_term_counts
+from src.components.retrieval import BM25Index
+from src.components.segmented_index import SegmentedIndex, SegmentedIndexConfig, query_terms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--withdraw", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    term_counts = zipf_term_counts(args.docs + args.queries)
+    queries, term_counts = term_counts[:args.queries], term_counts[args.queries:]
+    terms = [f"t{column}" for column in range(term_counts.shape[1])]
+    ids = np.array([f"resume{row}" for row in range(args.docs)])
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        config = SegmentedIndexConfig(index_dir=index_dir, flush_docs=args.batch)
+        segmented = SegmentedIndex.open(index_dir, config)
+        live = np.zeros(args.docs, dtype=bool)
+        segmented_seconds = rebuild_seconds = 0.0
+        # Each batch adds resumes and withdraws some of the live ones
+        for start in range(0, args.docs, args.batch):
+            rows = np.arange(start, min(start + args.batch, args.docs))
+            withdrawn = rng.choice(np.flatnonzero(live), size=min(args.withdraw, live.sum()), replace=False)
+            live[rows], live[withdrawn] = True, False
+
+            begin = time.perf_counter()
+            segmented.delete(ids[withdrawn])
+            segmented.add(ids[rows], term_counts[rows], terms)
+            segmented.commit()
+            segmented_seconds += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            live_rows = np.flatnonzero(live)
+            monolithic = BM25Index.build(term_counts[live_rows], ids[live_rows], terms=terms)
+            rebuild_seconds += time.perf_counter() - begin
+        segmented.wait_for_merges()
+
+        n_batches = -(-args.docs // args.batch)
+        print(f"{args.docs} resumes in {n_batches} batches of {args.batch}, {args.withdraw} withdrawn per batch: "
+              f"{live.sum()} live, {len(segmented.segments)} segments on disk")
+        print(f"{'index':>11} {'update ms/batch':>16}")
+        print(f"{'segmented':>11} {1000 * segmented_seconds / n_batches:16.1f}")
+        print(f"{'rebuilt':>11} {1000 * rebuild_seconds / n_batches:16.1f}")
+
+        begin = time.perf_counter()
+        reopened = SegmentedIndex.open(index_dir, config)
+        reopened.statistics()
+        print(f"Reopened {len(reopened)} resumes in {1000 * (time.perf_counter() - begin):.1f} ms")
+
+        query_dicts = [query_terms(queries[i], terms) for i in range(args.queries)]
+        begin = time.perf_counter()
+        results = [reopened.search(query, n=args.k) for query in query_dicts]
+        segmented_ms = 1000 * (time.perf_counter() - begin) / args.queries
+        begin = time.perf_counter()
+        expected = [monolithic.top(queries[i], args.k) for i in range(args.queries)]
+        monolithic_ms = 1000 * (time.perf_counter() - begin) / args.queries
+        mismatches = sum(
+            not np.array_equal(result_ids, monolithic.ids[positions])
+            for (result_ids, _), (positions, _) in zip(results, expected)
+        )
+        print(f"Query ms: segmented {segmented_ms:.2f}, monolithic {monolithic_ms:.2f}; "
+              f"{mismatches} of {args.queries} rankings differ")
+
+
+if __name__ == "__main__":
+    main()
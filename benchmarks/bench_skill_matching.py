@@ -0,0 +1,81 @@
+"""
+Per-document cost of skill matching: the Aho-Corasick automaton over a
+large taxonomy versus one compiled regex per skill phrase.
+
+The shipped taxonomy is padded with synthetic phrases (random 1-3 word
+combinations of corpus tokens) up to --phrases entries, so the automaton
+is measured at the size a real skills database would have.
+
+Run from the repository root:
+    python -m benchmarks.bench_skill_matching --docs 2000 --phrases 30000
+"""
+import argparse
+import json
+import random
+import re
+import time
+from benchmarks._corpus import synthetic_corpus
+from src.components.skills import SkillMatcher, SkillMatcherConfig, normalize_tokens
+
+
+def build_taxonomy(texts, n_phrases, seed=42):
+    with open(SkillMatcherConfig().taxonomy_file_path, "r", encoding="utf-8") as file_obj:
+        taxonomy = json.load(file_obj)["skills"]
+
+    rng = random.Random(seed)
+    tokens = sorted({token for text in texts[:500] for token in normalize_tokens(text)})
+    while sum(1 + len(aliases) for aliases in taxonomy.values()) < n_phrases:
+        phrase = " ".join(rng.choices(tokens, k=rng.randint(1, 3)))
+        taxonomy.setdefault(phrase, [])
+    return taxonomy
+
+
+def regex_matcher(taxonomy):
+    patterns = []
+    for skill, aliases in taxonomy.items():
+        for phrase in [skill, *aliases]:
+            tokens = normalize_tokens(phrase)
+            if tokens:
+                patterns.append((skill, re.compile(r"(?<![\w.+#])" + r"\W+".join(map(re.escape, tokens)) + r"(?![\w+#])")))
+
+    def match(text):
+        lowered = text.lower()
+        return {skill for skill, pattern in patterns if pattern.search(lowered)}
+
+    return match, len(patterns)
+
+
+def per_doc_microseconds(match, texts):
+    start = time.perf_counter()
+    for text in texts:
+        match(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--phrases", type=int, default=30000)
+    parser.add_argument("--regex-docs", type=int, default=50,
+                        help="documents used for the (slow) per-phrase regex baseline")
+    args = parser.parse_args()
+
+    texts = synthetic_corpus(args.docs)
+    taxonomy = build_taxonomy(texts, args.phrases)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(taxonomy)
+    compile_seconds = time.perf_counter() - start
+    print(f"taxonomy  : {len(taxonomy)} skills, {matcher.n_phrases} phrases, "
+          f"{matcher.n_states} states, compiled in {compile_seconds:.2f} s")
+
+    automaton_us = per_doc_microseconds(matcher.match, texts)
+    print(f"automaton : {automaton_us:10.1f} us/doc")
+
+    match, n_patterns = regex_matcher(taxonomy)
+    regex_us = per_doc_microseconds(match, texts[:args.regex_docs])
+    print(f"regex x{n_patterns:<6d}: {regex_us:10.1f} us/doc  ({regex_us / automaton_us:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Per-profile load time, per-document latency, nlp.pipe throughput and
+memory of the spaCy pipeline profiles, plus a check that every profile
+produces the same lemmas as the full pipeline.
+
+Run from the repository root:
+    python -m benchmarks.bench_spacy_profiles --docs 2000
+"""
+import argparse
+import time
+import tracemalloc
+import spacy
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    SPACY_MODEL_NAME, SPACY_PIPELINE_PROFILES, _doc_to_lemmas
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    corpus = [text.lower() for text in synthetic_corpus(args.docs)]
+    reference = None
+
+    for profile, excluded in SPACY_PIPELINE_PROFILES.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        model = spacy.load(SPACY_MODEL_NAME, exclude=excluded)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [_doc_to_lemmas(model(text)) for text in corpus]
+        per_doc_ms = (time.perf_counter() - start) * 1000 / len(corpus)
+
+        start = time.perf_counter()
+        batched = [_doc_to_lemmas(doc) for doc in model.pipe(corpus, batch_size=args.batch_size)]
+        pipe_rate = len(corpus) / (time.perf_counter() - start)
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if reference is None:
+            reference = single
+        agreement = sum(a == b for a, b in zip(single, reference)) / len(corpus)
+
+        print(f"{profile:<6} components={','.join(model.pipe_names)}")
+        print(f"       load {load_seconds:6.2f}s  per-doc {per_doc_ms:7.3f}ms  "
+              f"pipe {pipe_rate:9.1f} docs/s  peak {peak / 2**20:8.1f} MiB  "
+              f"lemmas identical to full: {agreement:.2%}  pipe==single: {batched == single}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Measures process start-up costs in fresh interpreters: importing
+Data_transformation, unpickling the preprocessor, and the first
+spacy_tokenizer call (which now pays the model load).
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+
+STEPS = {
+    "import Data_transformation": (
+        "import src.components.Data_transformation"
+    ),
+    "load preprocessor.pkl": (
+        "from src.utils import load_object; "
+        "load_object('artifacts/preprocessor.pkl')"
+    ),
+    "first spacy_tokenizer call": (
+        "from src.components.Data_transformation import spacy_tokenizer; "
+        "spacy_tokenizer('warm up')"
+    ),
+}
+
+TEMPLATE = (
+    "import time; start = time.perf_counter(); {step}; "
+    "print(f'{{(time.perf_counter() - start) * 1000:.1f}}')"
+)
+
+
+def main():
+    for name, step in STEPS.items():
+        result = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(step=step)],
+            capture_output=True, text=True
+        )
+        timing = result.stdout.strip() or result.stderr.strip().splitlines()[-1]
+        print(f"{name:<28}: {timing} ms")
+
+
+if __name__ == "__main__":
+    main()
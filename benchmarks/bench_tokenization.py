@@ -0,0 +1,38 @@
+"""
+Compares the per-document spacy_tokenizer path against the batched
+nlp.pipe path used by DataTransformation.
+
+Run from the repository root:
+    python -m benchmarks.bench_tokenization --docs 10000 --n-process 1 2 4
+"""
+import argparse
+import time
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import spacy_tokenizer, spacy_tokenize_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs)
+
+    start = time.perf_counter()
+    baseline = [spacy_tokenizer(text) for text in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"per-document nlp(text)        : {elapsed:8.2f}s  {len(corpus) / elapsed:9.1f} docs/s")
+
+    for n_process in args.n_process:
+        start = time.perf_counter()
+        batched = spacy_tokenize_corpus(corpus, batch_size=args.batch_size, n_process=n_process)
+        elapsed = time.perf_counter() - start
+        same = "identical" if batched == baseline else "MISMATCH"
+        print(f"nlp.pipe n_process={n_process:<2} batch={args.batch_size:<4}: "
+              f"{elapsed:8.2f}s  {len(corpus) / elapsed:9.1f} docs/s  ({same})")
+
+
+if __name__ == "__main__":
+    main()
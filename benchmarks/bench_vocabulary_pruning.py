@@ -0,0 +1,55 @@
+"""
+Vocabulary size, pickled artifact size and load time of the TF-IDF
+preprocessor before and after vocabulary pruning.
+
+Run from the repository root:
+    python -m benchmarks.bench_vocabulary_pruning --docs 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks._corpus import synthetic_corpus
+from src.components.Data_transformation import (
+    DataTransformation, identity_preprocessor, spacy_tokenize_corpus, spacy_tokenizer
+)
+from src.utils import load_object, save_object
+
+SETTINGS = {
+    "no pruning": {},
+    "min_df=2": {"min_df": 2},
+    "min_df=2, max_df=0.5": {"min_df": 2, "max_df": 0.5},
+    "min_df=2 + budgets": {"min_df": 2, "ngram_budgets": {2: 5000, 3: 2000}},
+    "max_features=50000": {"max_features": 50000},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    args = parser.parse_args()
+
+    lemmas = spacy_tokenize_corpus(synthetic_corpus(args.docs))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, overrides in SETTINGS.items():
+            transformation = DataTransformation()
+            for key, value in overrides.items():
+                setattr(transformation.transformation_config, key, value)
+
+            vectorizer = transformation.get_data_transformer_object(preprocessor=identity_preprocessor)
+            transformation.fit_vectorizer(vectorizer, lemmas)
+            vectorizer.set_params(preprocessor=spacy_tokenizer)
+
+            path = os.path.join(tmp_dir, "preprocessor.pkl")
+            save_object(path, vectorizer)
+            start = time.perf_counter()
+            load_object(path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{name:<22}: vocabulary {len(vectorizer.vocabulary_):>9,}  "
+                  f"artifact {os.path.getsize(path) / 2**20:8.2f} MiB  load {load_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,137 @@
 import sys
 import os
 import re
+import json
+import shutil
+import tempfile
+import threading
+from itertools import islice
+import numpy as np
 import pandas as pd
-from dataclasses import dataclass
-from sklearn.feature_extraction.text import TfidfVectorizer
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from src.exception import customException
 from src.logger import logging
-from src.utils import save_object
-import spacy
+from src.utils import (
+    load_json, load_object, load_sparse_matrix, save_json, save_object, save_sparse_matrix
+)
+from src.components.fast_tokenizer import FastTokenizer
+from src.components.mapped_vectorizer import save_mapped_vectorizer
+from src.components.lsa import fit_lsa, project
+from src.components.vectorizers import (
+    HashingTfidfVectorizer, IncrementalTfidfVectorizer, compact_csr, corpus_term_counts, document_frequency,
+    fit_idf_from_counts, fit_tfidf_out_of_core, prune_ngram_orders,
+    reindex_term_counts, strip_pruning_bookkeeping, term_count_matrix, tfidf_from_counts,
+    vocabulary_terms, widen_columns
+)
 
-# Load the spaCy model once
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logging.info("Loaded spaCy 'en_core_web_sm' model")
-except OSError:
-    logging.error("spaCy model 'en_core_web_sm' not found.")
-    logging.info("Please run: python -m spacy download en_core_web_sm")
-    sys.exit(1)
+SPACY_MODEL_NAME = "en_core_web_sm"
+
+# Pipeline components left out by each profile. spacy_tokenizer only reads
+# is_stop, is_punct, is_space and lemma_; the first three are lexical
+# attributes and the rule-based lemmatizer only needs the tagger and
+# attribute_ruler output, so the parser and NER can be skipped.
+SPACY_PIPELINE_PROFILES = {
+    "full": [],
+    "lemma": ["parser", "ner"],
+}
+DEFAULT_SPACY_PROFILE = "lemma"
+
+_loaded_models = {}
+_load_lock = threading.Lock()
+
+# Set once the default profile is loaded, so callers (e.g. a readiness
+# probe) can tell whether the first request will pay the model load.
+nlp_ready = threading.Event()
+
+
+def load_spacy_model(profile=DEFAULT_SPACY_PROFILE):
+    """
+    Loads (once per profile) the spaCy model with the components of the
+    given pipeline profile excluded.
+    spaCy itself is only imported here, so importing this module (or
+    unpickling a vectorizer that references spacy_tokenizer) stays cheap.
+    """
+    if profile not in SPACY_PIPELINE_PROFILES:
+        raise ValueError(f"Unknown spaCy pipeline profile: {profile}")
+
+    with _load_lock:
+        if profile not in _loaded_models:
+            import spacy
+
+            try:
+                _loaded_models[profile] = spacy.load(
+                    SPACY_MODEL_NAME, exclude=SPACY_PIPELINE_PROFILES[profile]
+                )
+            except OSError as e:
+                logging.error(f"spaCy model '{SPACY_MODEL_NAME}' not found.")
+                logging.info(f"Please run: python -m spacy download {SPACY_MODEL_NAME}")
+                raise customException(e, sys)
+            logging.info(f"Loaded spaCy '{SPACY_MODEL_NAME}' model with profile '{profile}'")
+
+        if profile == DEFAULT_SPACY_PROFILE:
+            nlp_ready.set()
+        return _loaded_models[profile]
+
+
+def get_nlp():
+    """
+    Returns the default-profile spaCy model, loading it on first use.
+    """
+    if nlp_ready.is_set():
+        return _loaded_models[DEFAULT_SPACY_PROFILE]
+    return load_spacy_model(DEFAULT_SPACY_PROFILE)
+
+
+def warm_up_spacy_model():
+    """
+    Starts loading the default spaCy model on a background thread and
+    returns immediately. nlp_ready is set once the model is available.
+    """
+    def _load():
+        try:
+            get_nlp()
+        except Exception:
+            logging.error("Background spaCy model warm-up failed")
+
+    thread = threading.Thread(target=_load, name="spacy-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def _model_for_profile(profile):
+    """
+    Returns an already loaded model that contains every component the
+    profile needs (the extra ones are disabled in nlp.pipe), loading the
+    profile itself only when no such model exists yet.
+    """
+    if profile in _loaded_models:
+        return _loaded_models[profile]
+
+    excluded = set(SPACY_PIPELINE_PROFILES.get(profile, []))
+    for loaded_profile, model in list(_loaded_models.items()):
+        if set(SPACY_PIPELINE_PROFILES[loaded_profile]) <= excluded:
+            return model
+    return load_spacy_model(profile)
+
+
+def _doc_to_lemmas(doc):
+    """
+    Keeps the lemma of every token that is not a stop word,
+    punctuation or whitespace, and joins them with single spaces.
+    """
+    lemmas = []
+    for token in doc:
+        if (not token.is_stop and
+            not token.is_punct and
+            token.text.strip() and
+            not token.is_space):
+
+            lemmas.append(token.lemma_)
+
+    return " ".join(lemmas)
 
 
 def spacy_tokenizer(text):
@@ -25,48 +140,172 @@ def spacy_tokenizer(text):
     stop-word removal, and punctuation removal.
     Returns a list of clean lemma tokens.
     """
+    nlp = get_nlp()
     try:
         doc = nlp(str(text).lower())
-        lemmas = []
-        for token in doc:
-            if (not token.is_stop and
-                not token.is_punct and
-                token.text.strip() and
-                not token.is_space):
-                
-                lemmas.append(token.lemma_)
-        
-        
-        return " ".join(lemmas) 
+        return _doc_to_lemmas(doc)
     except Exception as e:
         logging.error(f"Error in spacy_tokenizer: {e}")
         return ""
 
 
+def spacy_docs(texts, batch_size=256, n_process=1, profile=DEFAULT_SPACY_PROFILE):
+    """
+    Streams the lower-cased texts through nlp.pipe (optionally over
+    several processes) with the profile's unused components disabled.
+    """
+    model = _model_for_profile(profile)
+    disable = [name for name in SPACY_PIPELINE_PROFILES[profile] if name in model.pipe_names]
+    lowered = (str(text).lower() for text in texts)
+    return model.pipe(lowered, batch_size=batch_size, n_process=n_process, disable=disable)
+
+
+def spacy_tokenize_corpus(texts, batch_size=256, n_process=1, profile=DEFAULT_SPACY_PROFILE):
+    """
+    Batched equivalent of spacy_tokenizer for a whole corpus.
+    Returns one lemma string per input document.
+    """
+    try:
+        return [
+            _doc_to_lemmas(doc)
+            for doc in spacy_docs(texts, batch_size=batch_size, n_process=n_process, profile=profile)
+        ]
+    except Exception as e:
+        logging.error("Error in spacy_tokenize_corpus")
+        raise customException(e, sys)
+
+
+def identity_preprocessor(text):
+    """
+    Preprocessor used while fitting on text that has already been
+    lemmatized by spacy_tokenize_corpus.
+    """
+    return text
+
+
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path: str = os.path.join('artifacts', 'preprocessor.pkl')
+    # Memory-mappable copy of the fitted vectorizer used for serving
+    # (see mapped_vectorizer.py); the pickle is kept for training-side updates
+    preprocessor_dir: str = os.path.join('artifacts', 'preprocessor')
+    # Raw term counts of the corpus (rows follow data.csv) and the ids, types
+    # and vocabulary they were counted with, so a new IDF is only a rescale
+    term_counts_file_path: str = os.path.join('artifacts', 'term_counts.npz')
+    term_counts_index_file_path: str = os.path.join('artifacts', 'term_counts_index.json')
+    # "incremental" only: unpruned counts of every term of the corpus and the
+    # terms of their columns, so that terms a later partial_fit admits (past
+    # min_df/max_df, or back after the forgetting window) are counted in the
+    # existing documents too
+    corpus_term_counts_file_path: str = os.path.join('artifacts', 'corpus_term_counts.npz')
+    corpus_terms_file_path: str = os.path.join('artifacts', 'corpus_terms.json')
+    # nlp.pipe settings for the corpus-wide pre-tokenization pass
+    spacy_batch_size: int = 256
+    spacy_n_process: int = 1
+    spacy_profile: str = DEFAULT_SPACY_PROFILE
+    # "spacy" (spacy_tokenizer) or "fast" (regex + lemma table, see fast_tokenizer.py)
+    tokenizer: str = "spacy"
+    # "tfidf" keeps an n-gram vocabulary; "hashing" hashes n-grams into a fixed
+    # number of columns and accumulates IDF in a streaming pass (no vocabulary);
+    # "incremental" keeps per-term document counts so new documents can be
+    # folded in with update_data_transformation instead of a full refit
+    vectorizer: str = "tfidf"
+    hashing_n_features: int = 2 ** 20
+    hashing_batch_size: int = 10000
+    # Forgetting window of the "incremental" vectorizer, in partial_fit batches
+    incremental_window_batches: Optional[int] = None
+    # update_data_transformation folds new documents into the IDF (and refits
+    # LSA). With False the fit is kept as is and new documents are only
+    # appended in its column space, so scores stored for the existing
+    # documents stay valid (see ModelTrainerConfig.score_store_dir)
+    refit_on_update: bool = True
+    # Vocabulary pruning for the "tfidf" vectorizer. min_df/max_df/max_features
+    # are passed to TfidfVectorizer; ngram_budgets caps the number of terms
+    # kept per n-gram order, e.g. {2: 200000, 3: 100000}. The "incremental"
+    # vectorizer takes min_df/max_df only and rejects the other two.
+    min_df: float = 1
+    max_df: float = 1.0
+    max_features: Optional[int] = None
+    ngram_budgets: Dict[int, int] = field(default_factory=dict)
+    # "memory" fits on the whole text column at once; "chunked" streams the
+    # processed CSV chunk_size rows at a time and spills term counts to disk
+    # (under spill_dir, default: system temp) above max_terms_in_memory terms
+    fit_mode: str = "memory"
+    chunk_size: int = 10000
+    max_terms_in_memory: int = 5000000
+    spill_dir: Optional[str] = None
+    # Value type of the TF-IDF matrices: "float32" halves their memory and the
+    # bandwidth of the sparse products (scores drift by well under 0.01 pp)
+    dtype: str = "float64"
+    # Optional LSA stage: number of TruncatedSVD components (None disables it).
+    # The model and the corpus's dense float32 vectors (rows follow the term
+    # counts) are saved next to the vectorizer; ModelTrainer can score on them.
+    lsa_components: Optional[int] = None
+    lsa_obj_file_path: str = os.path.join('artifacts', 'lsa.pkl')
+    lsa_vectors_file_path: str = os.path.join('artifacts', 'lsa_vectors.npy')
 
 class DataTransformation:
     def __init__(self):
         self.transformation_config = DataTransformationConfig()
         logging.info("DataTransformation component initialized")
 
-    def get_data_transformer_object(self):
+    def get_data_transformer_object(self, preprocessor=spacy_tokenizer):
         """
         This function is responsible for creating the data transformation object.
         """
         try:
+            if self.transformation_config.vectorizer == "hashing":
+                logging.info("Creating hashing TF-IDF Vectorizer object")
+
+                hashing_vectorizer = HashingTfidfVectorizer(
+                    preprocessor=preprocessor,
+                    ngram_range=(1, 3),
+                    n_features=self.transformation_config.hashing_n_features,
+                    batch_size=self.transformation_config.hashing_batch_size,
+                    dtype=np.dtype(self.transformation_config.dtype).type
+                )
+
+                logging.info(f"Hashing TF-IDF Vectorizer object created with "
+                             f"{self.transformation_config.hashing_n_features} features and n-grams (1, 3)")
+                return hashing_vectorizer
+
+            if self.transformation_config.vectorizer == "incremental":
+                logging.info("Creating incremental TF-IDF Vectorizer object")
+
+                # Its vocabulary is rebuilt from the document counts on every
+                # partial_fit, so a cap on the number of terms cannot be kept
+                if self.transformation_config.max_features is not None or self.transformation_config.ngram_budgets:
+                    raise customException(
+                        "max_features and ngram_budgets are not supported with vectorizer='incremental'; "
+                        "use min_df/max_df to prune its vocabulary.", sys
+                    )
+
+                incremental_vectorizer = IncrementalTfidfVectorizer(
+                    preprocessor=preprocessor,
+                    ngram_range=(1, 3),
+                    min_df=self.transformation_config.min_df,
+                    max_df=self.transformation_config.max_df,
+                    window_batches=self.transformation_config.incremental_window_batches,
+                    dtype=np.dtype(self.transformation_config.dtype).type
+                )
+
+                logging.info("Incremental TF-IDF Vectorizer object created with n-grams (1, 3)")
+                return incremental_vectorizer
+
             logging.info("Creating TF-IDF Vectorizer object")
             
             tfidf_vectorizer = TfidfVectorizer(
                 
-                preprocessor=spacy_tokenizer, 
+                preprocessor=preprocessor, 
                 
                 
                 
                 
-                ngram_range=(1, 3) 
+                ngram_range=(1, 3),
+                min_df=self.transformation_config.min_df,
+                max_df=self.transformation_config.max_df,
+                max_features=self.transformation_config.max_features,
+                dtype=np.dtype(self.transformation_config.dtype).type
             )
             
             logging.info("TF-IDF Vectorizer object created with n-grams (1, 3)")
@@ -75,27 +314,234 @@ class DataTransformation:
         except Exception as e:
             raise customException(e, sys)
 
+    def fit_vectorizer(self, preprocessor_obj, documents):
+        """
+        Fits the vectorizer, applies the configured vocabulary pruning and
+        returns the raw term-count matrix of the documents.
+        """
+        if isinstance(preprocessor_obj, IncrementalTfidfVectorizer):
+            # No n-gram budgets: they would desync vocabulary_ from the stored counts
+            preprocessor_obj.fit(documents)
+            corpus_terms = []
+            corpus_counts = corpus_term_counts(preprocessor_obj, documents, corpus_terms)
+            self.save_corpus_term_counts(corpus_counts, corpus_terms)
+            return compact_csr(reindex_term_counts(corpus_counts, corpus_terms, preprocessor_obj.vocabulary_))
+
+        if isinstance(preprocessor_obj, HashingTfidfVectorizer):
+            # Hashing has no vocabulary to prune
+            preprocessor_obj.fit(documents)
+            return term_count_matrix(preprocessor_obj, documents)
+
+        # Same steps as TfidfVectorizer.fit, keeping the counts it computes on the way
+        term_counts = CountVectorizer.fit_transform(preprocessor_obj, documents)
+        if self.transformation_config.ngram_budgets:
+            kept = prune_ngram_orders(
+                preprocessor_obj, document_frequency(term_counts), self.transformation_config.ngram_budgets
+            )
+            term_counts = term_counts[:, kept]
+        fit_idf_from_counts(preprocessor_obj, term_counts)
+        strip_pruning_bookkeeping(preprocessor_obj)
+        logging.info(f"Vectorizer vocabulary size: {len(preprocessor_obj.vocabulary_)}")
+        return compact_csr(term_counts, np.int32)
+
+    def save_term_counts(self, term_counts, preprocessor_obj, df):
+        """
+        Persists the corpus term counts together with the document ids and
+        types of its rows and the vocabulary of its columns.
+        """
+        save_sparse_matrix(self.transformation_config.term_counts_file_path, term_counts)
+
+        vocabulary = getattr(preprocessor_obj, "vocabulary_", None)
+        save_json(self.transformation_config.term_counts_index_file_path, {
+            "ids": df['id'].astype(str).tolist(),
+            "types": df['type'].astype(str).tolist(),
+            "vocabulary": None if vocabulary is None else vocabulary_terms(vocabulary).tolist(),
+        })
+
+    def save_corpus_term_counts(self, corpus_counts, corpus_terms):
+        """
+        Persists the unpruned counts of the incremental vectorizer's corpus
+        (see corpus_term_counts) and the terms of their columns.
+        """
+        save_sparse_matrix(self.transformation_config.corpus_term_counts_file_path, corpus_counts)
+        save_json(self.transformation_config.corpus_terms_file_path, corpus_terms)
+
+    def fit_lsa_stage(self, preprocessor_obj, term_counts):
+        """
+        Fits the optional LSA model on the corpus TF-IDF matrix and saves it
+        together with the corpus's dense document vectors.
+        """
+        config = self.transformation_config
+        if not config.lsa_components:
+            return
+
+        logging.info(f"Fitting LSA with {config.lsa_components} components...")
+        svd, lsa_vectors = fit_lsa(tfidf_from_counts(preprocessor_obj, term_counts), config.lsa_components)
+        save_object(file_path=config.lsa_obj_file_path, obj=svd)
+        os.makedirs(os.path.dirname(config.lsa_vectors_file_path), exist_ok=True)
+        np.save(config.lsa_vectors_file_path, lsa_vectors)
+        logging.info(f"LSA vectors {lsa_vectors.shape} saved to {config.lsa_vectors_file_path}")
+
+    def fit_vectorizer_in_memory(self, df):
+        """
+        Fits the vectorizer on the whole text column at once.
+        Returns the fitted vectorizer and the corpus term counts.
+        """
+        all_text_data = df['text'].astype(str)
+
+        if self.transformation_config.tokenizer == "fast":
+            # The lemma table comes from one spaCy pass over the corpus;
+            # the vectorizer is then fitted with the fast tokenizer itself
+            # so that training and serving see the same tokens.
+            logging.info("Building fast tokenizer from spaCy output...")
+            fast_tokenizer = FastTokenizer.from_corpus(
+                all_text_data,
+                batch_size=self.transformation_config.spacy_batch_size,
+                n_process=self.transformation_config.spacy_n_process,
+                profile=self.transformation_config.spacy_profile
+            )
+            preprocessor_obj = self.get_data_transformer_object(preprocessor=fast_tokenizer)
+
+            logging.info("Fitting vectorizer on all text data...")
+            term_counts = self.fit_vectorizer(preprocessor_obj, all_text_data)
+            logging.info("Vectorizer fitting complete.")
+        else:
+            preprocessor_obj = self.get_data_transformer_object()
+
+            logging.info("Lemmatizing all text data with nlp.pipe...")
+            all_lemmas = spacy_tokenize_corpus(
+                all_text_data,
+                batch_size=self.transformation_config.spacy_batch_size,
+                n_process=self.transformation_config.spacy_n_process,
+                profile=self.transformation_config.spacy_profile
+            )
+
+            # The lemmas are already spaCy output, so the vectorizer only has to
+            # build n-grams from them. The spaCy preprocessor is put back before
+            # saving so that serving still accepts raw text.
+            logging.info("Fitting vectorizer on all text data...")
+            preprocessor_obj.set_params(preprocessor=identity_preprocessor)
+            term_counts = self.fit_vectorizer(preprocessor_obj, all_lemmas)
+            preprocessor_obj.set_params(preprocessor=spacy_tokenizer)
+            logging.info("Vectorizer fitting complete.")
+
+        return preprocessor_obj, term_counts
+
+    def fit_vectorizer_out_of_core(self, processed_data_path):
+        """
+        Fits the vectorizer by streaming the processed CSV in chunks, so
+        the corpus never has to fit in memory. The first pass lemmatizes
+        each chunk, spills the prepared documents to disk and accumulates
+        the vocabulary; the second pass counts terms from the spilled
+        documents against the final vocabulary.
+        Returns the fitted vectorizer, the corpus term counts and the
+        id/type columns of the corpus.
+        """
+        config = self.transformation_config
+        spill_root = tempfile.mkdtemp(prefix="ats_fit_", dir=config.spill_dir)
+        documents_path = os.path.join(spill_root, "documents.jsonl")
+        index_frames = []
+
+        def read_chunks():
+            return pd.read_csv(processed_data_path, chunksize=config.chunk_size)
+
+        try:
+            if config.tokenizer == "fast":
+                logging.info("Building fast tokenizer from spaCy output...")
+                fast_tokenizer = FastTokenizer.from_corpus(
+                    (text for chunk in read_chunks() for text in chunk['text'].astype(str)),
+                    batch_size=config.spacy_batch_size,
+                    n_process=config.spacy_n_process,
+                    profile=config.spacy_profile
+                )
+                preprocessor_obj = self.get_data_transformer_object(preprocessor=fast_tokenizer)
+                prepare = list
+            else:
+                preprocessor_obj = self.get_data_transformer_object()
+                preprocessor_obj.set_params(preprocessor=identity_preprocessor)
+
+                def prepare(texts):
+                    return spacy_tokenize_corpus(
+                        texts,
+                        batch_size=config.spacy_batch_size,
+                        n_process=config.spacy_n_process,
+                        profile=config.spacy_profile
+                    )
+
+            def prepared_chunks():
+                with open(documents_path, "w", encoding="utf-8") as documents_file:
+                    for chunk in read_chunks():
+                        index_frames.append(chunk[['id', 'type']])
+                        documents = prepare(chunk['text'].astype(str))
+                        documents_file.writelines(json.dumps(document) + "\n" for document in documents)
+                        yield documents
+
+            def spilled_chunks():
+                with open(documents_path, "r", encoding="utf-8") as documents_file:
+                    while True:
+                        lines = list(islice(documents_file, config.chunk_size))
+                        if not lines:
+                            return
+                        yield [json.loads(line) for line in lines]
+
+            logging.info(f"Fitting vectorizer in chunks of {config.chunk_size} documents...")
+            if isinstance(preprocessor_obj, HashingTfidfVectorizer):
+                preprocessor_obj.fit(document for chunk in prepared_chunks() for document in chunk)
+            elif isinstance(preprocessor_obj, IncrementalTfidfVectorizer):
+                for chunk in prepared_chunks():
+                    preprocessor_obj.partial_fit(chunk)
+            else:
+                fit_tfidf_out_of_core(
+                    preprocessor_obj, prepared_chunks(), spill_root,
+                    max_terms_in_memory=config.max_terms_in_memory,
+                    ngram_budgets=config.ngram_budgets
+                )
+                strip_pruning_bookkeeping(preprocessor_obj)
+
+            if isinstance(preprocessor_obj, IncrementalTfidfVectorizer):
+                corpus_terms = []
+                corpus_counts = [corpus_term_counts(preprocessor_obj, chunk, corpus_terms) for chunk in spilled_chunks()]
+                corpus_counts = compact_csr(sp.vstack([
+                    widen_columns(counts, len(corpus_terms)) for counts in corpus_counts
+                ]))
+                self.save_corpus_term_counts(corpus_counts, corpus_terms)
+                term_counts = compact_csr(
+                    reindex_term_counts(corpus_counts, corpus_terms, preprocessor_obj.vocabulary_)
+                )
+            else:
+                term_counts = compact_csr(sp.vstack([
+                    term_count_matrix(preprocessor_obj, chunk) for chunk in spilled_chunks()
+                ]))
+            logging.info("Vectorizer fitting complete.")
+
+            if config.tokenizer != "fast":
+                preprocessor_obj.set_params(preprocessor=spacy_tokenizer)
+            return preprocessor_obj, term_counts, pd.concat(index_frames, ignore_index=True)
+
+        finally:
+            shutil.rmtree(spill_root, ignore_errors=True)
+
     def initiate_data_transformation(self, processed_data_path):
         """
         Applies the transformation to the data.
         """
         try:
             logging.info("Data transformation process started")
-            
-            df = pd.read_csv(processed_data_path)
-            
-            preprocessor_obj = self.get_data_transformer_object()
 
-            logging.info("Fitting vectorizer on all text data...")
-            all_text_data = df['text'].astype(str)
-            preprocessor_obj.fit(all_text_data)
-            logging.info("Vectorizer fitting complete.")
+            if self.transformation_config.fit_mode == "chunked":
+                preprocessor_obj, term_counts, df = self.fit_vectorizer_out_of_core(processed_data_path)
+            else:
+                df = pd.read_csv(processed_data_path)
+                preprocessor_obj, term_counts = self.fit_vectorizer_in_memory(df)
 
             logging.info(f"Saving preprocessor object to {self.transformation_config.preprocessor_obj_file_path}")
             save_object(
                 file_path=self.transformation_config.preprocessor_obj_file_path,
                 obj=preprocessor_obj
             )
+            save_mapped_vectorizer(self.transformation_config.preprocessor_dir, preprocessor_obj)
+            self.save_term_counts(term_counts, preprocessor_obj, df)
+            self.fit_lsa_stage(preprocessor_obj, term_counts)
             
             logging.info("Data transformation process completed")
             
@@ -105,3 +551,121 @@ class DataTransformation:
             logging.error("Error during data transformation")
             raise customException(e, sys)
 
+    def append_lsa_vectors(self, preprocessor_obj, new_term_counts):
+        """
+        Projects new documents with the saved LSA model and appends their
+        vectors to the saved corpus vectors.
+        """
+        config = self.transformation_config
+        if not config.lsa_components:
+            return
+
+        svd = load_object(file_path=config.lsa_obj_file_path)
+        new_vectors = project(svd, tfidf_from_counts(preprocessor_obj, new_term_counts))
+        lsa_vectors = np.concatenate([np.load(config.lsa_vectors_file_path), new_vectors])
+        np.save(config.lsa_vectors_file_path, lsa_vectors)
+        logging.info(f"Appended {len(new_vectors)} LSA vectors to {config.lsa_vectors_file_path}")
+
+    def update_data_transformation(self, new_data_path):
+        """
+        Folds newly ingested documents into the saved incremental
+        vectorizer with partial_fit instead of refitting on the whole corpus.
+        With refit_on_update=False the saved fit (of any vectorizer) is
+        left unchanged and the new documents are only appended. Ids that
+        are already indexed are rejected.
+        """
+        try:
+            logging.info("Incremental data transformation started")
+
+            refit = self.transformation_config.refit_on_update
+            preprocessor_path = self.transformation_config.preprocessor_obj_file_path
+            preprocessor_obj = load_object(file_path=preprocessor_path)
+            if refit and not isinstance(preprocessor_obj, IncrementalTfidfVectorizer):
+                raise customException(
+                    "The saved preprocessor does not support partial_fit. "
+                    "Run initiate_data_transformation with vectorizer='incremental' first.", sys
+                )
+
+            config = self.transformation_config
+            # Unpruned counts are only kept for the incremental vectorizer
+            has_corpus_counts = (
+                isinstance(preprocessor_obj, IncrementalTfidfVectorizer)
+                and os.path.exists(config.corpus_term_counts_file_path)
+            )
+            if refit and not has_corpus_counts:
+                raise customException(
+                    "No corpus term counts next to the saved preprocessor (artifacts from an older version). "
+                    "Run initiate_data_transformation once before updating.", sys
+                )
+
+            new_df = pd.read_csv(new_data_path)
+            new_text_data = new_df['text'].astype(str)
+
+            # Rows are only appended: a re-submitted id would get a second
+            # row and partial_fit would count its terms twice
+            index = load_json(config.term_counts_index_file_path)
+            new_ids = new_df['id'].astype(str)
+            repeated_ids = sorted(set(new_ids[new_ids.isin(index['ids']) | new_ids.duplicated()]))
+            if repeated_ids:
+                raise customException(
+                    f"{len(repeated_ids)} ids are already indexed or repeated in {new_data_path} "
+                    f"(e.g. {repeated_ids[:5]}). Updates can only add new documents; "
+                    "run initiate_data_transformation to replace existing ones.", sys
+                )
+
+            new_documents = new_text_data
+            lemmatized = preprocessor_obj.preprocessor is spacy_tokenizer
+            if lemmatized:
+                logging.info("Lemmatizing new text data with nlp.pipe...")
+                new_documents = spacy_tokenize_corpus(
+                    new_text_data,
+                    batch_size=config.spacy_batch_size,
+                    n_process=config.spacy_n_process,
+                    profile=config.spacy_profile
+                )
+                preprocessor_obj.set_params(preprocessor=identity_preprocessor)
+            if refit:
+                preprocessor_obj.partial_fit(new_documents)
+            new_term_counts = term_count_matrix(preprocessor_obj, new_documents)
+            if has_corpus_counts:
+                corpus_terms = load_json(config.corpus_terms_file_path)
+                new_corpus_counts = corpus_term_counts(preprocessor_obj, new_documents, corpus_terms)
+            if lemmatized:
+                preprocessor_obj.set_params(preprocessor=spacy_tokenizer)
+
+            if refit:
+                save_object(file_path=preprocessor_path, obj=preprocessor_obj)
+                save_mapped_vectorizer(config.preprocessor_dir, preprocessor_obj)
+
+            if has_corpus_counts:
+                # The unpruned counts of the existing corpus are kept as they
+                # are; the updated vocabulary is a column selection of them,
+                # so no old text is re-tokenized
+                corpus_counts = compact_csr(sp.vstack([
+                    widen_columns(load_sparse_matrix(config.corpus_term_counts_file_path), len(corpus_terms)),
+                    new_corpus_counts
+                ]))
+                self.save_corpus_term_counts(corpus_counts, corpus_terms)
+                term_counts = compact_csr(reindex_term_counts(corpus_counts, corpus_terms, preprocessor_obj.vocabulary_))
+            else:
+                # The fit is unchanged, so the cached counts stay valid as they are
+                old_term_counts = load_sparse_matrix(config.term_counts_file_path)
+                term_counts = compact_csr(sp.vstack([old_term_counts, new_term_counts]))
+            all_df = pd.concat([
+                pd.DataFrame({'id': index['ids'], 'type': index['types']}),
+                new_df[['id', 'type']]
+            ], ignore_index=True)
+            self.save_term_counts(term_counts, preprocessor_obj, all_df)
+            if refit:
+                # The vocabulary may have grown, so the LSA model is refitted
+                self.fit_lsa_stage(preprocessor_obj, term_counts)
+                logging.info(f"Folded {len(new_text_data)} new documents into {preprocessor_path}")
+            else:
+                self.append_lsa_vectors(preprocessor_obj, new_term_counts)
+                logging.info(f"Appended {len(new_text_data)} new documents under the fit of {preprocessor_path}")
+
+            return preprocessor_path
+
+        except Exception as e:
+            logging.error("Error during incremental data transformation")
+            raise customException(e, sys)
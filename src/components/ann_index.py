@@ -0,0 +1,377 @@
+import os
+import sys
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from dataclasses import dataclass
+from sklearn.preprocessing import normalize
+from src.exception import customException
+from src.logger import logging
+from src.utils import load_json, load_object, load_sparse_matrix, save_json
+from src.components.vectorizers import tfidf_from_counts
+
+# On-disk layout of an index directory (FORMAT_VERSION 1):
+#   config.json            dimensions, table/bit settings, storage kinds and
+#                          the caller's metadata (e.g. which vectors are indexed)
+#   planes.npy|planes.npz  random hyperplanes (dense, or sparse +-1 for wide inputs)
+#   codes.npy              (n_items, n_tables) uint64 bucket code of every item
+#   ids.npy                item ids
+#   vectors.npy|vectors.npz  unit-length item vectors used to rerank candidates
+FORMAT_VERSION = 1
+# Above this many input dimensions the hyperplanes are stored as a very
+# sparse +-1 matrix (density 1/sqrt(dim)) instead of a dense Gaussian one
+DENSE_PLANES_MAX_DIM = 4096
+
+
+@dataclass
+class AnnIndexConfig:
+    # Built by the training pipeline only when enabled
+    enabled: bool = False
+    index_dir: str = os.path.join('artifacts', 'ann_index')
+    # "lsa" indexes the LSA vectors (lsa_components must be set), "tfidf"
+    # the sparse TF-IDF vectors rebuilt from the cached term counts
+    vectors: str = "lsa"
+    # Recall/speed knobs: more tables and probes raise recall, more bits per
+    # table make buckets smaller and queries faster (n_probes is the query-time
+    # default stored with the index)
+    n_tables: int = 8
+    n_bits: int = 12
+    n_probes: int = 2
+    seed: int = 42
+    # Recall report written next to the index: the corpus's job descriptions
+    # are queried and compared with exact cosine similarity. Below min_recall
+    # the build fails, so the version is not published
+    report_k: int = 10
+    min_recall: float = 0.9
+
+
+def _replace_file(dir_path, file_name, array):
+    """
+    Writes an array next to its final name and renames it into place, so
+    an index saved over the directory it was loaded (memory-mapped) from
+    never truncates a file that is still mapped.
+    """
+    tmp_path = os.path.join(dir_path, f".{file_name}.tmp")
+    with open(tmp_path, "wb") as file_obj:
+        if sp.issparse(array):
+            sp.save_npz(file_obj, sp.csr_matrix(array))
+        else:
+            np.save(file_obj, np.ascontiguousarray(array))
+    os.replace(tmp_path, os.path.join(dir_path, file_name))
+
+
+class LSHIndex:
+    """
+    Random-hyperplane LSH for cosine similarity. Each of n_tables tables
+    hashes a vector to the signs of n_bits random projections; a query
+    collects the items sharing its bucket (plus n_probes neighbouring
+    buckets per table, flipping the bits it is least sure about) and
+    reranks those candidates by exact cosine similarity.
+    """
+
+    def __init__(self, dim, n_tables=8, n_bits=12, n_probes=2, seed=42):
+        if not 1 <= n_bits <= 64:
+            raise ValueError("n_bits must be between 1 and 64")
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = n_probes
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        n_planes = n_tables * n_bits
+        if dim <= DENSE_PLANES_MAX_DIM:
+            self.planes = rng.standard_normal((dim, n_planes)).astype(np.float32)
+        else:
+            self.planes = sp.random(
+                dim, n_planes, density=1 / np.sqrt(dim), format="csr", random_state=rng,
+                data_rvs=lambda size: rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=size)
+            ).astype(np.float32)
+
+        self.ids = np.zeros(0, dtype=str)
+        self.codes = np.zeros((0, n_tables), dtype=np.uint64)
+        self.vectors = None
+        self.metadata = {}
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _project(self, vectors):
+        projections = vectors @ self.planes
+        if sp.issparse(projections):
+            projections = projections.toarray()
+        return np.asarray(projections, dtype=np.float32).reshape(-1, self.n_tables, self.n_bits)
+
+    def _codes(self, projections):
+        bit_values = np.left_shift(np.uint64(1), np.arange(self.n_bits, dtype=np.uint64))
+        return ((projections > 0).astype(np.uint64) * bit_values).sum(axis=2, dtype=np.uint64)
+
+    def add(self, vectors, ids):
+        """
+        Inserts vectors (dense array or sparse matrix, one row per item)
+        under the given ids. Rows are L2-normalised for the rerank.
+        """
+        vectors = normalize(vectors) if sp.issparse(vectors) else normalize(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        codes = self._codes(self._project(vectors))
+        if self.vectors is None:
+            self.vectors = vectors
+        elif sp.issparse(vectors):
+            self.vectors = sp.vstack([self.vectors, vectors], format="csr")
+        else:
+            self.vectors = np.vstack([self.vectors, vectors.astype(self.vectors.dtype)])
+        self.codes = np.vstack([self.codes, codes])
+        self.ids = np.concatenate([self.ids, np.asarray(ids).astype(str)])
+        # Bucket lookup tables are rebuilt lazily on the next query
+        self._sorted = None
+        return self
+
+    def _bucket_tables(self):
+        if self._sorted is None:
+            orders = np.argsort(self.codes, axis=0, kind="stable")
+            self._sorted = (orders, np.take_along_axis(self.codes, orders, axis=0))
+        return self._sorted
+
+    def candidates(self, projections, n_probes):
+        """
+        Item rows sharing a probed bucket with the query in any table.
+        """
+        orders, sorted_codes = self._bucket_tables()
+        code = self._codes(projections[None])[0]
+        found = []
+        for table in range(self.n_tables):
+            keys = [code[table]]
+            if n_probes:
+                # Flip the bits whose projection is closest to the hyperplane
+                uncertain = np.argsort(np.abs(projections[table]))[:n_probes]
+                keys.extend(code[table] ^ np.uint64(1 << int(bit)) for bit in uncertain)
+            keys = np.asarray(keys, dtype=np.uint64)
+            starts = np.searchsorted(sorted_codes[:, table], keys, side="left")
+            ends = np.searchsorted(sorted_codes[:, table], keys, side="right")
+            found.extend(orders[start:end, table] for start, end in zip(starts, ends) if end > start)
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def query(self, vectors, k=10, n_probes=None):
+        """
+        Approximate top-k items for each query row. Returns a list of
+        (ids, cosine scores) pairs, best first, and the mean number of
+        candidates that were reranked. n_probes defaults to the index's own.
+        """
+        n_probes = self.n_probes if n_probes is None else n_probes
+        if sp.issparse(vectors):
+            vectors = normalize(vectors)
+        else:
+            vectors = normalize(np.asarray(vectors, dtype=np.float32))
+        projections = self._project(vectors)
+
+        results, n_candidates = [], 0
+        for row in range(vectors.shape[0]):
+            rows = self.candidates(projections[row], n_probes)
+            n_candidates += len(rows)
+            if not len(rows):
+                results.append((self.ids[:0], np.zeros(0, dtype=np.float32)))
+                continue
+            scores = self.vectors[rows] @ vectors[row].T
+            scores = np.asarray(scores.toarray() if sp.issparse(scores) else scores).ravel()
+            top = np.argsort(-scores, kind="stable")[:k]
+            results.append((self.ids[rows[top]], scores[top]))
+        return results, n_candidates / max(vectors.shape[0], 1)
+
+    def save(self, dir_path):
+        """
+        Writes the index in the directory layout described above.
+        """
+        try:
+            os.makedirs(dir_path, exist_ok=True)
+            sparse_planes = sp.issparse(self.planes)
+            sparse_vectors = sp.issparse(self.vectors)
+            _replace_file(dir_path, "planes.npz" if sparse_planes else "planes.npy", self.planes)
+            if self.vectors is not None:
+                _replace_file(dir_path, "vectors.npz" if sparse_vectors else "vectors.npy", self.vectors)
+            _replace_file(dir_path, "codes.npy", self.codes)
+            _replace_file(dir_path, "ids.npy", self.ids)
+
+            # config.json is written last: a directory without it is incomplete
+            with open(os.path.join(dir_path, "config.json"), "w", encoding="utf-8") as file_obj:
+                json.dump({
+                    "format_version": FORMAT_VERSION,
+                    "dim": self.dim,
+                    "n_tables": self.n_tables,
+                    "n_bits": self.n_bits,
+                    "n_probes": self.n_probes,
+                    "seed": self.seed,
+                    "sparse_planes": sparse_planes,
+                    "sparse_vectors": sparse_vectors,
+                    "n_items": len(self),
+                    "metadata": self.metadata,
+                }, file_obj, indent=2)
+
+            logging.info(f"LSH index with {len(self)} items saved to {dir_path}")
+
+        except Exception as e:
+            raise customException(e, sys)
+
+    @classmethod
+    def load(cls, dir_path):
+        """
+        Opens an index written by save. Dense arrays are memory-mapped;
+        they are copied into memory only if items are added.
+        """
+        try:
+            with open(os.path.join(dir_path, "config.json"), "r", encoding="utf-8") as file_obj:
+                config = json.load(file_obj)
+            if config.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported index format version {config.get('format_version')}")
+
+            index = cls.__new__(cls)
+            index.dim = config["dim"]
+            index.n_tables = config["n_tables"]
+            index.n_bits = config["n_bits"]
+            index.n_probes = config["n_probes"]
+            index.seed = config["seed"]
+            index.planes = sp.load_npz(os.path.join(dir_path, "planes.npz")).tocsr() if config["sparse_planes"] \
+                else np.load(os.path.join(dir_path, "planes.npy"), mmap_mode="r")
+            index.codes = np.load(os.path.join(dir_path, "codes.npy"))
+            index.ids = np.load(os.path.join(dir_path, "ids.npy"))
+            if config["sparse_vectors"]:
+                index.vectors = load_sparse_matrix(os.path.join(dir_path, "vectors.npz"))
+            elif config["n_items"]:
+                index.vectors = np.load(os.path.join(dir_path, "vectors.npy"), mmap_mode="r")
+            else:
+                index.vectors = None
+            index.metadata = config.get("metadata", {})
+            index._sorted = None
+
+            logging.info(f"LSH index with {len(index)} items loaded from {dir_path}")
+            return index
+
+        except Exception as e:
+            raise customException(e, sys)
+
+
+def recall_at_k(index, query_vectors, item_vectors, k=10, n_probes=None):
+    """
+    Compares the index against exact cosine similarity over the same
+    items (rows of item_vectors, in insertion order). Returns the mean
+    recall@k (by score, so ties at the k-th place are not counted as
+    misses and items with a zero score are not relevant), the mean share
+    of items reranked per query, and the mean query time of both methods
+    in milliseconds.
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    start = time.perf_counter()
+    exact = cosine_similarity(query_vectors, item_vectors)
+    exact_top = np.argsort(-exact, axis=1, kind="stable")[:, :k]
+    exact_ms = (time.perf_counter() - start) * 1000 / max(exact.shape[0], 1)
+
+    start = time.perf_counter()
+    results, mean_candidates = index.query(query_vectors, k=k, n_probes=n_probes)
+    ann_ms = (time.perf_counter() - start) * 1000 / max(len(results), 1)
+
+    recalls = []
+    for row, (_, found_scores) in enumerate(results):
+        exact_scores = exact[row, exact_top[row]]
+        relevant = exact_scores[exact_scores > 0]
+        if len(relevant):
+            # A returned item scoring at least the k-th best is one of the
+            # top-k (or tied with it); the index reranks float32 vectors
+            hits = np.sum(found_scores[:len(relevant)] >= relevant[-1] - 1e-6)
+            recalls.append(float(hits) / len(relevant))
+    return {
+        "recall_at_k": float(np.mean(recalls)) if recalls else 1.0,
+        "candidate_fraction": mean_candidates / max(len(index), 1),
+        "exact_ms_per_query": exact_ms,
+        "ann_ms_per_query": ann_ms,
+    }
+
+
+_ann_indexes = {}
+_ann_indexes_lock = threading.Lock()
+
+
+def load_ann_index(index_dir):
+    """
+    Opens the LSH index once per process and returns the cached copy.
+    Returns None if no index was built.
+    """
+    ann_index = _ann_indexes.get(index_dir)
+    if ann_index is not None:
+        return ann_index
+
+    with _ann_indexes_lock:
+        if index_dir not in _ann_indexes:
+            if not os.path.exists(os.path.join(index_dir, "config.json")):
+                return None
+            _ann_indexes[index_dir] = LSHIndex.load(index_dir)
+        return _ann_indexes[index_dir]
+
+
+class ResumeIndexer:
+    def __init__(self):
+        self.ann_index_config = AnnIndexConfig()
+        logging.info("ResumeIndexer component initialized")
+
+    def initiate_index_building(self, preprocessor_obj_path, term_counts_file_path,
+                                term_counts_index_file_path, lsa_vectors_file_path):
+        """
+        Builds the LSH index over the resumes of the transformed corpus,
+        saves it to index_dir and writes its recall report with the
+        corpus's job descriptions as queries. Raises if recall@k is below
+        min_recall. Returns the index directory.
+        """
+        try:
+            config = self.ann_index_config
+            logging.info(f"Building LSH index over {config.vectors} resume vectors")
+
+            index = load_json(term_counts_index_file_path)
+            types = pd.Series(index['types'])
+            resume_rows = np.flatnonzero((types == 'resume').to_numpy())
+            job_rows = np.flatnonzero((types == 'job_description').to_numpy())
+
+            # 1. Vectors of every resume and job, in the row order of the term counts
+            if config.vectors == "lsa":
+                vectors = np.load(lsa_vectors_file_path)
+            else:
+                vectorizer = load_object(file_path=preprocessor_obj_path)
+                vectors = tfidf_from_counts(vectorizer, load_sparse_matrix(term_counts_file_path))
+
+            # 2. Hash the resumes into the tables and save the index
+            lsh_index = LSHIndex(
+                vectors.shape[1], n_tables=config.n_tables, n_bits=config.n_bits,
+                n_probes=config.n_probes, seed=config.seed
+            )
+            lsh_index.add(vectors[resume_rows], np.asarray(index['ids'])[resume_rows])
+            # Serving has to turn a job into the same kind of vector
+            lsh_index.metadata = {"vectors": config.vectors}
+            lsh_index.save(config.index_dir)
+
+            # 3. Recall against exact cosine similarity on the corpus's jobs
+            if len(job_rows):
+                report = recall_at_k(lsh_index, vectors[job_rows], vectors[resume_rows], k=config.report_k)
+                save_json(os.path.join(config.index_dir, "recall_report.json"), report)
+                logging.info(
+                    f"LSH recall@{config.report_k} {report['recall_at_k']:.3f} reranking "
+                    f"{report['candidate_fraction']:.1%} of the resumes, "
+                    f"{report['ann_ms_per_query']:.2f} ms vs {report['exact_ms_per_query']:.2f} ms exact"
+                )
+                if report['recall_at_k'] < config.min_recall:
+                    raise ValueError(
+                        f"LSH index recall@{config.report_k} {report['recall_at_k']:.3f} is below "
+                        f"min_recall {config.min_recall}: use more tables or probes, or fewer bits"
+                    )
+            else:
+                logging.warning("No job descriptions in the corpus: LSH recall was not measured")
+
+            logging.info("LSH index building completed")
+            return config.index_dir
+
+        except Exception as e:
+            logging.error("Error while building the LSH index")
+            raise customException(e, sys)
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from src.exception import customException
+from src.logger import logging
+
+# Layout under root_dir:
+#   versions/<version_id>/       one immutable directory per training run
+#   versions/<version_id>/manifest.json
+#   current                      text file holding the served version_id
+# A version is staged in versions/.staging-*, renamed into place once all
+# files are written, and only then made current by os.replace() on the
+# pointer file. Readers resolve the pointer once and then read files from
+# a directory that never changes, so they cannot see a half-written run.
+MANIFEST_FILE_NAME = "manifest.json"
+POINTER_FILE_NAME = "current"
+STAGING_PREFIX = ".staging-"
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fsync_dir(dir_path):
+    # Makes a rename durable; not supported on every platform
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class ArtifactStoreConfig:
+    root_dir: str = 'artifacts'
+    versions_dir: str = os.path.join('artifacts', 'versions')
+    pointer_file_path: str = os.path.join('artifacts', POINTER_FILE_NAME)
+    # Number of most recent versions kept by gc(); the current version is always kept
+    keep_versions: int = 5
+    # Characters of the content hash used as the version id
+    version_id_length: int = 16
+
+
+class ArtifactStore:
+    def __init__(self):
+        self.store_config = ArtifactStoreConfig()
+        logging.info("ArtifactStore initialized")
+
+    def create_staging_dir(self):
+        """
+        Creates an empty directory for a new version. It lives next to the
+        published versions so the final rename stays on one filesystem.
+        """
+        os.makedirs(self.store_config.versions_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=self.store_config.versions_dir)
+
+    def discard_staging_dir(self, staging_dir):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def build_manifest(self, staging_dir, stage_timings=None, metadata=None):
+        """
+        Lists every staged file with its size and checksum. The version id
+        is derived from the checksums, so identical outputs get the same id.
+        """
+        files = {}
+        for dir_path, _, file_names in os.walk(staging_dir):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                relative_path = os.path.relpath(file_path, staging_dir).replace(os.sep, "/")
+                if relative_path == MANIFEST_FILE_NAME:
+                    continue
+                files[relative_path] = {
+                    "sha256": file_sha256(file_path),
+                    "bytes": os.path.getsize(file_path),
+                }
+
+        content_digest = hashlib.sha256()
+        for relative_path in sorted(files):
+            content_digest.update(f"{relative_path}\0{files[relative_path]['sha256']}\n".encode("utf-8"))
+
+        return {
+            "version": content_digest.hexdigest()[:self.store_config.version_id_length],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "stage_timings_seconds": dict(stage_timings or {}),
+            "metadata": dict(metadata or {}),
+            "files": dict(sorted(files.items())),
+        }
+
+    def publish(self, staging_dir, stage_timings=None, metadata=None):
+        """
+        Moves a staged run into versions/<version_id>, points `current`
+        at it and garbage-collects old versions. Returns the version id.
+        """
+        try:
+            manifest = self.build_manifest(staging_dir, stage_timings, metadata)
+            version = manifest["version"]
+            version_dir = self.version_dir(version)
+
+            if os.path.isdir(version_dir):
+                # Same content was published before; reuse it
+                logging.info(f"Artifacts identical to existing version {version}, reusing it")
+                self.discard_staging_dir(staging_dir)
+            else:
+                with open(os.path.join(staging_dir, MANIFEST_FILE_NAME), "w", encoding="utf-8") as file_obj:
+                    json.dump(manifest, file_obj, indent=2)
+                    file_obj.flush()
+                    os.fsync(file_obj.fileno())
+                os.rename(staging_dir, version_dir)
+                _fsync_dir(self.store_config.versions_dir)
+                logging.info(f"Published artifact version {version} to {version_dir}")
+
+            self.set_current_version(version)
+            self.gc()
+            return version
+
+        except Exception as e:
+            logging.error("Error while publishing artifacts")
+            raise customException(e, sys)
+
+    def set_current_version(self, version):
+        """
+        Atomically points `current` at a published version. Also used to
+        roll back to an older version.
+        """
+        try:
+            if not os.path.isfile(os.path.join(self.version_dir(version), MANIFEST_FILE_NAME)):
+                raise ValueError(f"Artifact version {version} is not published")
+
+            pointer_path = self.store_config.pointer_file_path
+            tmp_path = f"{pointer_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file_obj:
+                file_obj.write(version)
+                file_obj.flush()
+                os.fsync(file_obj.fileno())
+            os.replace(tmp_path, pointer_path)
+            _fsync_dir(os.path.dirname(pointer_path) or ".")
+            logging.info(f"Current artifact version is now {version}")
+
+        except Exception as e:
+            raise customException(e, sys)
+
+    def current_version(self):
+        """
+        Version id `current` points at, or None before the first publish.
+        """
+        try:
+            with open(self.store_config.pointer_file_path, "r", encoding="utf-8") as file_obj:
+                return file_obj.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def version_dir(self, version):
+        return os.path.join(self.store_config.versions_dir, version)
+
+    def resolve(self, relative_path, fallback_path=None):
+        """
+        Path of an artifact in the current version. Falls back to the given
+        path when nothing has been published yet (pre-versioning layout).
+        """
+        version = self.current_version()
+        if version is None:
+            return fallback_path
+        return os.path.join(self.version_dir(version), relative_path)
+
+    def load_manifest(self, version):
+        with open(os.path.join(self.version_dir(version), MANIFEST_FILE_NAME), "r", encoding="utf-8") as file_obj:
+            return json.load(file_obj)
+
+    def list_versions(self):
+        """
+        Published versions, newest first.
+        """
+        versions_dir = self.store_config.versions_dir
+        if not os.path.isdir(versions_dir):
+            return []
+
+        manifests = []
+        for name in os.listdir(versions_dir):
+            if name.startswith(STAGING_PREFIX):
+                continue
+            if os.path.isfile(os.path.join(versions_dir, name, MANIFEST_FILE_NAME)):
+                manifests.append(self.load_manifest(name))
+        manifests.sort(key=lambda manifest: manifest["created_at"], reverse=True)
+        return [manifest["version"] for manifest in manifests]
+
+    def verify(self, version):
+        """
+        Re-computes the checksums of a version. Returns the files that are
+        missing or do not match the manifest.
+        """
+        manifest = self.load_manifest(version)
+        mismatched = []
+        for relative_path, entry in manifest["files"].items():
+            file_path = os.path.join(self.version_dir(version), relative_path)
+            if not os.path.isfile(file_path) or file_sha256(file_path) != entry["sha256"]:
+                mismatched.append(relative_path)
+        return mismatched
+
+    def gc(self, keep_versions=None):
+        """
+        Deletes all but the newest keep_versions versions. The current
+        version is never deleted. Returns the removed version ids.
+        """
+        try:
+            keep_versions = self.store_config.keep_versions if keep_versions is None else keep_versions
+            current = self.current_version()
+            removed = []
+            for version in self.list_versions()[keep_versions:]:
+                if version == current:
+                    continue
+                shutil.rmtree(self.version_dir(version), ignore_errors=True)
+                removed.append(version)
+
+            if removed:
+                logging.info(f"Removed {len(removed)} old artifact versions: {removed}")
+            return removed
+
+        except Exception as e:
+            logging.error("Error while removing old artifact versions")
+            raise customException(e, sys)
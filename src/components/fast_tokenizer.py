@@ -0,0 +1,134 @@
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from src.exception import customException
+from src.logger import logging
+
+# Rough approximation of spaCy's English tokenizer: contractions are split
+# the same way ("don't" -> "do", "n't"), punctuation is dropped, and
+# tokens such as "c++", "c#" and "node.js" are kept whole.
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?=n't\b)|n't|'[^\W_]+|[^\W_]+(?:[.+#][^\W_]+)*[+#]*")
+
+# Documents are first split on whitespace only. A chunk that is not in the
+# lookup table yet (e.g. "python," or "(2022-present)") goes through
+# TOKEN_PATTERN once and its lemma string is memoised, so after warm-up
+# almost every chunk costs a single dict lookup.
+MAX_MEMOISED_CHUNKS = 500000
+
+# TfidfVectorizer's default token_pattern, applied to both outputs in the
+# agreement report so it compares the tokens the vectorizer actually sees
+VECTORIZER_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+class FastTokenizer:
+    """
+    Dependency-light replacement for spacy_tokenizer.
+    Tokenizes with a compiled regex, drops stop words from a
+    frozenset and maps surface forms to lemmas with a lookup table that
+    was generated once from spaCy's output on the training corpus.
+    Tokens never seen during the build are kept as they are.
+    """
+
+    def __init__(self, lemma_table, stop_words):
+        self.lemma_table = dict(lemma_table)
+        self.stop_words = frozenset(stop_words)
+        self._build_lookup()
+
+    def _build_lookup(self):
+        # Single dict lookup per token: stop words map to "" and are filtered out
+        self._lookup = dict(self.lemma_table)
+        self._lookup.update((word, "") for word in self.stop_words)
+
+    def _resolve(self, chunk):
+        get = self._lookup.get
+        lemmas = [get(token, token) for token in TOKEN_PATTERN.findall(chunk)]
+        resolved = " ".join([lemma for lemma in lemmas if lemma])
+        if len(self._lookup) < MAX_MEMOISED_CHUNKS:
+            self._lookup[chunk] = resolved
+        return resolved
+
+    def __call__(self, text):
+        lookup = self._lookup
+        resolve = self._resolve
+        chunks = str(text).lower().split()
+        return " ".join(filter(None, [lookup[chunk] if chunk in lookup else resolve(chunk) for chunk in chunks]))
+
+    def __getstate__(self):
+        # The combined lookup is rebuilt on load rather than pickled twice.
+        # Stop words are sorted so the pickle does not depend on the hash seed.
+        return {"lemma_table": self.lemma_table, "stop_words": sorted(self.stop_words)}
+
+    def __setstate__(self, state):
+        self.lemma_table = state["lemma_table"]
+        self.stop_words = frozenset(state["stop_words"])
+        self._build_lookup()
+
+    @classmethod
+    def from_corpus(cls, texts, batch_size=256, n_process=1, profile=None):
+        """
+        Builds the stop-word set and lemma table from spaCy's output on
+        the given corpus. Each surface form gets its most frequent lemma.
+        """
+        try:
+            from spacy.lang.en.stop_words import STOP_WORDS
+            from src.components.Data_transformation import DEFAULT_SPACY_PROFILE, spacy_docs
+
+            lemma_counts = defaultdict(Counter)
+            stop_words = set(STOP_WORDS)
+            docs = spacy_docs(
+                texts, batch_size=batch_size, n_process=n_process,
+                profile=profile or DEFAULT_SPACY_PROFILE
+            )
+            for doc in docs:
+                for token in doc:
+                    if token.is_stop:
+                        stop_words.add(token.lower_)
+                    elif not (token.is_punct or token.is_space) and token.text.strip():
+                        lemma_counts[token.lower_][token.lemma_] += 1
+
+            lemma_table = {
+                surface: counts.most_common(1)[0][0]
+                for surface, counts in lemma_counts.items()
+                if counts.most_common(1)[0][0] != surface
+            }
+            logging.info(
+                f"Built fast tokenizer with {len(lemma_table)} lemma entries "
+                f"and {len(stop_words)} stop words"
+            )
+            return cls(lemma_table, stop_words)
+
+        except Exception as e:
+            logging.error("Error while building the fast tokenizer")
+            raise customException(e, sys)
+
+
+def agreement_report(tokenizer, texts, reference_lemmas):
+    """
+    Compares a tokenizer against spaCy lemma strings for the same texts,
+    on the tokens TfidfVectorizer would extract from each output.
+    Returns the share of documents with identical token sequences, the
+    mean token Jaccard similarity and the tokenizer's throughput in docs/sec.
+    """
+    start = time.perf_counter()
+    outputs = [tokenizer(text) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    exact = 0
+    jaccard_total = 0.0
+    for fast, reference in zip(outputs, reference_lemmas):
+        fast_tokens = VECTORIZER_TOKEN_PATTERN.findall(fast)
+        reference_tokens = VECTORIZER_TOKEN_PATTERN.findall(reference)
+        exact += fast_tokens == reference_tokens
+
+        fast_set, reference_set = set(fast_tokens), set(reference_tokens)
+        union = fast_set | reference_set
+        jaccard_total += len(fast_set & reference_set) / len(union) if union else 1.0
+
+    n_docs = max(len(outputs), 1)
+    return {
+        "documents": len(outputs),
+        "exact_match_rate": exact / n_docs,
+        "mean_token_jaccard": jaccard_total / n_docs,
+        "docs_per_second": len(outputs) / elapsed if elapsed else float("inf"),
+    }
@@ -0,0 +1,83 @@
+import sys
+import numpy as np
+from scipy.stats import spearmanr
+from sklearn.decomposition import TruncatedSVD
+from src.exception import customException
+from src.logger import logging
+
+
+def _unit_rows(vectors):
+    """
+    L2-normalises the rows in place, so a dot product is a cosine.
+    """
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1
+    vectors /= norms[:, None]
+    return vectors
+
+
+def fit_lsa(tfidf_matrix, n_components, random_state=42):
+    """
+    Fits a TruncatedSVD (LSA) model on the corpus TF-IDF matrix.
+    Returns the model and the documents' unit-length float32 vectors as a
+    C-contiguous (n_documents, n_components) array.
+    """
+    try:
+        # TruncatedSVD needs strictly fewer components than features
+        n_components = max(1, min(n_components, tfidf_matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=n_components, algorithm="randomized", random_state=random_state)
+        vectors = svd.fit_transform(tfidf_matrix)
+        logging.info(
+            f"Fitted LSA with {n_components} components "
+            f"(explained variance {svd.explained_variance_ratio_.sum():.3f})"
+        )
+        return svd, np.ascontiguousarray(_unit_rows(vectors.astype(np.float32)))
+
+    except Exception as e:
+        logging.error("Error while fitting the LSA model")
+        raise customException(e, sys)
+
+
+def project(svd, tfidf_matrix):
+    """
+    Projects new TF-IDF rows into the LSA space of a fitted model.
+    """
+    vectors = np.asarray(tfidf_matrix @ svd.components_.T, dtype=np.float32)
+    return np.ascontiguousarray(_unit_rows(vectors))
+
+
+def dense_scores(resume_vectors, job_vectors):
+    """
+    Cosine similarity of unit-length dense vectors as one BLAS product,
+    shape (n_resumes, n_jobs).
+    """
+    return resume_vectors @ job_vectors.T
+
+
+def ranking_report(sparse_scores, lsa_scores, k=10):
+    """
+    Compares, job by job, how resumes are ranked by the LSA scores and by
+    the exact sparse TF-IDF scores: mean Spearman correlation, overlap of
+    the top-k resumes, and the mean absolute score difference.
+    """
+    sparse_scores = np.asarray(sparse_scores)
+    lsa_scores = np.asarray(lsa_scores)
+    n_resumes, n_jobs = sparse_scores.shape
+    k = min(k, n_resumes)
+
+    correlations, overlaps = [], []
+    for job in range(n_jobs):
+        exact, approx = sparse_scores[:, job], lsa_scores[:, job]
+        if n_resumes > 1 and np.ptp(exact) > 0 and np.ptp(approx) > 0:
+            correlations.append(spearmanr(exact, approx)[0])
+        exact_top = np.argpartition(-exact, k - 1)[:k]
+        approx_top = np.argpartition(-approx, k - 1)[:k]
+        overlaps.append(len(np.intersect1d(exact_top, approx_top)) / k)
+
+    return {
+        "jobs": n_jobs,
+        "resumes": n_resumes,
+        "mean_spearman": float(np.mean(correlations)) if correlations else float("nan"),
+        f"top_{k}_overlap": float(np.mean(overlaps)) if overlaps else float("nan"),
+        "mean_abs_score_diff": float(np.mean(np.abs(sparse_scores - lsa_scores))),
+    }
@@ -0,0 +1,345 @@
+import os
+import re
+import sys
+import json
+import hashlib
+from collections import Counter
+import numpy as np
+import scipy.sparse as sp
+from src.exception import customException
+from src.logger import logging
+
+# On-disk layout of a preprocessor directory (FORMAT_VERSION 2):
+#   config.json        analyzer settings, tokenizer name, kind, dtype, version
+#   idf.npy            IDF per column
+#   terms.bin          UTF-8 bytes of all vocabulary terms in column order
+#   term_offsets.npy   start offset of each term in terms.bin (n_terms + 1)
+#   term_hashes.npy    sorted 64-bit hashes of the terms (FNV-1a of their
+#                      UTF-8 bytes; blake2b in FORMAT_VERSION 1, still read)
+#   term_columns.npy   column of the term behind each entry of term_hashes
+#   fast_tokenizer.json  lemma table and stop words, for the "fast" tokenizer
+# Every .npy file is opened with mmap_mode="r", so loading only maps the
+# files and all worker processes share the same page-cache pages.
+FORMAT_VERSION = 2
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+FNV_OFFSET_BASIS = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def encode_terms(terms):
+    """
+    UTF-8 bytes of all terms as one uint8 array, with the start offset
+    of each term (n_terms + 1).
+    """
+    encoded = [term.encode("utf-8") for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(term) for term in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def term_hashes(term_bytes, offsets):
+    """
+    Stable 64-bit FNV-1a hash of every term (unlike hash(), which is
+    salted per process), one byte position at a time over all terms.
+    """
+    lengths = np.diff(offsets)
+    # Longest terms first, so the terms still being hashed are a prefix
+    order = np.argsort(-lengths, kind="stable")
+    starts, sorted_lengths = offsets[:-1][order], lengths[order]
+    hashes = np.full(len(order), FNV_OFFSET_BASIS, dtype=np.uint64)
+    n_active = len(order)
+    with np.errstate(over="ignore"):
+        # uint64 arithmetic wraps around
+        for position in range(int(sorted_lengths[0]) if len(order) else 0):
+            while sorted_lengths[n_active - 1] <= position:
+                n_active -= 1
+            active = hashes[:n_active]
+            active ^= term_bytes[starts[:n_active] + position]
+            active *= FNV_PRIME
+    unsorted = np.empty_like(hashes)
+    unsorted[order] = hashes
+    return unsorted
+
+
+def blake2b_term_hashes(term_bytes, offsets):
+    """
+    Term hashes of FORMAT_VERSION 1 directories.
+    """
+    return np.fromiter((
+        int.from_bytes(hashlib.blake2b(term_bytes[start:end].tobytes(), digest_size=8).digest(), "little")
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ), dtype=np.uint64, count=len(offsets) - 1)
+
+
+def row_sums_in_order(values, indptr, chunk_rows=256):
+    """
+    Sum of each CSR row, added left to right as sklearn's normalize does,
+    so the norms agree bit for bit with the pickled vectorizer.
+    """
+    lengths = np.diff(indptr)
+    sums = np.zeros(len(lengths), dtype=np.float64)
+    # Rows of similar length are padded with zeros (which leave a sum
+    # unchanged) and summed by cumsum, which adds strictly in order
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, len(order), chunk_rows):
+        rows = order[start:start + chunk_rows]
+        row_lengths = lengths[rows]
+        width = int(row_lengths[-1])
+        if not width:
+            continue
+        within = np.arange(row_lengths.sum()) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        padded = np.zeros((len(rows), width), dtype=np.float64)
+        padded[np.arange(width) < row_lengths[:, None]] = values[np.repeat(indptr[rows], row_lengths) + within]
+        sums[rows] = np.cumsum(padded, axis=1)[:, -1]
+    return sums
+
+
+def _tokenizer_spec(preprocessor):
+    """
+    Names the preprocessor so it can be rebuilt without unpickling.
+    """
+    from src.components.fast_tokenizer import FastTokenizer
+
+    if isinstance(preprocessor, FastTokenizer):
+        return "fast"
+    if getattr(preprocessor, "__name__", None) == "spacy_tokenizer":
+        return "spacy"
+    raise ValueError(f"Preprocessor {preprocessor!r} cannot be stored in the mapped format")
+
+
+def save_mapped_vectorizer(dir_path, vectorizer):
+    """
+    Writes a fitted vectorizer in the memory-mappable format.
+    """
+    try:
+        from src.components.vectorizers import HashingTfidfVectorizer, vocabulary_terms
+
+        os.makedirs(dir_path, exist_ok=True)
+        tokenizer = _tokenizer_spec(vectorizer.preprocessor)
+        config = {
+            "format_version": FORMAT_VERSION,
+            "tokenizer": tokenizer,
+            "ngram_range": list(vectorizer.ngram_range),
+            "token_pattern": getattr(vectorizer, "token_pattern", DEFAULT_TOKEN_PATTERN),
+            "norm": vectorizer.norm,
+            "sublinear_tf": bool(vectorizer.sublinear_tf),
+            "dtype": np.dtype(vectorizer.dtype).name,
+        }
+
+        np.save(os.path.join(dir_path, "idf.npy"), np.asarray(vectorizer.idf_, dtype=vectorizer.dtype))
+
+        if isinstance(vectorizer, HashingTfidfVectorizer):
+            config.update(kind="hashing", n_features=int(vectorizer.n_features))
+        else:
+            terms = vocabulary_terms(vectorizer.vocabulary_)
+            term_bytes, offsets = encode_terms(terms)
+            hashes = term_hashes(term_bytes, offsets)
+            order = np.argsort(hashes, kind="stable")
+
+            with open(os.path.join(dir_path, "terms.bin"), "wb") as terms_file:
+                terms_file.write(term_bytes.tobytes())
+            np.save(os.path.join(dir_path, "term_offsets.npy"), offsets)
+            np.save(os.path.join(dir_path, "term_hashes.npy"), hashes[order])
+            np.save(os.path.join(dir_path, "term_columns.npy"), order.astype(np.int32))
+            config.update(kind="vocabulary", n_features=len(terms))
+
+        if tokenizer == "fast":
+            fast_tokenizer = vectorizer.preprocessor
+            with open(os.path.join(dir_path, "fast_tokenizer.json"), "w", encoding="utf-8") as file_obj:
+                json.dump({
+                    "lemma_table": fast_tokenizer.lemma_table,
+                    "stop_words": sorted(fast_tokenizer.stop_words),
+                }, file_obj)
+
+        # config.json is written last: a directory without it is incomplete
+        with open(os.path.join(dir_path, "config.json"), "w", encoding="utf-8") as file_obj:
+            json.dump(config, file_obj, indent=2)
+
+        logging.info(f"Mapped vectorizer ({config['kind']}, {config['n_features']} features) saved to {dir_path}")
+
+    except Exception as e:
+        raise customException(e, sys)
+
+
+class MappedTfidfVectorizer:
+    """
+    Read-only TF-IDF vectorizer backed by memory-mapped arrays.
+    It reproduces the transform of the vectorizer it was saved from,
+    without sklearn's vocabulary dict and without importing spaCy until
+    the first document is tokenized with the "spacy" tokenizer.
+    """
+
+    def __init__(self, dir_path):
+        self.dir_path = dir_path
+        with open(os.path.join(dir_path, "config.json"), "r", encoding="utf-8") as file_obj:
+            self.config = json.load(file_obj)
+        if self.config.get("format_version") not in (1, FORMAT_VERSION):
+            raise ValueError(
+                f"Unsupported preprocessor format version {self.config.get('format_version')} "
+                f"(expected {FORMAT_VERSION})"
+            )
+        self._term_hashes = term_hashes if self.config["format_version"] == FORMAT_VERSION else blake2b_term_hashes
+
+        self.kind = self.config["kind"]
+        self.n_features = self.config["n_features"]
+        self.ngram_range = tuple(self.config["ngram_range"])
+        self.norm = self.config["norm"]
+        self.sublinear_tf = self.config["sublinear_tf"]
+        self.dtype = np.dtype(self.config["dtype"])
+        self._token_pattern = re.compile(self.config["token_pattern"])
+        self._preprocessor = None
+
+        self.idf_ = np.load(os.path.join(dir_path, "idf.npy"), mmap_mode="r")
+        if self.kind == "vocabulary":
+            self._terms = np.memmap(os.path.join(dir_path, "terms.bin"), dtype=np.uint8, mode="r") \
+                if self.n_features else np.zeros(0, dtype=np.uint8)
+            self._offsets = np.load(os.path.join(dir_path, "term_offsets.npy"), mmap_mode="r")
+            self._hashes = np.load(os.path.join(dir_path, "term_hashes.npy"), mmap_mode="r")
+            self._columns = np.load(os.path.join(dir_path, "term_columns.npy"), mmap_mode="r")
+
+    @property
+    def preprocessor(self):
+        if self._preprocessor is None:
+            if self.config["tokenizer"] == "fast":
+                from src.components.fast_tokenizer import FastTokenizer
+
+                with open(os.path.join(self.dir_path, "fast_tokenizer.json"), "r", encoding="utf-8") as file_obj:
+                    table = json.load(file_obj)
+                self._preprocessor = FastTokenizer(table["lemma_table"], table["stop_words"])
+            else:
+                from src.components.Data_transformation import spacy_tokenizer
+
+                self._preprocessor = spacy_tokenizer
+        return self._preprocessor
+
+    def build_analyzer(self):
+        """
+        Same analysis as sklearn's word analyzer with a custom preprocessor:
+        preprocess, extract tokens with token_pattern, then join n-grams.
+        """
+        preprocessor = self.preprocessor
+        find_tokens = self._token_pattern.findall
+        min_n, max_n = self.ngram_range
+
+        def analyze(document):
+            tokens = find_tokens(preprocessor(document))
+            if max_n == 1:
+                return tokens
+            ngrams = list(tokens) if min_n == 1 else []
+            for n in range(max(min_n, 2), max_n + 1):
+                ngrams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+            return ngrams
+
+        return analyze
+
+    def term_columns(self, terms):
+        """
+        Looks the terms up in the mapped vocabulary. Returns the column of
+        each term, or -1 for terms outside the vocabulary.
+        """
+        columns = np.full(len(terms), -1, dtype=np.int64)
+        n_hashes = len(self._hashes)
+        if n_hashes == 0 or not len(terms):
+            return columns
+
+        # 1. Hash every term and find its hash among the sorted ones
+        term_bytes, offsets = encode_terms(terms)
+        hashes = self._term_hashes(term_bytes, offsets)
+        positions = np.searchsorted(self._hashes, hashes)
+        candidates = np.flatnonzero(self._hashes[np.minimum(positions, n_hashes - 1)] == hashes)
+
+        # 2. Confirm the matches on the stored bytes, all candidates at once
+        candidate_columns = np.asarray(self._columns[positions[candidates]], dtype=np.int64)
+        matched = self._same_bytes(term_bytes, offsets, candidates, candidate_columns)
+        columns[candidates[matched]] = candidate_columns[matched]
+
+        # 3. Hash collisions: equal hashes are adjacent, try the next ones
+        for i in candidates[~matched]:
+            encoded = term_bytes[offsets[i]:offsets[i + 1]].tobytes()
+            position = positions[i] + 1
+            while position < n_hashes and self._hashes[position] == hashes[i]:
+                column = self._columns[position]
+                if self._terms[self._offsets[column]:self._offsets[column + 1]].tobytes() == encoded:
+                    columns[i] = column
+                    break
+                position += 1
+        return columns
+
+    def _same_bytes(self, term_bytes, offsets, rows, columns):
+        """
+        Whether each term rows[i] (of term_bytes/offsets) has the bytes of
+        the vocabulary term in columns[i].
+        """
+        lengths = offsets[rows + 1] - offsets[rows]
+        stored_starts = np.asarray(self._offsets[columns])
+        same = np.asarray(self._offsets[columns + 1]) - stored_starts == lengths
+        rows, lengths, stored_starts = rows[same], lengths[same], stored_starts[same]
+        # Byte k of the j-th compared term sits at start + k on both sides
+        term_of_byte = np.repeat(np.arange(len(rows)), lengths)
+        within = np.arange(len(term_of_byte)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        differ = term_bytes[offsets[rows][term_of_byte] + within] != self._terms[stored_starts[term_of_byte] + within]
+        same[np.flatnonzero(same)] = np.bincount(term_of_byte[differ], minlength=len(rows)) == 0
+        return same
+
+    def term_counts(self, raw_documents):
+        """
+        Raw term-count matrix of the documents in the mapped column space.
+        The distinct terms of the whole batch are looked up together.
+        """
+        if self.kind == "hashing":
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            return HashingVectorizer(
+                preprocessor=self.preprocessor, ngram_range=self.ngram_range,
+                token_pattern=self.config["token_pattern"], n_features=self.n_features,
+                alternate_sign=False, norm=None
+            ).transform(raw_documents)
+
+        analyze = self.build_analyzer()
+        batch_terms = {}
+        indptr, term_ids, values = [0], [], []
+        for document in raw_documents:
+            counts = Counter(analyze(document))
+            term_ids.extend(batch_terms.setdefault(term, len(batch_terms)) for term in counts)
+            values.extend(counts.values())
+            indptr.append(len(term_ids))
+
+        columns = self.term_columns(list(batch_terms))[np.asarray(term_ids, dtype=np.int64)]
+        found = columns >= 0
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))[found]
+        return sp.csr_matrix(
+            (np.asarray(values, dtype=np.float64)[found], columns[found],
+             np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(indptr) - 1))])),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+
+    def transform(self, raw_documents):
+        X = sp.csr_matrix(self.term_counts(raw_documents), dtype=self.dtype)
+        X.sum_duplicates()
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        X.data *= np.asarray(self.idf_)[X.indices]
+        if self.norm == "l2":
+            norms = np.sqrt(row_sums_in_order(X.data * X.data, X.indptr))
+        elif self.norm == "l1":
+            norms = row_sums_in_order(np.abs(X.data), X.indptr)
+        else:
+            norms = None
+        if norms is not None:
+            norms[norms == 0] = 1
+            X.data /= np.repeat(norms, np.diff(X.indptr))
+        return X
+
+
+def load_mapped_vectorizer(dir_path):
+    """
+    Opens a preprocessor directory written by save_mapped_vectorizer.
+    """
+    try:
+        vectorizer = MappedTfidfVectorizer(dir_path)
+        logging.info(f"Mapped vectorizer loaded from {dir_path}")
+        return vectorizer
+
+    except Exception as e:
+        raise customException(e, sys)
@@ -1,76 +1,409 @@
 import sys
 import os
+import importlib.util
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
+from typing import Optional
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.utils.extmath import safe_sparse_dot
 from src.exception import customException
 from src.logger import logging
-from src.utils import load_object
+from src.utils import load_json, load_object, load_sparse_matrix
+from src.components.lsa import dense_scores
+from src.components.retrieval import BM25Index, bm25_query_matrix
+from src.components.score_distribution import RECORDED_SCORES_FILE_PATH, ScoreDistributions
+from src.components.score_store import ScoreStore, model_version, row_fingerprints
+from src.components.similarity import blocked_pairs_above, blocked_top_k, score_summary
+from src.components.vectorizers import tfidf_from_counts
 
 @dataclass
 class ModelTrainerConfig:
-    # We will save the final scores as a CSV in the artifacts folder
+    # We will save the final scores in the artifacts folder. The extension
+    # picks the format: ".csv" is the resume x job grid, ".npy" (a structured
+    # array) and ".parquet" are long-format (resume_id, job_id, score) rows
     scores_file_path: str = os.path.join('artifacts', 'ats_scores.csv')
+    # Long formats only keep pairs scoring at least this many pp (and, with
+    # top_k_per_job set, only the top-k pairs)
+    score_threshold: Optional[float] = None
+    # "sparse" scores on the TF-IDF vectors; "lsa" scores on the dense LSA
+    # vectors written by DataTransformation (lsa_components must be set);
+    # "bm25" scores the resumes' BM25 postings against the jobs' terms
+    scoring: str = "sparse"
+    # BM25 index over the resumes, written when scoring with "bm25"
+    bm25_index_dir: str = os.path.join('artifacts', 'bm25_index')
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    lsa_vectors_file_path: str = os.path.join('artifacts', 'lsa_vectors.npy')
+    lsa_obj_file_path: str = os.path.join('artifacts', 'lsa.pkl')
+    term_counts_index_file_path: str = os.path.join('artifacts', 'term_counts_index.json')
+    # Written by DataTransformation: scoring reuses these counts, and the
+    # serving check loads the mapped preprocessor like PredictionPipeline
+    term_counts_file_path: str = os.path.join('artifacts', 'term_counts.npz')
+    preprocessor_dir: str = os.path.join('artifacts', 'preprocessor')
+    # Number of (resume, job) pairs re-scored through the serving path after
+    # training (0 disables the check), and the allowed difference in pp
+    serving_check_pairs: int = 0
+    serving_check_tolerance: float = 0.01
+    # Blocked top-k scoring: when top_k_per_job is set, only the best
+    # top_k_per_job resumes of every job (and, optionally, the best
+    # top_k_per_resume jobs of every resume) are kept, in long format,
+    # instead of the full resume x job matrix. Blocks of resumes are sized
+    # so that one block's scores fit memory_budget_mb.
+    top_k_per_job: Optional[int] = None
+    top_k_per_resume: Optional[int] = None
+    memory_budget_mb: int = 256
+    # Blocks are scored by n_workers "thread" or "process" workers; the
+    # budget is shared between them and results do not depend on the count
+    n_workers: int = 1
+    executor: str = "thread"
+    # Persistent score store (see score_store.py) for all-pairs scoring: when
+    # set, only pairs that are new or were scored by another model version
+    # (preprocessor, plus the LSA model or, for BM25, the corpus term counts
+    # when scoring on them) are computed
+    score_store_dir: Optional[str] = None
+    # Sorted per-job score distributions for percentile ranks at serving
+    # time (see score_distribution.py). They need every pair to be scored:
+    # a score_threshold run then scores the full grid, and top_k_per_job
+    # runs must unset them (as well as score_store_dir)
+    score_distributions_dir: Optional[str] = os.path.join('artifacts', 'score_distributions')
+    # Scores recorded at serving time for trained jobs (see record_score),
+    # added to the distributions of those jobs
+    recorded_scores_file_path: Optional[str] = RECORDED_SCORES_FILE_PATH
+    top_k_scores_file_path: str = os.path.join('artifacts', 'ats_top_k.csv')
+    top_k_per_resume_file_path: str = os.path.join('artifacts', 'ats_top_k_per_resume.csv')
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
         logging.info("ModelTrainer component initialized")
 
-    def initiate_model_training(self, processed_data_path, preprocessor_obj_path):
+    def split_rows(self):
         """
-        This function loads the data and the fitted preprocessor,
-        transforms the text, and calculates the similarity matrix.
+        Row positions of the resumes and jobs in the cached term counts
+        (and LSA vectors), and the ids of all rows.
         """
-        try:
-            logging.info("Model training (scoring) process started")
+        index = load_json(self.model_trainer_config.term_counts_index_file_path)
+        types = np.asarray(index['types'])
+        ids = np.asarray(index['ids'])
+        resume_rows = np.flatnonzero(types == 'resume')
+        job_rows = np.flatnonzero(types == 'job_description')
 
-            # 1. Load the processed data and the fitted vectorizer
-            df = pd.read_csv(processed_data_path)
-            vectorizer = load_object(file_path=preprocessor_obj_path)
-            logging.info("Loaded processed data and preprocessor object")
+        if not len(job_rows) or not len(resume_rows):
+            raise customException("No jobs or resumes to compare.", sys)
+        return resume_rows, job_rows, ids
 
-            # 2. Separate jobs and resumes from the loaded DataFrame
-            jobs_df = df[df['type'] == 'job_description'].reset_index(drop=True)
-            resumes_df = df[df['type'] == 'resume'].reset_index(drop=True)
+    def lsa_vectors(self):
+        """
+        Resume and job LSA vectors saved by DataTransformation, with their ids.
+        """
+        lsa_vectors = np.load(self.model_trainer_config.lsa_vectors_file_path)
+        resume_rows, job_rows, ids = self.split_rows()
+        if len(ids) != len(lsa_vectors):
+            raise customException("LSA vectors do not match the term counts index. Re-run the transformation.", sys)
 
-            if jobs_df.empty or resumes_df.empty:
-                raise customException("No jobs or resumes to compare.", sys)
+        return lsa_vectors[resume_rows], lsa_vectors[job_rows], ids[resume_rows], ids[job_rows]
 
-            # 3. Transform the text data using the *loaded* vectorizer
-            
-            logging.info("Transforming job and resume text into TF-IDF vectors...")
-            vectorizer.fit(jobs_df['text'].astype(str))
-            job_vectors = vectorizer.transform(jobs_df['text'].astype(str))
-            resume_vectors = vectorizer.transform(resumes_df['text'].astype(str))
-            
-            
+    def sparse_vectors(self, preprocessor_obj_path):
+        """
+        Resume and job TF-IDF vectors, with their ids. The vectors are
+        rebuilt from the term counts cached by DataTransformation and the
+        persisted corpus-wide fit, so no text is tokenized or lemmatized here.
+        """
+        # 1. Load the fitted vectorizer and the cached corpus term counts
+        vectorizer = load_object(file_path=preprocessor_obj_path)
+        term_counts = load_sparse_matrix(self.model_trainer_config.term_counts_file_path)
+        logging.info("Loaded preprocessor object and cached term counts")
 
-            # 4. Calculate Cosine Similarity
-            
-            logging.info("Calculating cosine similarity matrix...")
-            similarity_matrix = cosine_similarity(resume_vectors, job_vectors)
-            
-            
+        # 2. Separate jobs and resumes by the row types of the term counts
+        resume_rows, job_rows, ids = self.split_rows()
 
-            # 5. Format the results into a readable DataFrame
-            resume_ids = resumes_df['id']
-            job_ids = jobs_df['id']
+        # 3. TF-IDF vectors: the saved IDF applied to the cached counts
+        logging.info("Building job and resume TF-IDF vectors from cached term counts...")
+        tfidf = tfidf_from_counts(vectorizer, term_counts)
+        return tfidf[resume_rows], tfidf[job_rows], ids[resume_rows], ids[job_rows]
 
-            scores_df = pd.DataFrame(similarity_matrix, index=resume_ids, columns=job_ids)
+    def bm25_vectors(self):
+        """
+        Resume BM25 term scores and normalised job term counts, with their
+        ids: their products are BM25 scores in [0, 1). The index over the
+        resumes is built from the cached term counts and saved for serving.
+        """
+        config = self.model_trainer_config
+        term_counts = load_sparse_matrix(config.term_counts_file_path)
+        resume_rows, job_rows, ids = self.split_rows()
+
+        logging.info("Building the BM25 index over the resumes from cached term counts...")
+        bm25_index = BM25Index.build(
+            term_counts[resume_rows], ids[resume_rows], rows=resume_rows,
+            terms=load_json(config.term_counts_index_file_path).get('vocabulary'),
+            k1=config.bm25_k1, b=config.bm25_b
+        )
+        bm25_index.save(config.bm25_index_dir)
+        job_vectors = bm25_query_matrix(bm25_index, term_counts[job_rows])
+        return bm25_index.postings.tocsr(), job_vectors, ids[resume_rows], ids[job_rows]
+
+    def save_top_k(self, top_k, resume_ids, job_ids):
+        """
+        Writes the top-k scores in long format: one row per (job, rank)
+        and, if computed, one row per (resume, rank).
+        """
+        config = self.model_trainer_config
+        k, n_jobs = top_k.job_scores.shape
+        top_k_df = pd.DataFrame({
+            'job_id': np.tile(job_ids, k),
+            'rank': np.repeat(np.arange(1, k + 1), n_jobs),
+            'resume_id': resume_ids[top_k.job_resume_rows.ravel()],
+            'score': np.round(top_k.job_scores.ravel().astype(np.float64) * 100, 2),
+        }).sort_values(['job_id', 'rank'], kind='stable')
+        os.makedirs(os.path.dirname(config.top_k_scores_file_path) or '.', exist_ok=True)
+        top_k_df.to_csv(config.top_k_scores_file_path, index=False)
+        logging.info(f"Top-{k} resumes per job saved to {config.top_k_scores_file_path}")
 
-            
-            scores_df = scores_df.apply(lambda x: round(x * 100, 2))
+        if top_k.resume_scores is not None:
+            n_resumes, k = top_k.resume_scores.shape
+            pd.DataFrame({
+                'resume_id': np.repeat(resume_ids, k),
+                'rank': np.tile(np.arange(1, k + 1), n_resumes),
+                'job_id': job_ids[top_k.resume_job_rows.ravel()],
+                'score': np.round(top_k.resume_scores.ravel().astype(np.float64) * 100, 2),
+            }).to_csv(config.top_k_per_resume_file_path, index=False)
+            logging.info(f"Top-{k} jobs per resume saved to {config.top_k_per_resume_file_path}")
 
-            logging.info(f"Calculated Scores:\n{scores_df}")
+        return top_k_df
 
-            # 6. Save the scores CSV to the artifacts folder
-            scores_df.to_csv(self.model_trainer_config.scores_file_path)
-            logging.info(f"Scores saved to {self.model_trainer_config.scores_file_path}")
+    def save_long_scores(self, resume_ids, job_ids, scores):
+        """
+        Writes (resume_id, job_id, score) rows, scores in pp, to
+        scores_file_path as a structured NPY array or a Parquet file.
+        """
+        path = self.model_trainer_config.scores_file_path
+        extension = os.path.splitext(path)[1]
+        resume_ids, job_ids = np.asarray(resume_ids).astype(str), np.asarray(job_ids).astype(str)
+        scores = np.asarray(scores, dtype=np.float32)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        if extension == '.npy':
+            table = np.empty(len(scores), dtype=[
+                ('resume_id', resume_ids.dtype), ('job_id', job_ids.dtype), ('score', np.float32)
+            ])
+            table['resume_id'], table['job_id'], table['score'] = resume_ids, job_ids, scores
+            np.save(path, table)
+        elif extension == '.parquet':
+            pd.DataFrame({'resume_id': resume_ids, 'job_id': job_ids, 'score': scores}).to_parquet(path, index=False)
+        else:
+            raise customException(f"Unsupported long-format scores file: {path}", sys)
+        logging.info(f"{len(scores)} long-format scores saved to {path}")
+
+    def check_scores_file_format(self):
+        """
+        Rejects an unsupported scores_file_path before any scoring is done.
+        """
+        path = self.model_trainer_config.scores_file_path
+        extension = os.path.splitext(path)[1]
+        if extension not in ('.csv', '.npy', '.parquet'):
+            raise customException(f"Unsupported scores file: {path} (use .csv, .npy or .parquet)", sys)
+        if extension == '.parquet' and importlib.util.find_spec('pyarrow') is None:
+            raise customException(
+                f"Writing {path} needs pyarrow (see requirements.txt); install it or use a .npy scores file", sys
+            )
+
+    def check_top_k_options(self):
+        """
+        Rejects options that top-k scoring cannot honour, since it never
+        holds every resume x job score.
+        """
+        config = self.model_trainer_config
+        if not config.top_k_per_job:
+            return
+        incompatible = []
+        if os.path.splitext(config.scores_file_path)[1] == '.csv':
+            incompatible.append(f"a resume x job grid in {config.scores_file_path} (use a .npy or .parquet file)")
+        if config.score_store_dir:
+            incompatible.append("score_store_dir")
+        if config.score_distributions_dir:
+            incompatible.append("score_distributions_dir")
+        if incompatible:
+            raise customException(
+                f"top_k_per_job only keeps the best pairs, so it cannot write {', '.join(incompatible)}. "
+                "Unset these options or top_k_per_job.", sys
+            )
+
+    def score_grid(self, resume_vectors, job_vectors, resume_ids, job_ids, preprocessor_obj_path):
+        """
+        Every resume x job score in pp. With score_store_dir set, the scores
+        come from the persistent score store, which only computes the pairs
+        it does not hold yet for the current model version.
+        """
+        config = self.model_trainer_config
+
+        def score_pairs(rows, columns):
+            if config.scoring == "lsa":
+                similarity_matrix = dense_scores(resume_vectors[rows], job_vectors[columns])
+            elif config.scoring == "bm25":
+                similarity_matrix = safe_sparse_dot(resume_vectors[rows], job_vectors[columns].T, dense_output=True)
+            else:
+                similarity_matrix = cosine_similarity(resume_vectors[rows], job_vectors[columns])
+            return np.round(similarity_matrix * 100, 2)
+
+        if not config.score_store_dir:
+            logging.info(f"Calculating {config.scoring} similarity matrix...")
+            return score_pairs(slice(None), slice(None))
+
+        fitted_files = [preprocessor_obj_path]
+        if config.scoring == "lsa":
+            fitted_files.append(config.lsa_obj_file_path)
+        elif config.scoring == "bm25":
+            # The IDF and average length come from the whole resume corpus
+            fitted_files.append(config.term_counts_file_path)
+        version = model_version(config.scoring, *fitted_files)
+        # An edited document keeps its id, so its term counts tell it apart
+        term_counts = load_sparse_matrix(config.term_counts_file_path)
+        resume_rows, job_rows, _ = self.split_rows()
+        store = ScoreStore.load(config.score_store_dir)
+        store.refresh(
+            resume_ids, job_ids, version, score_pairs,
+            resume_fingerprints=row_fingerprints(term_counts[resume_rows]),
+            job_fingerprints=row_fingerprints(term_counts[job_rows])
+        )
+        if store.modified:
+            # Otherwise the files linked from the previous version stay shared
+            store.save(config.score_store_dir)
+        return store.scores
+
+    def check_against_serving(self, scored_pairs, processed_data_path, preprocessor_obj_path):
+        """
+        Re-scores a sample of (resume_id, job_id, score) triples from their
+        raw text with the serving code path (PredictionPipeline.score_texts
+        on the saved preprocessor) and raises if any score differs from the
+        trained one. Only documents present in processed_data_path can be
+        sampled.
+        """
+        from src.pipeline.prediction_pipeline import PredictionPipeline
+
+        config = self.model_trainer_config
+        texts = pd.read_csv(processed_data_path).astype({'id': str}).set_index('id')['text'].astype(str)
+        serving = PredictionPipeline(scoring=config.scoring)
+        serving.preprocessor_path = preprocessor_obj_path
+        serving.preprocessor_dir = config.preprocessor_dir
+        serving.bm25_index_dir = config.bm25_index_dir
+
+        candidates = [
+            (resume_id, job_id, score) for resume_id, job_id, score in scored_pairs
+            if str(resume_id) in texts.index and str(job_id) in texts.index
+        ]
+        rng = np.random.default_rng(0)
+        n_pairs = min(config.serving_check_pairs, len(candidates))
+        sample = [candidates[i] for i in rng.choice(len(candidates), size=n_pairs, replace=False)]
+
+        max_diff = 0.0
+        for resume_id, job_id, score in sample:
+            served = serving.score_texts(texts[str(resume_id)], texts[str(job_id)])
+            max_diff = max(max_diff, abs(float(served) - float(score)))
+
+        logging.info(f"Checked {n_pairs} scores against serving, max difference {max_diff:.4f} pp")
+        if max_diff > config.serving_check_tolerance:
+            raise customException(
+                f"Trained scores differ from serving by up to {max_diff:.4f} pp "
+                f"(tolerance {config.serving_check_tolerance})", sys
+            )
+        return max_diff
+
+    def initiate_model_training(self, processed_data_path, preprocessor_obj_path):
+        """
+        This function loads the fitted preprocessor and the cached document
+        vectors, and calculates the similarity matrix (or, with
+        top_k_per_job set, only the top-k scores). With a score store, only
+        new or stale pairs are calculated.
+        """
+        try:
+            logging.info("Model training (scoring) process started")
+            config = self.model_trainer_config
+            self.check_scores_file_format()
+            self.check_top_k_options()
+            long_format = os.path.splitext(config.scores_file_path)[1] != '.csv'
+
+            if config.scoring == "lsa":
+                resume_vectors, job_vectors, resume_ids, job_ids = self.lsa_vectors()
+            elif config.scoring == "bm25":
+                resume_vectors, job_vectors, resume_ids, job_ids = self.bm25_vectors()
+            else:
+                resume_vectors, job_vectors, resume_ids, job_ids = self.sparse_vectors(preprocessor_obj_path)
+
+            if config.top_k_per_job:
+                # 4. Blocked top-k: peak memory follows the budget, not resumes x jobs
+                logging.info(f"Calculating top-{config.top_k_per_job} scores per job in blocks...")
+                top_k = blocked_top_k(
+                    resume_vectors, job_vectors, k_per_job=config.top_k_per_job,
+                    k_per_resume=config.top_k_per_resume, memory_budget_mb=config.memory_budget_mb,
+                    n_workers=config.n_workers, executor=config.executor, cosine=config.scoring != "bm25"
+                )
+
+                # 5. Save the scores in long format
+                top_k_df = self.save_top_k(top_k, resume_ids, job_ids)
+                if long_format:
+                    if config.score_threshold is not None:
+                        top_k_df = top_k_df[top_k_df['score'] >= config.score_threshold]
+                    self.save_long_scores(top_k_df['resume_id'], top_k_df['job_id'], top_k_df['score'])
+                logging.info(f"Score summary (pp): {score_summary(top_k_df['score'])}")
+                scored_pairs = top_k_df[['resume_id', 'job_id', 'score']].itertuples(index=False)
+            elif long_format and config.score_threshold is not None and not config.score_store_dir \
+                    and not config.score_distributions_dir:
+                # 4. Only pairs above the threshold, found block by block (the
+                # store and the distributions need every score, see below)
+                logging.info(f"Calculating pairs scoring >= {config.score_threshold} pp in blocks...")
+                # Half a rounding step lower, so that the rounded scores decide
+                rows, columns, scores = blocked_pairs_above(
+                    resume_vectors, job_vectors, (config.score_threshold - 0.005) / 100,
+                    memory_budget_mb=config.memory_budget_mb, cosine=config.scoring != "bm25"
+                )
+
+                # 5. Round in pp and save in long format
+                scores = np.round(scores * 100, 2)
+                keep = scores >= config.score_threshold
+                rows, columns, scores = rows[keep], columns[keep], scores[keep]
+                logging.info(f"Score summary (pp): {score_summary(scores)}")
+                self.save_long_scores(resume_ids[rows], job_ids[columns], scores)
+                scored_pairs = zip(resume_ids[rows], job_ids[columns], scores)
+            else:
+                # 4. All resume x job scores in pp
+                score_grid = self.score_grid(resume_vectors, job_vectors, resume_ids, job_ids, preprocessor_obj_path)
+                logging.info(f"Score summary (pp): {score_summary(score_grid)}")
+                if config.score_distributions_dir:
+                    distributions = ScoreDistributions.from_score_grid(job_ids, score_grid, config.scoring)
+                    if config.recorded_scores_file_path:
+                        distributions.add_recorded(config.recorded_scores_file_path)
+                    distributions.save(config.score_distributions_dir)
+
+                if long_format:
+                    # 5. Save in long format, above the threshold if one is set
+                    rows, columns = np.divmod(np.arange(score_grid.size), len(job_ids))
+                    scores = score_grid.ravel()
+                    if config.score_threshold is not None:
+                        keep = scores >= config.score_threshold
+                        rows, columns, scores = rows[keep], columns[keep], scores[keep]
+                    self.save_long_scores(resume_ids[rows], job_ids[columns], scores)
+                    scored_pairs = zip(resume_ids[rows], job_ids[columns], scores)
+                else:
+                    # 5. Format the results into a readable DataFrame
+                    scores_df = pd.DataFrame(
+                        score_grid, index=pd.Index(resume_ids, name='id'), columns=pd.Index(job_ids, name='id')
+                    )
+
+                    # 6. Save the scores CSV to the artifacts folder
+                    scores_df.to_csv(config.scores_file_path)
+                    logging.info(f"Scores saved to {config.scores_file_path}")
+                    scored_pairs = (
+                        (resume_id, job_id, scores_df.at[resume_id, job_id])
+                        for resume_id in scores_df.index for job_id in scores_df.columns
+                    )
+
+            # 7. Optionally confirm that serving computes the same scores
+            if config.serving_check_pairs and config.scoring != "lsa":
+                self.check_against_serving(scored_pairs, processed_data_path, preprocessor_obj_path)
 
             logging.info("Model training (scoring) process completed")
 
         except Exception as e:
             logging.error("Error during model training/scoring")
             raise customException(e, sys)
-
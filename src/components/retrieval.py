@@ -0,0 +1,615 @@
+import os
+import sys
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from dataclasses import dataclass
+from sklearn.metrics.pairwise import cosine_similarity
+from src.exception import customException
+from src.logger import logging
+from src.utils import load_json, load_object, load_sparse_matrix, save_json
+from src.components.similarity import top_k_per_row
+from src.components.vectorizers import term_count_matrix, tfidf_from_counts
+
+# On-disk layout of a BM25 index directory (FORMAT_VERSION 2):
+#   config.json        k1, b, sizes and average document length
+#   columns.npy        sorted vectorizer columns that are indexed (the unigrams)
+#   idf.npy            float32 BM25 IDF of every indexed column
+#   doc_lengths.npy    float32 length (in indexed terms) of every document
+#   postings_indptr.npy, postings_rows.npy, postings_impacts.npy
+#                      CSC postings: per indexed column, the documents that
+#                      contain it and their precomputed BM25 term scores
+#   max_impacts.npy    float32 highest term score of every indexed column,
+#                      the upper bounds used to prune queries
+#   ids.npy, rows.npy  document ids and their rows in the cached term counts
+#   recall_report.json (optional) cascade recall against brute force
+FORMAT_VERSION = 2
+# A pruned query looks candidates up by binary search in a posting list
+# longer than PROBE_RATIO times their number, and scans shorter lists
+PROBE_RATIO = 8
+
+
+@dataclass
+class CascadeConfig:
+    # Built by the training pipeline only when enabled
+    enabled: bool = False
+    index_dir: str = os.path.join('artifacts', 'bm25_index')
+    # BM25 term-frequency saturation and length normalisation
+    k1: float = 1.2
+    b: float = 0.75
+    # Resumes passed from the BM25 stage to the exact cosine rerank
+    n_candidates: int = 2000
+    # MaxScore pruning of the BM25 stage (same candidates, fewer postings
+    # read); pays off on large indexes, see benchmarks/bench_bm25_pruning.py
+    prune: bool = False
+    # Recall report written next to the index: the corpus's job descriptions
+    # are ranked with each cut-off and compared with brute force
+    report_k: int = 10
+    report_cutoffs: tuple = (100, 500, 2000)
+
+
+def unigram_columns(terms, n_features):
+    """
+    Columns of the single-word terms of a vocabulary, or every column
+    when there is no vocabulary (hashed features).
+    """
+    if terms is None:
+        return np.arange(n_features, dtype=np.int64)
+    return np.flatnonzero([" " not in term for term in terms]).astype(np.int64)
+
+
+def bm25_idf(document_frequency, n_docs):
+    # The "+1" (Lucene) form, which never goes negative for very common terms
+    return np.log1p((n_docs - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+
+
+def average_length(doc_lengths):
+    # 1.0 for an empty corpus, so length normalisation stays defined
+    mean = float(np.mean(doc_lengths)) if len(doc_lengths) else 0.0
+    return mean if mean > 0 else 1.0
+
+
+def column_max(matrix):
+    """
+    Largest value of every column of a CSC matrix (0 for empty columns).
+    """
+    maxima = np.zeros(matrix.shape[1], dtype=matrix.dtype)
+    nonempty = np.flatnonzero(np.diff(matrix.indptr))
+    if len(nonempty):
+        maxima[nonempty] = np.maximum.reduceat(np.asarray(matrix.data), matrix.indptr[nonempty])
+    return maxima
+
+
+def bm25_impacts(term_counts, doc_lengths, avg_doc_length, idf, k1, b):
+    """
+    BM25 score contribution of every (document, term) entry of a CSR
+    term-count matrix, as a float32 CSR matrix of the same shape.
+    """
+    term_counts = sp.csr_matrix(term_counts, dtype=np.float32)
+    rows = np.repeat(np.arange(term_counts.shape[0]), np.diff(term_counts.indptr))
+    length_norm = k1 * (1 - b + b * doc_lengths / avg_doc_length)
+    tf = term_counts.data
+    impacts = (tf * (k1 + 1) / (tf + length_norm[rows]) * idf[term_counts.indices]).astype(np.float32)
+    return sp.csr_matrix((impacts, term_counts.indices, term_counts.indptr), shape=term_counts.shape)
+
+
+def select_top(positions, scores, n):
+    """
+    Up to n of the positions (ascending) with the best positive scores,
+    best first; equal scores keep the lower position first.
+    """
+    matching = np.flatnonzero(scores > 0)
+    if len(matching) > n:
+        matching = matching[top_k_per_row(scores[matching][None, :], n)[0]]
+    else:
+        matching = matching[np.argsort(-scores[matching], kind="stable")]
+    return positions[matching], scores[matching]
+
+
+class BM25Index:
+    """
+    BM25 over the unigram columns of the cached term counts. The IDF,
+    document lengths and per-posting term scores are computed once at
+    build time, so scoring a query only sums the postings of its terms.
+    The highest term score of every column bounds what a term can add,
+    which lets top() skip most postings (MaxScore).
+    """
+
+    def __init__(self, columns, idf, doc_lengths, postings, ids, rows, k1=1.2, b=0.75, max_impacts=None):
+        self.columns = columns
+        self.idf = idf
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = average_length(doc_lengths)
+        self.postings = postings
+        self.max_impacts = column_max(postings) if max_impacts is None else max_impacts
+        self.ids = ids
+        self.rows = rows
+        self.k1 = k1
+        self.b = b
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, term_counts, ids, rows=None, terms=None, k1=1.2, b=0.75):
+        """
+        Indexes the documents of a term-count matrix (one row per document,
+        vectorizer columns). terms is the vectorizer's vocabulary in column
+        order, used to keep the unigram columns only.
+        """
+        columns = unigram_columns(terms, term_counts.shape[1])
+        counts = sp.csr_matrix(term_counts)[:, columns]
+        doc_lengths = np.asarray(counts.sum(axis=1), dtype=np.float32).ravel()
+        counts.sum_duplicates()
+        idf = bm25_idf(np.bincount(counts.indices, minlength=len(columns)), counts.shape[0])
+        postings = bm25_impacts(counts, doc_lengths, average_length(doc_lengths), idf, k1, b).tocsc()
+        rows = np.arange(len(ids)) if rows is None else rows
+        return cls(columns, idf, doc_lengths, postings, np.asarray(ids), np.asarray(rows), k1, b)
+
+    def query_terms(self, query_counts):
+        """
+        Indexed term positions and counts of a single query given as a
+        (1, n_features) term-count row in vectorizer columns.
+        """
+        query_counts = sp.csr_matrix(query_counts)
+        query_counts.sum_duplicates()
+        positions = np.searchsorted(self.columns, query_counts.indices)
+        found = positions < len(self.columns)
+        found[found] = self.columns[positions[found]] == query_counts.indices[found]
+        return positions[found], query_counts.data[found].astype(np.float32)
+
+    def scores(self, query_counts):
+        """
+        BM25 score of every document for one query (dense, float32).
+        """
+        terms, query_tf = self.query_terms(query_counts)
+        if not len(terms):
+            return np.zeros(len(self), dtype=np.float32)
+        # Only the postings of the query's terms are touched
+        return np.asarray(self.postings[:, terms] @ query_tf, dtype=np.float32).ravel()
+
+    def term_postings(self, term):
+        """
+        Document positions (ascending) and term scores of one indexed column.
+        """
+        start, end = self.postings.indptr[term], self.postings.indptr[term + 1]
+        return self.postings.indices[start:end], self.postings.data[start:end]
+
+    def term_scores(self, term, positions):
+        """
+        Term scores of the documents at sorted positions (0 where the
+        document lacks the term), found by binary search in the postings.
+        """
+        term_rows, impacts = self.term_postings(term)
+        if not len(term_rows):
+            return np.zeros(len(positions), dtype=np.float32), 0
+        found = np.minimum(np.searchsorted(term_rows, positions), len(term_rows) - 1)
+        hit = term_rows[found] == positions
+        return np.where(hit, impacts[found], 0).astype(np.float32), int(hit.sum())
+
+    def term_score_matrix(self, terms, positions):
+        """
+        (len(terms), len(positions)) term scores of the documents at sorted
+        positions, with one vectorized binary search over all the terms'
+        posting lists at once (for few positions and many terms).
+        """
+        indptr, term_rows = self.postings.indptr, self.postings.indices
+        low = np.repeat(np.asarray(indptr[terms], dtype=np.int64)[:, None], len(positions), axis=1)
+        end = np.repeat(np.asarray(indptr[np.asarray(terms) + 1], dtype=np.int64)[:, None], len(positions), axis=1)
+        high = end.copy()
+        positions = np.broadcast_to(positions, low.shape)
+        while True:
+            searching = low < high
+            if not searching.any():
+                break
+            middle = (low + high) // 2
+            right = searching & (term_rows[np.minimum(middle, len(term_rows) - 1)] < positions)
+            low = np.where(right, middle + 1, low)
+            high = np.where(searching & ~right, middle, high)
+        hit = low < end
+        hit[hit] = term_rows[low[hit]] == positions[hit]
+        return np.where(hit, self.postings.data[np.minimum(low, len(term_rows) - 1)], 0).astype(np.float32)
+
+    def top(self, query_counts, n, prune=False):
+        """
+        Up to n document positions with the best BM25 score, best first.
+        Documents sharing no unigram with the query are left out. prune=True
+        returns the same documents and scores while skipping postings that
+        cannot change them (see top_pruned).
+        """
+        if prune:
+            positions, scores, _ = self.top_pruned(query_counts, n)
+            return positions, scores
+        return select_top(np.arange(len(self)), self.scores(query_counts), n)
+
+    def top_pruned(self, query_counts, n):
+        """
+        MaxScore top-n. Terms are taken by decreasing upper bound (query
+        count times the column's highest term score) and their postings
+        scored in full until the bounds of the remaining terms add up to
+        less than the n-th best partial score, so no unseen document can
+        reach the top n. The documents that still can are the candidates:
+        each further term drops those whose partial score plus the
+        remaining bounds falls below the n-th best, and once they are few
+        a posting list is only looked up for them by binary search. The
+        survivors are rescored in the exhaustive order, so the result
+        matches top(prune=False) exactly. Also returns the number of
+        postings visited while pruning, out of the query terms' total.
+        """
+        terms, query_tf = self.query_terms(query_counts)
+        n_docs = len(self)
+        lengths = np.diff(self.postings.indptr)[terms]
+        n_postings = int(lengths.sum())
+        if not len(terms) or n <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32), 0
+
+        bounds = np.asarray(self.max_impacts, dtype=np.float64)[terms] * query_tf
+        order = np.argsort(-bounds, kind="stable")
+        # remaining[i]: bounds of the terms after the i-th. Both sides of a
+        # comparison get slack for float32 rounding, so pruning never drops
+        # a document that ties the n-th best
+        remaining = (np.cumsum(bounds[order][::-1])[::-1] - bounds[order]) * (1 + 1e-5)
+
+        partial = np.zeros(n_docs, dtype=np.float64)
+        candidates = None  # every document, until the first pruning
+        threshold = 0.0
+        n_scored, position = 0, 0
+        while position < len(order):
+            if candidates is not None and len(candidates) * PROBE_RATIO < lengths[order[position]]:
+                # Few candidates: binary searches skip the rest of the list
+                term = order[position]
+                candidate_impacts, n_hits = self.term_scores(terms[term], candidates)
+                partial[candidates] += candidate_impacts * query_tf[term]
+                n_scored += n_hits
+                position += 1
+            else:
+                # Whole lists are scanned in batches of at least as many
+                # postings as there are documents, so that updating the
+                # threshold stays a small share of the work
+                batch_lengths = lengths[order[position:]]
+                if candidates is not None:
+                    probed = np.flatnonzero(len(candidates) * PROBE_RATIO < batch_lengths)
+                    batch_lengths = batch_lengths[:probed[0] if len(probed) else len(batch_lengths)]
+                end = position + min(int(np.searchsorted(np.cumsum(batch_lengths), n_docs)) + 1, len(batch_lengths))
+                batch = order[position:end]
+                partial += self.postings[:, terms[batch]] @ query_tf[batch]
+                n_scored += int(lengths[batch].sum())
+                position = end
+
+            # The n-th best partial score is a lower bound of the final one
+            scores = partial if candidates is None else partial[candidates]
+            if len(scores) > n:
+                threshold = max(threshold, np.partition(scores, len(scores) - n)[len(scores) - n] * (1 - 1e-5))
+            if position == len(order):
+                break
+            if candidates is None:
+                if remaining[position - 1] < threshold:
+                    # Unseen documents cannot reach the threshold any more
+                    candidates = np.flatnonzero(partial + remaining[position - 1] >= threshold)
+            else:
+                candidates = candidates[partial[candidates] + remaining[position - 1] >= threshold]
+
+        if candidates is None:
+            # No pruning was possible: every posting has been read anyway
+            return (*select_top(np.arange(n_docs), self.scores(query_counts), n), n_postings)
+
+        # 3. Exact scores of the survivors, summed term by term in the order
+        # of scores() (cumsum adds sequentially, unlike sum)
+        if len(terms) * len(candidates) * np.log2(n_postings) > n_postings:
+            # Too many survivors to look up: scoring every posting is cheaper
+            scores = self.scores(query_counts)[candidates]
+        else:
+            term_scores = self.term_score_matrix(terms, candidates) * query_tf[:, None]
+            scores = np.cumsum(term_scores, axis=0, dtype=np.float32)[-1]
+        return (*select_top(candidates, scores, n), n_scored)
+
+    def save(self, dir_path):
+        try:
+            os.makedirs(dir_path, exist_ok=True)
+            for file_name, array in (
+                ("columns.npy", self.columns), ("idf.npy", self.idf), ("doc_lengths.npy", self.doc_lengths),
+                ("postings_indptr.npy", self.postings.indptr), ("postings_rows.npy", self.postings.indices),
+                ("postings_impacts.npy", self.postings.data), ("max_impacts.npy", self.max_impacts),
+                ("ids.npy", self.ids), ("rows.npy", self.rows),
+            ):
+                np.save(os.path.join(dir_path, file_name), array)
+
+            # config.json is written last: a directory without it is incomplete
+            with open(os.path.join(dir_path, "config.json"), "w", encoding="utf-8") as file_obj:
+                json.dump({
+                    "format_version": FORMAT_VERSION,
+                    "k1": self.k1,
+                    "b": self.b,
+                    "n_docs": len(self),
+                    "n_terms": len(self.columns),
+                    "n_postings": int(self.postings.nnz),
+                    "avg_doc_length": self.avg_doc_length,
+                }, file_obj, indent=2)
+            logging.info(f"BM25 index with {len(self)} documents and {self.postings.nnz} postings saved to {dir_path}")
+
+        except Exception as e:
+            raise customException(e, sys)
+
+    @classmethod
+    def load(cls, dir_path):
+        """
+        Opens an index written by save, with the postings memory-mapped.
+        """
+        try:
+            with open(os.path.join(dir_path, "config.json"), "r", encoding="utf-8") as file_obj:
+                config = json.load(file_obj)
+            if config.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported index format version {config.get('format_version')}")
+
+            def array(file_name):
+                return np.load(os.path.join(dir_path, file_name), mmap_mode="r")
+
+            postings = sp.csc_matrix(
+                (array("postings_impacts.npy"), array("postings_rows.npy"), array("postings_indptr.npy")),
+                shape=(config["n_docs"], config["n_terms"]), copy=False
+            )
+            return cls(
+                array("columns.npy"), array("idf.npy"), array("doc_lengths.npy"), postings,
+                np.load(os.path.join(dir_path, "ids.npy")), np.load(os.path.join(dir_path, "rows.npy")),
+                k1=config["k1"], b=config["b"], max_impacts=array("max_impacts.npy")
+            )
+
+        except Exception as e:
+            raise customException(e, sys)
+
+
+def bm25_query_matrix(bm25_index, query_counts):
+    """
+    Term counts of queries (rows, vectorizer columns) over the indexed
+    terms, each row divided by the query's highest attainable BM25 score
+    (the sum of its terms' IDF times k1 + 1). Products with the postings
+    are then BM25 scores in [0, 1), comparable across queries.
+    """
+    queries = sp.csr_matrix(sp.csr_matrix(query_counts)[:, np.asarray(bm25_index.columns)], dtype=np.float32)
+    upper_bounds = (queries @ np.asarray(bm25_index.idf, dtype=np.float32)) * (bm25_index.k1 + 1)
+    scale = np.divide(1, upper_bounds, out=np.zeros_like(upper_bounds), where=upper_bounds > 0)
+    return sp.csr_matrix(sp.diags(scale) @ queries)
+
+
+def bm25_document_matrix(bm25_index, term_counts):
+    """
+    BM25 term scores of new documents (rows, vectorizer columns) under
+    the corpus statistics of the index: its IDF and average length.
+    """
+    counts = sp.csr_matrix(term_counts)[:, np.asarray(bm25_index.columns)]
+    doc_lengths = np.asarray(counts.sum(axis=1), dtype=np.float32).ravel()
+    return bm25_impacts(
+        counts, doc_lengths, bm25_index.avg_doc_length, np.asarray(bm25_index.idf), bm25_index.k1, bm25_index.b
+    )
+
+
+_bm25_indexes = {}
+_bm25_indexes_lock = threading.Lock()
+
+
+def load_bm25_index(index_dir):
+    """
+    Opens the BM25 index once per process and returns the cached copy.
+    """
+    bm25_index = _bm25_indexes.get(index_dir)
+    if bm25_index is not None:
+        return bm25_index
+
+    with _bm25_indexes_lock:
+        if index_dir not in _bm25_indexes:
+            _bm25_indexes[index_dir] = BM25Index.load(index_dir)
+        return _bm25_indexes[index_dir]
+
+
+def query_term_counts(vectorizer, texts):
+    """
+    Raw term counts of texts in a fitted vectorizer's columns, for the
+    pickled and the memory-mapped vectorizers alike.
+    """
+    if hasattr(vectorizer, "term_counts"):
+        return sp.csr_matrix(vectorizer.term_counts(texts))
+    return term_count_matrix(vectorizer, texts)
+
+
+class CascadeRanker:
+    """
+    Ranks the indexed resumes for a job description in two stages: BM25
+    over the unigram postings picks n_candidates resumes, and only those
+    are scored with the exact TF-IDF cosine of PredictionPipeline.
+
+    BM25 only sees unigrams, but the cosine also uses the n-gram columns,
+    and max_df can prune both words of a bigram it keeps. When BM25 finds
+    fewer than n_candidates resumes, the rest are filled with resumes
+    sharing any vocabulary column with the query, so no resume with a
+    positive cosine is missed then.
+    """
+
+    def __init__(self, bm25_index, vectorizer, term_counts, n_candidates=2000, prune=False):
+        self.bm25_index = bm25_index
+        self.vectorizer = vectorizer
+        # Cached counts of the indexed resumes, in index order, and a column
+        # copy to find the resumes containing a term without a full scan
+        self.resume_counts = sp.csr_matrix(term_counts)[bm25_index.rows]
+        self.resume_counts.eliminate_zeros()
+        self.resume_columns = self.resume_counts.tocsc()
+        self.n_candidates = n_candidates
+        self.prune = prune
+
+    def exact_scores(self, query_counts, positions):
+        """
+        Cosine scores (pp) of the resumes at the given index positions.
+        """
+        if not len(positions):
+            return np.zeros(0)
+        resume_vectors = tfidf_from_counts(self.vectorizer, self.resume_counts[positions])
+        query_vector = tfidf_from_counts(self.vectorizer, query_counts)
+        return np.round(cosine_similarity(resume_vectors, query_vector).ravel() * 100, 2)
+
+    def shared_column_candidates(self, query_counts, candidates, n):
+        """
+        Up to n - len(candidates) other index positions sharing at least one
+        vocabulary column (n-grams included) with the query, most shared
+        columns first.
+        """
+        query_counts = sp.csr_matrix(query_counts)
+        query_columns = np.unique(query_counts.indices[query_counts.data > 0])
+        # Only the resume lists of the query's columns are read
+        starts = self.resume_columns.indptr[query_columns]
+        lengths = self.resume_columns.indptr[query_columns + 1] - starts
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions, shared = np.unique(self.resume_columns.indices[np.repeat(starts, lengths) + within], return_counts=True)
+        other = ~np.isin(positions, candidates)
+        positions, _ = select_top(positions[other], shared[other].astype(np.float64), n - len(candidates))
+        return positions
+
+    def rank_counts(self, query_counts, k=10, n_candidates=None):
+        """
+        Index positions and scores (pp) of the k best resumes for one query
+        given as term counts, and the number of candidates reranked.
+        """
+        n_candidates = n_candidates or self.n_candidates
+        candidates, _ = self.bm25_index.top(query_counts, n_candidates, prune=self.prune)
+        if len(candidates) < n_candidates:
+            candidates = np.concatenate([candidates, self.shared_column_candidates(query_counts, candidates, n_candidates)])
+        scores = self.exact_scores(query_counts, candidates)
+        order = np.lexsort((candidates, -scores))[:k]
+        return candidates[order], scores[order], len(candidates)
+
+    def brute_force_counts(self, query_counts, k=10):
+        """
+        Exact cosine over every indexed resume, for comparison.
+        """
+        positions = np.arange(len(self.bm25_index))
+        scores = self.exact_scores(query_counts, positions)
+        order = np.lexsort((positions, -scores))[:k]
+        return positions[order], scores[order]
+
+    def rank(self, jd_text, k=10, n_candidates=None):
+        """
+        The k best resumes for a job description text, as a list of
+        {"resume_id", "score"} dicts, best first.
+        """
+        positions, scores, _ = self.rank_counts(query_term_counts(self.vectorizer, [jd_text]), k, n_candidates)
+        return [
+            {"resume_id": str(self.bm25_index.ids[position]), "score": float(score)}
+            for position, score in zip(positions, scores)
+        ]
+
+
+def recall_report(ranker, query_counts, k=10, cutoffs=(100, 500, 2000)):
+    """
+    Recall loss of the cascade against brute force over the same resumes,
+    for every candidate cut-off: the mean share of the exact top-k (by
+    score, so ties at the k-th place are not counted as misses) that the
+    cascade returns, the mean number of candidates reranked and the mean
+    query time of both.
+    """
+    query_counts = sp.csr_matrix(query_counts)
+    n_queries = query_counts.shape[0]
+
+    start = time.perf_counter()
+    exact = [ranker.brute_force_counts(query_counts[i], k) for i in range(n_queries)]
+    exact_ms = (time.perf_counter() - start) * 1000 / max(n_queries, 1)
+
+    report = []
+    for cutoff in cutoffs:
+        start = time.perf_counter()
+        found = [ranker.rank_counts(query_counts[i], k, cutoff) for i in range(n_queries)]
+        cascade_ms = (time.perf_counter() - start) * 1000 / max(n_queries, 1)
+
+        recalls = []
+        for (_, exact_scores), (_, cascade_scores, _) in zip(exact, found):
+            # Both lists are best first; resumes with a zero score are not relevant
+            relevant = exact_scores[exact_scores > 0]
+            if len(relevant):
+                returned = np.zeros(len(relevant))
+                returned[:min(len(cascade_scores), len(relevant))] = cascade_scores[:len(relevant)]
+                recalls.append(float(np.mean(returned >= relevant)))
+        report.append({
+            "cutoff": int(cutoff),
+            "recall_at_k": float(np.mean(recalls)) if recalls else 1.0,
+            "mean_candidates": float(np.mean([n for _, _, n in found])) if found else 0.0,
+            "cascade_ms_per_query": cascade_ms,
+            "brute_force_ms_per_query": exact_ms,
+        })
+    return report
+
+
+_rankers = {}
+_rankers_lock = threading.Lock()
+
+
+def load_cascade_ranker(index_dir, term_counts_file_path, load_vectorizer, n_candidates=2000, prune=False):
+    """
+    Opens the BM25 index and the cached term counts once per process and
+    returns the cached ranker. load_vectorizer() is only called on the
+    first load. Returns None if no index was built.
+    """
+    ranker = _rankers.get(index_dir)
+    if ranker is not None:
+        return ranker
+
+    with _rankers_lock:
+        if index_dir not in _rankers:
+            if not os.path.exists(os.path.join(index_dir, "config.json")):
+                return None
+            _rankers[index_dir] = CascadeRanker(
+                BM25Index.load(index_dir), load_vectorizer(), load_sparse_matrix(term_counts_file_path),
+                n_candidates=n_candidates, prune=prune
+            )
+            logging.info(f"Cascade ranker loaded from {index_dir}")
+        return _rankers[index_dir]
+
+
+class CandidateIndexer:
+    def __init__(self):
+        self.cascade_config = CascadeConfig()
+        logging.info("CandidateIndexer component initialized")
+
+    def initiate_bm25_index(self, preprocessor_obj_path, term_counts_file_path, term_counts_index_file_path):
+        """
+        Builds the BM25 index over the resumes of the transformed corpus
+        from the cached term counts, and writes the cascade's recall report
+        with the corpus's job descriptions as queries. Returns the index
+        directory.
+        """
+        try:
+            config = self.cascade_config
+            logging.info("Building BM25 index over the resumes")
+
+            # 1. Resume rows of the cached term counts
+            index = load_json(term_counts_index_file_path)
+            types = pd.Series(index['types'])
+            resume_rows = np.flatnonzero((types == 'resume').to_numpy())
+            job_rows = np.flatnonzero((types == 'job_description').to_numpy())
+            term_counts = load_sparse_matrix(term_counts_file_path)
+
+            # 2. Index their unigram postings
+            bm25_index = BM25Index.build(
+                term_counts[resume_rows], np.asarray(index['ids'])[resume_rows], rows=resume_rows,
+                terms=index.get('vocabulary'), k1=config.k1, b=config.b
+            )
+            bm25_index.save(config.index_dir)
+
+            # 3. Recall of the cascade against brute force on the corpus's jobs
+            if len(job_rows) and config.report_cutoffs:
+                ranker = CascadeRanker(
+                    bm25_index, load_object(file_path=preprocessor_obj_path), term_counts, prune=config.prune
+                )
+                report = recall_report(ranker, term_counts[job_rows], k=config.report_k, cutoffs=config.report_cutoffs)
+                save_json(os.path.join(config.index_dir, "recall_report.json"), report)
+                for row in report:
+                    logging.info(
+                        f"Cascade cut-off {row['cutoff']}: recall@{config.report_k} {row['recall_at_k']:.3f}, "
+                        f"{row['cascade_ms_per_query']:.2f} ms vs {row['brute_force_ms_per_query']:.2f} ms brute force"
+                    )
+
+            logging.info("BM25 index building completed")
+            return config.index_dir
+
+        except Exception as e:
+            logging.error("Error while building the BM25 index")
+            raise customException(e, sys)
@@ -0,0 +1,233 @@
+import os
+import sys
+import bisect
+import threading
+import numpy as np
+import pandas as pd
+from src.exception import customException
+from src.logger import logging
+from src.utils import load_json, save_json
+
+# Layout under the distributions directory:
+#   values.npy    float32 scores (pp) of all jobs, each job's run sorted ascending
+#   offsets.npy   int64 (n_jobs + 1): job i's scores are values[offsets[i]:offsets[i + 1]]
+#   index.json    job ids, in the order of offsets, and the scoring mode
+#                 ("sparse", "lsa" or "bm25") the scores were computed with
+VALUES_FILE_NAME = "values.npy"
+OFFSETS_FILE_NAME = "offsets.npy"
+INDEX_FILE_NAME = "index.json"
+# Scores recorded at serving time: one "job_id,resume_key,score,scoring"
+# line per submission, appended by every serving process and folded into the
+# distributions by the next training run. It lives outside the versioned
+# artifacts so it carries over from one version to the next
+RECORDED_SCORES_FILE_PATH = os.path.join('artifacts', 'recorded_scores.csv')
+RECORDED_SCORES_COLUMNS = ["job_id", "resume_key", "score", "scoring"]
+# Most recent distinct resumes per job that are folded in
+MAX_RECORDED_PER_JOB = 1000
+# Submissions are no longer recorded once the file reaches this size
+MAX_RECORDED_SCORES_FILE_MB = 64
+
+
+class ScoreDistributions:
+    """
+    Sorted score distribution of every job, for percentile ranks of a new
+    score among the job's applicants. A rank is two binary searches in
+    the job's sorted scores. Scores added to a job are kept in a small
+    sorted list until merge_pending() folds them in. Scores of different
+    scoring modes are not comparable, so the mode is kept with them
+    (None for distributions saved before it was).
+    """
+
+    def __init__(self, job_ids, values, offsets, scoring=None):
+        self.job_ids = [str(job_id) for job_id in job_ids]
+        self.positions = {job_id: position for position, job_id in enumerate(self.job_ids)}
+        self.values = values
+        self.offsets = offsets
+        self.scoring = scoring
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_score_grid(cls, job_ids, score_grid, scoring=None):
+        """
+        Distributions from a (n_resumes, n_jobs) grid of scores in pp,
+        computed with the given scoring mode.
+        """
+        n_resumes, n_jobs = score_grid.shape
+        values = np.sort(np.asarray(score_grid, dtype=np.float32).T, axis=1).ravel()
+        offsets = np.arange(n_jobs + 1, dtype=np.int64) * n_resumes
+        return cls(job_ids, values, offsets, scoring)
+
+    @classmethod
+    def load(cls, distributions_dir, mmap=True):
+        try:
+            mmap_mode = "r" if mmap else None
+            index = load_json(os.path.join(distributions_dir, INDEX_FILE_NAME))
+            distributions = cls(
+                index["job_ids"],
+                np.load(os.path.join(distributions_dir, VALUES_FILE_NAME), mmap_mode=mmap_mode),
+                np.load(os.path.join(distributions_dir, OFFSETS_FILE_NAME)),
+                index.get("scoring"),
+            )
+            logging.info(f"Loaded score distributions of {len(distributions.job_ids)} jobs from {distributions_dir}")
+            return distributions
+
+        except Exception as e:
+            logging.error(f"Error while loading score distributions from {distributions_dir}")
+            raise customException(e, sys)
+
+    def save(self, distributions_dir):
+        try:
+            self.merge_pending()
+            os.makedirs(distributions_dir, exist_ok=True)
+            for file_name, array in ((VALUES_FILE_NAME, self.values), (OFFSETS_FILE_NAME, self.offsets)):
+                # Renamed into place: a loaded copy may still be memory-mapped
+                tmp_path = os.path.join(distributions_dir, f".{file_name}.tmp")
+                with open(tmp_path, "wb") as file_obj:
+                    np.save(file_obj, np.asarray(array))
+                os.replace(tmp_path, os.path.join(distributions_dir, file_name))
+            save_json(os.path.join(distributions_dir, INDEX_FILE_NAME), {"job_ids": self.job_ids, "scoring": self.scoring})
+            logging.info(f"Score distributions of {len(self.job_ids)} jobs saved to {distributions_dir}")
+
+        except Exception as e:
+            logging.error("Error while saving score distributions")
+            raise customException(e, sys)
+
+    def job_scores(self, job_id):
+        position = self.positions.get(str(job_id))
+        if position is None:
+            return self.values[:0]
+        return self.values[self.offsets[position]:self.offsets[position + 1]]
+
+    def count(self, job_id):
+        return len(self.job_scores(job_id)) + len(self.pending.get(str(job_id), ()))
+
+    def percentile_rank(self, job_id, score):
+        """
+        Percentage of the job's scores below score, counting equal scores
+        as half below (mid-rank), or None for a job without scores.
+        """
+        job_id = str(job_id)
+        scores = self.job_scores(job_id)
+        score = np.float32(score)
+        # The ndarray method skips the dispatch overhead of np.searchsorted
+        below = int(scores.searchsorted(score, side="left"))
+        not_above = int(scores.searchsorted(score, side="right"))
+        n_scores = len(scores)
+
+        pending = self.pending.get(job_id)
+        if pending:
+            with self.lock:
+                below += bisect.bisect_left(pending, score)
+                not_above += bisect.bisect_right(pending, score)
+                n_scores += len(pending)
+
+        if not n_scores:
+            return None
+        return round(100 * (below + not_above) / (2 * n_scores), 2)
+
+    def add(self, job_id, scores):
+        """
+        Adds new scores (pp) to the distribution of a trained job. Returns
+        False (and adds nothing) for a job without a distribution.
+        """
+        job_id = str(job_id)
+        if job_id not in self.positions:
+            return False
+        with self.lock:
+            pending = self.pending.setdefault(job_id, [])
+            for score in np.atleast_1d(np.asarray(scores, dtype=np.float32)):
+                bisect.insort(pending, score)
+        return True
+
+    def merge_pending(self):
+        """
+        Folds the scores added since loading into the sorted arrays.
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            runs = []
+            for job_id in self.job_ids:
+                scores = self.job_scores(job_id)
+                if job_id in self.pending:
+                    scores = np.sort(np.concatenate([scores, np.asarray(self.pending[job_id], dtype=np.float32)]))
+                runs.append(scores)
+
+            self.values = np.concatenate(runs).astype(np.float32, copy=False)
+            self.offsets = np.concatenate([[0], np.cumsum([len(run) for run in runs])]).astype(np.int64)
+            self.pending = {}
+
+
+    def add_recorded(self, recorded_scores_file_path, max_per_job=MAX_RECORDED_PER_JOB):
+        """
+        Adds the scores recorded at serving time (see record_score) with
+        the same scoring mode to the trained jobs: the latest score of each
+        resume, at most max_per_job resumes per job. Returns the number of
+        scores added.
+        """
+        if not os.path.exists(recorded_scores_file_path):
+            return 0
+        recorded = pd.read_csv(
+            recorded_scores_file_path, names=RECORDED_SCORES_COLUMNS, dtype={"job_id": str, "resume_key": str},
+            on_bad_lines="skip"
+        )
+        recorded = recorded[recorded["job_id"].isin(self.positions) & (recorded["scoring"] == self.scoring)]
+        # Repeat submissions of a resume count once, with their latest score
+        recorded = recorded.drop_duplicates(subset=["job_id", "resume_key"], keep="last")
+        recorded = recorded.groupby("job_id").tail(max_per_job)
+        for job_id, scores in recorded.groupby("job_id")["score"]:
+            self.add(job_id, scores.to_numpy())
+        logging.info(f"Added {len(recorded)} recorded scores from {recorded_scores_file_path}")
+        return len(recorded)
+
+
+_record_lock = threading.Lock()
+
+
+def record_score(job_id, resume_key, score, scoring, recorded_scores_file_path=RECORDED_SCORES_FILE_PATH,
+                 max_file_mb=MAX_RECORDED_SCORES_FILE_MB):
+    """
+    Appends a served score, computed with the given scoring mode, to the
+    recorded scores, which the next training
+    run folds into the job's distribution. resume_key identifies the
+    resume (e.g. a hash of the file), so that repeat submissions count
+    once. Returns False if the file is full.
+    """
+    try:
+        with _record_lock:
+            if os.path.exists(recorded_scores_file_path) and \
+                    os.path.getsize(recorded_scores_file_path) >= max_file_mb * 2 ** 20:
+                logging.info(f"{recorded_scores_file_path} is full, score of job {job_id} not recorded")
+                return False
+            os.makedirs(os.path.dirname(recorded_scores_file_path) or '.', exist_ok=True)
+            line = pd.DataFrame([[str(job_id), str(resume_key), float(score), scoring]]).to_csv(header=False, index=False)
+            # One write in append mode: lines of concurrent processes do not interleave
+            with open(recorded_scores_file_path, "a", encoding="utf-8") as file_obj:
+                file_obj.write(line)
+            return True
+
+    except Exception as e:
+        logging.error("Error while recording a score")
+        raise customException(e, sys)
+
+
+_distributions = {}
+_distributions_lock = threading.Lock()
+
+
+def load_score_distributions(distributions_dir):
+    """
+    Loads (memory-mapped) the distributions once per process and returns
+    the cached copy. Returns None if no distributions were saved.
+    """
+    distributions = _distributions.get(distributions_dir)
+    if distributions is not None:
+        return distributions
+
+    with _distributions_lock:
+        if distributions_dir not in _distributions:
+            if not os.path.exists(os.path.join(distributions_dir, INDEX_FILE_NAME)):
+                return None
+            _distributions[distributions_dir] = ScoreDistributions.load(distributions_dir)
+        return _distributions[distributions_dir]
@@ -0,0 +1,226 @@
+import os
+import sys
+import hashlib
+import numpy as np
+import pandas as pd
+from src.exception import customException
+from src.logger import logging
+from src.utils import load_json, save_json
+from src.components.artifact_store import file_sha256
+
+# Layout under the store directory:
+#   scores.npy     float32 (n_resumes, n_jobs) scores in pp
+#   versions.npy   uint16 (n_resumes, n_jobs) position, in index.json's
+#                  model_versions, of the model that computed each score
+#   index.json     resume ids (rows), job ids (columns), the fingerprint of
+#                  every row and column (see row_fingerprints) and model versions
+SCORES_FILE_NAME = "scores.npy"
+VERSIONS_FILE_NAME = "versions.npy"
+INDEX_FILE_NAME = "index.json"
+# Version of a cell that has not been scored yet
+UNSCORED = np.iinfo(np.uint16).max
+
+
+def model_version(scoring, *file_paths):
+    """
+    Short fingerprint of the fitted artifacts (e.g. the preprocessor
+    pickle) that scores depend on, and of the scoring mode.
+    """
+    digest = hashlib.sha256(scoring.encode())
+    for file_path in file_paths:
+        digest.update(file_sha256(file_path).encode())
+    return digest.hexdigest()[:16]
+
+
+def row_fingerprints(term_counts):
+    """
+    Short fingerprint of every document's term-count row, so that an
+    edited document under an existing id is scored again.
+    """
+    term_counts = term_counts.tocsr().sorted_indices()
+    indptr, indices, data = term_counts.indptr, term_counts.indices.astype(np.int64), term_counts.data.astype(np.int64)
+    return np.array([
+        hashlib.sha256(indices[start:end].tobytes() + data[start:end].tobytes()).hexdigest()[:16]
+        for start, end in zip(indptr[:-1], indptr[1:])
+    ], dtype=str)
+
+
+def _save_array(dir_path, file_name, array):
+    # Written next to its final name and renamed, so a crash never leaves half a file
+    tmp_path = os.path.join(dir_path, f".{file_name}.tmp")
+    with open(tmp_path, "wb") as file_obj:
+        np.save(file_obj, np.ascontiguousarray(array))
+    os.replace(tmp_path, os.path.join(dir_path, file_name))
+
+
+class ScoreStore:
+    """
+    Persistent resume x job scores that remember which model version
+    computed every cell and the fingerprint of every resume and job.
+    refresh() follows the current resume and job ids and only computes
+    cells that are new, were scored by another model or whose resume or
+    job has changed.
+    """
+
+    def __init__(self, resume_ids=(), job_ids=(), scores=None, versions=None, model_versions=(),
+                 resume_fingerprints=None, job_fingerprints=None):
+        self.resume_ids = np.asarray(resume_ids, dtype=str)
+        self.job_ids = np.asarray(job_ids, dtype=str)
+        # "" is an unknown fingerprint, which never matches
+        self.resume_fingerprints = np.asarray(
+            [""] * len(self.resume_ids) if resume_fingerprints is None else resume_fingerprints, dtype=str
+        )
+        self.job_fingerprints = np.asarray(
+            [""] * len(self.job_ids) if job_fingerprints is None else job_fingerprints, dtype=str
+        )
+        shape = (len(self.resume_ids), len(self.job_ids))
+        # Set by reindex/refresh when the store differs from what was loaded
+        self.modified = False
+        self.scores = np.zeros(shape, dtype=np.float32) if scores is None else scores
+        self.versions = np.full(shape, UNSCORED, dtype=np.uint16) if versions is None else versions
+        self.model_versions = list(model_versions)
+
+    @classmethod
+    def load(cls, store_dir):
+        """
+        Opens the store saved in store_dir, or an empty store if there is none.
+        """
+        try:
+            index_path = os.path.join(store_dir, INDEX_FILE_NAME)
+            if not os.path.exists(index_path):
+                logging.info(f"No score store at {store_dir}, starting an empty one")
+                return cls()
+
+            index = load_json(index_path)
+            store = cls(
+                index['resume_ids'], index['job_ids'],
+                scores=np.load(os.path.join(store_dir, SCORES_FILE_NAME)),
+                versions=np.load(os.path.join(store_dir, VERSIONS_FILE_NAME)),
+                model_versions=index['model_versions'],
+                resume_fingerprints=index.get('resume_fingerprints'),
+                job_fingerprints=index.get('job_fingerprints'),
+            )
+            logging.info(f"Loaded score store {store.scores.shape} from {store_dir}")
+            return store
+
+        except Exception as e:
+            logging.error("Error while loading the score store")
+            raise customException(e, sys)
+
+    def save(self, store_dir):
+        try:
+            self.compact_versions()
+            os.makedirs(store_dir, exist_ok=True)
+            _save_array(store_dir, SCORES_FILE_NAME, self.scores)
+            _save_array(store_dir, VERSIONS_FILE_NAME, self.versions)
+            # The index is written last: it is what marks the store as complete.
+            # Every file is replaced, never rewritten, so a store whose files
+            # are hard links of another version's leaves that version intact
+            tmp_path = os.path.join(store_dir, f".{INDEX_FILE_NAME}.tmp")
+            save_json(tmp_path, {
+                "resume_ids": self.resume_ids.tolist(),
+                "job_ids": self.job_ids.tolist(),
+                "resume_fingerprints": self.resume_fingerprints.tolist(),
+                "job_fingerprints": self.job_fingerprints.tolist(),
+                "model_versions": self.model_versions,
+            })
+            os.replace(tmp_path, os.path.join(store_dir, INDEX_FILE_NAME))
+            logging.info(f"Score store {self.scores.shape} saved to {store_dir}")
+
+        except Exception as e:
+            logging.error("Error while saving the score store")
+            raise customException(e, sys)
+
+    def compact_versions(self):
+        """
+        Drops model versions no cell refers to any more and renumbers the rest.
+        """
+        used = np.unique(self.versions[self.versions != UNSCORED])
+        remap = np.full(UNSCORED + 1, UNSCORED, dtype=np.uint16)
+        remap[used] = np.arange(len(used), dtype=np.uint16)
+        self.versions = remap[self.versions]
+        self.model_versions = [self.model_versions[position] for position in used]
+
+    def reindex(self, resume_ids, job_ids):
+        """
+        Moves the stored cells to new row and column ids. Ids that are gone
+        are dropped; new ids get unscored cells and unknown fingerprints.
+        """
+        resume_ids, job_ids = np.asarray(resume_ids, dtype=str), np.asarray(job_ids, dtype=str)
+        if np.array_equal(resume_ids, self.resume_ids) and np.array_equal(job_ids, self.job_ids):
+            return
+        if len(np.unique(resume_ids)) != len(resume_ids) or len(np.unique(job_ids)) != len(job_ids):
+            raise customException("Score store ids must be unique.", sys)
+        old_rows = pd.Index(self.resume_ids).get_indexer(resume_ids)
+        old_columns = pd.Index(self.job_ids).get_indexer(job_ids)
+        kept_rows, kept_columns = np.flatnonzero(old_rows >= 0), np.flatnonzero(old_columns >= 0)
+
+        scores = np.zeros((len(resume_ids), len(job_ids)), dtype=np.float32)
+        versions = np.full(scores.shape, UNSCORED, dtype=np.uint16)
+        if len(kept_rows) and len(kept_columns):
+            source = np.ix_(old_rows[kept_rows], old_columns[kept_columns])
+            scores[np.ix_(kept_rows, kept_columns)] = self.scores[source]
+            versions[np.ix_(kept_rows, kept_columns)] = self.versions[source]
+
+        resume_fingerprints = np.full(len(resume_ids), "", dtype=object)
+        resume_fingerprints[kept_rows] = self.resume_fingerprints[old_rows[kept_rows]]
+        job_fingerprints = np.full(len(job_ids), "", dtype=object)
+        job_fingerprints[kept_columns] = self.job_fingerprints[old_columns[kept_columns]]
+
+        self.resume_ids, self.job_ids = resume_ids, job_ids
+        self.scores, self.versions = scores, versions
+        self.resume_fingerprints = resume_fingerprints.astype(str)
+        self.job_fingerprints = job_fingerprints.astype(str)
+        self.modified = True
+
+    def refresh(self, resume_ids, job_ids, version, score_fn, resume_fingerprints=None, job_fingerprints=None):
+        """
+        Brings the store up to date with the given ids and model version.
+        score_fn(rows, columns) must return the (len(rows), len(columns))
+        scores of those resume rows and job columns. When fingerprints of
+        the resumes and jobs are given, the cells of those that changed
+        are stale as well (without them, no change is detected). Stale
+        cells are computed as at most two rectangles: rows with no current
+        cell against every job, then the remaining rows against the
+        columns that still have stale cells. Returns the number of
+        computed and reused cells.
+        """
+        try:
+            self.reindex(resume_ids, job_ids)
+            if resume_fingerprints is not None:
+                resume_fingerprints = np.asarray(resume_fingerprints, dtype=str)
+                self.modified |= not np.array_equal(resume_fingerprints, self.resume_fingerprints)
+                self.versions[self.resume_fingerprints != resume_fingerprints, :] = UNSCORED
+                self.resume_fingerprints = resume_fingerprints
+            if job_fingerprints is not None:
+                job_fingerprints = np.asarray(job_fingerprints, dtype=str)
+                self.modified |= not np.array_equal(job_fingerprints, self.job_fingerprints)
+                self.versions[:, self.job_fingerprints != job_fingerprints] = UNSCORED
+                self.job_fingerprints = job_fingerprints
+            if version not in self.model_versions:
+                self.model_versions.append(version)
+            current = self.model_versions.index(version)
+            stale = self.versions != current
+
+            stale_rows = stale.all(axis=1)
+            rectangles = [(np.flatnonzero(stale_rows), np.arange(len(self.job_ids)))]
+            rest = np.flatnonzero(~stale_rows)
+            rectangles.append((rest, np.flatnonzero(stale[rest].any(axis=0))))
+
+            n_computed = 0
+            for rows, columns in rectangles:
+                if not len(rows) or not len(columns):
+                    continue
+                cells = np.ix_(rows, columns)
+                self.scores[cells] = score_fn(rows, columns)
+                self.versions[cells] = current
+                n_computed += len(rows) * len(columns)
+                self.modified = True
+
+            n_reused = self.scores.size - n_computed
+            logging.info(f"Score store refreshed for model {version}: {n_computed} cells computed, {n_reused} reused")
+            return n_computed, n_reused
+
+        except Exception as e:
+            logging.error("Error while refreshing the score store")
+            raise customException(e, sys)
@@ -0,0 +1,719 @@
+import os
+import sys
+import json
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from dataclasses import dataclass
+from src.exception import customException
+from src.logger import logging
+from src.utils import load_json, load_sparse_matrix
+from src.components.retrieval import average_length, bm25_idf, select_top
+
+# On-disk layout of a segmented index directory (FORMAT_VERSION 1):
+#   manifest.json      number of terms and the segments in order with the
+#                      generation of their tombstones. Replaced atomically:
+#                      it is what makes the other files current
+#   terms.json         append-only term dictionary (term id = position), so
+#                      segments stay valid when the vectorizer is refitted
+#   segment_<n>/       one immutable segment, never modified once written:
+#     counts_indptr.npy, counts_rows.npy, counts_data.npy
+#                      CSC term counts (documents x terms known when written)
+#     doc_lengths.npy  float32 length (in indexed terms) of every document
+#     ids.npy, fingerprints.npy
+#                      document ids and content fingerprints
+#     deletes_<g>.npy  tombstone bitmap of generation g; a delete writes the
+#                      next generation instead of changing a file in place
+FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+TERMS_FILE_NAME = "terms.json"
+
+
+@dataclass
+class SegmentedIndexConfig:
+    # Built and synced by the training pipeline only when enabled
+    enabled: bool = False
+    index_dir: str = os.path.join('artifacts', 'resume_segments')
+    # BM25 term-frequency saturation and length normalisation; segments
+    # hold raw counts, so both only apply at query time
+    k1: float = 1.2
+    b: float = 0.75
+    # Added documents are buffered in memory and written as a new segment
+    # once this many are waiting (or on flush())
+    flush_docs: int = 1000
+    # Above max_segments segments, the merge_factor adjacent segments with
+    # the fewest documents are merged into one, in a background thread
+    # when background_merges is set
+    max_segments: int = 8
+    merge_factor: int = 4
+    background_merges: bool = True
+
+
+def _save_array(dir_path, file_name, array):
+    # Written next to its final name and renamed, so a crash never leaves half a file
+    tmp_path = os.path.join(dir_path, f".{file_name}.tmp")
+    with open(tmp_path, "wb") as file_obj:
+        np.save(file_obj, np.ascontiguousarray(array))
+    os.replace(tmp_path, os.path.join(dir_path, file_name))
+
+
+def _save_json(dir_path, file_name, obj):
+    tmp_path = os.path.join(dir_path, f".{file_name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file_obj:
+        json.dump(obj, file_obj)
+    os.replace(tmp_path, os.path.join(dir_path, file_name))
+
+
+def document_fingerprints(counts):
+    """
+    64-bit fingerprint of every row of a CSR term-count matrix in index
+    term ids: a sum of mixed (term id, count) hashes, so it does not
+    depend on the order of the entries.
+    """
+    counts = sp.csr_matrix(counts)
+    with np.errstate(over="ignore"):
+        # splitmix64 finaliser; uint64 arithmetic wraps around
+        mixed = (counts.indices.astype(np.uint64) << np.uint64(32)) | counts.data.astype(np.uint64)
+        mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        mixed ^= mixed >> np.uint64(31)
+        fingerprints = np.zeros(counts.shape[0], dtype=np.uint64)
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        np.add.at(fingerprints, rows, mixed)
+    return fingerprints
+
+
+class Segment:
+    """
+    Documents of one flush or merge: term counts, lengths and ids that
+    never change, and a tombstone bitmap that deletes only set bits of.
+    The segment buffered in memory has no name until it is written.
+    """
+
+    def __init__(self, name, counts, doc_lengths, ids, fingerprints, deleted=None, deletes_generation=0):
+        self.name = name
+        self.counts = counts
+        self.doc_lengths = doc_lengths
+        self.ids = ids
+        self.fingerprints = fingerprints
+        self.deleted = np.zeros(len(ids), dtype=bool) if deleted is None else deleted
+        self.deletes_generation = deletes_generation
+        # (number of deletes, live document frequency) of the last call
+        self._document_frequency = None
+        # (statistics generation, BM25 impact of every posting) of the last query
+        self._impacts = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_counts(cls, name, counts, ids, fingerprints):
+        """
+        Segment of a CSR term-count matrix in index term ids.
+        """
+        counts = sp.csc_matrix(counts, dtype=np.int32)
+        counts.sum_duplicates()
+        doc_lengths = np.asarray(counts.sum(axis=1), dtype=np.float32).ravel()
+        return cls(name, counts, doc_lengths, np.asarray(ids, dtype=str), np.asarray(fingerprints, dtype=np.uint64))
+
+    def live_rows(self):
+        return np.flatnonzero(~self.deleted)
+
+    def live_counts(self, n_terms):
+        """
+        CSR term counts of the live documents, widened to n_terms columns.
+        """
+        counts = self.counts.tocsr()[self.live_rows()]
+        return sp.csr_matrix((counts.data, counts.indices, counts.indptr), shape=(counts.shape[0], n_terms))
+
+    def live_document_frequency(self, n_terms):
+        """
+        Number of live documents containing each of the first n_terms terms.
+        """
+        n_deleted = int(self.deleted.sum())
+        if self._document_frequency is None or self._document_frequency[0] != n_deleted:
+            columns = np.repeat(np.arange(self.counts.shape[1]), np.diff(self.counts.indptr))
+            live = ~self.deleted[np.asarray(self.counts.indices)]
+            self._document_frequency = (n_deleted, np.bincount(columns[live], minlength=self.counts.shape[1]))
+        document_frequency = np.zeros(n_terms, dtype=np.int64)
+        document_frequency[:self.counts.shape[1]] = self._document_frequency[1]
+        return document_frequency
+
+    def impacts(self, generation, idf, avg_doc_length, k1, b):
+        """
+        CSC matrix of the BM25 impact of every posting under the collection
+        statistics of the given generation, computed once per generation.
+        """
+        cached = self._impacts
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        indptr, rows = np.asarray(self.counts.indptr), np.asarray(self.counts.indices)
+        columns = np.repeat(np.arange(self.counts.shape[1]), np.diff(indptr))
+        tf = np.asarray(self.counts.data).astype(np.float32)
+        # Same impacts as bm25_impacts, in the CSC layout of the counts
+        length_norm = k1 * (1 - b + b * self.doc_lengths / avg_doc_length)
+        impacts = sp.csc_matrix(
+            ((tf * (k1 + 1) / (tf + length_norm[rows]) * idf[columns]).astype(np.float32), rows, indptr),
+            shape=self.counts.shape
+        )
+        self._impacts = (generation, impacts)
+        return impacts
+
+    def scores(self, terms, query_tf, statistics, k1, b):
+        """
+        BM25 score of every document (deleted ones included) for query term
+        ids sorted ascending, with their counts, under the collection
+        statistics (generation, idf, average length).
+        """
+        inside = terms < self.counts.shape[1]
+        impacts = self.impacts(*statistics, k1, b)[:, terms[inside]]
+        return np.asarray(impacts @ query_tf[inside], dtype=np.float32).ravel()
+
+    def write(self, index_dir):
+        """
+        Writes the segment's files into index_dir/<name>; segment.json is
+        written last.
+        """
+        dir_path = os.path.join(index_dir, self.name)
+        os.makedirs(dir_path, exist_ok=True)
+        for file_name, array in (
+            ("counts_indptr.npy", self.counts.indptr), ("counts_rows.npy", self.counts.indices),
+            ("counts_data.npy", self.counts.data), ("doc_lengths.npy", self.doc_lengths),
+            ("ids.npy", self.ids), ("fingerprints.npy", self.fingerprints),
+        ):
+            _save_array(dir_path, file_name, array)
+        _save_json(dir_path, "segment.json", {"n_docs": len(self), "n_terms": self.counts.shape[1]})
+
+    def write_deletes(self, index_dir):
+        """
+        Writes the tombstones as the next generation; the manifest decides
+        which generation is current.
+        """
+        self.deletes_generation += 1
+        _save_array(os.path.join(index_dir, self.name), f"deletes_{self.deletes_generation}.npy", self.deleted)
+
+    @classmethod
+    def open(cls, index_dir, name, deletes_generation=0):
+        """
+        Opens a written segment with its arrays memory-mapped.
+        """
+        dir_path = os.path.join(index_dir, name)
+        config = load_json(os.path.join(dir_path, "segment.json"))
+
+        def array(file_name):
+            # Plain ndarray views of the maps: indexing a np.memmap is slower
+            return np.load(os.path.join(dir_path, file_name), mmap_mode="r").view(np.ndarray)
+
+        counts = sp.csc_matrix(
+            (array("counts_data.npy"), array("counts_rows.npy"), array("counts_indptr.npy")),
+            shape=(config["n_docs"], config["n_terms"]), copy=False
+        )
+        deleted = None
+        if deletes_generation:
+            # A private copy: deletes set bits in memory until written
+            deleted = np.load(os.path.join(dir_path, f"deletes_{deletes_generation}.npy"))
+        return cls(
+            name, counts, array("doc_lengths.npy"), np.load(os.path.join(dir_path, "ids.npy")),
+            array("fingerprints.npy"), deleted, deletes_generation
+        )
+
+
+class SegmentedIndex:
+    """
+    LSM-style BM25 index over resumes. Added documents are buffered in an
+    in-memory segment that is written as a new immutable, memory-mapped
+    segment once flush_docs are waiting; deletes set tombstone bits; and
+    adjacent segments are merged (dropping deleted documents) once there
+    are more than max_segments. A search scores every segment with the
+    IDF and average length of all live documents, so it ranks like one
+    BM25 index over them. Changes are durable after flush().
+
+    One process writes an index; any number may open it to search.
+    """
+
+    def __init__(self, index_dir, config=None, terms=(), segments=(), next_segment=1):
+        self.index_dir = index_dir
+        self.config = config or SegmentedIndexConfig()
+        self.terms = list(terms)
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.segments = list(segments)
+        self.next_segment = next_segment
+        self.memory = self._empty_memory_segment()
+        # Names of written segments whose tombstones changed since the last commit
+        self.dirty = set()
+        self.n_terms_saved = len(self.terms)
+        self.generation = 0
+        self._statistics = None
+        self._positions = None
+        self.lock = threading.RLock()
+        self.merge_lock = threading.Lock()
+        self.merge_thread = None
+        # Segments being written by a merge, not yet in the manifest
+        self.merging = set()
+
+    def _empty_memory_segment(self):
+        return Segment.from_counts(None, sp.csr_matrix((0, len(self.terms)), dtype=np.int32), [], [])
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(segment) - int(segment.deleted.sum()) for segment in self.all_segments())
+
+    def all_segments(self):
+        return self.segments + [self.memory]
+
+    @classmethod
+    def open(cls, index_dir, config=None):
+        """
+        Reopens the segments listed in the manifest without rebuilding
+        them, or starts an empty index if index_dir has none. Segment
+        directories and tombstone files the manifest does not list (left by
+        a crash) are ignored.
+        """
+        try:
+            config = config or SegmentedIndexConfig()
+            manifest_path = os.path.join(index_dir, MANIFEST_FILE_NAME)
+            if not os.path.exists(manifest_path):
+                logging.info(f"No segmented index at {index_dir}, starting an empty one")
+                return cls(index_dir, config)
+
+            manifest = load_json(manifest_path)
+            if manifest.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported segmented index format version {manifest.get('format_version')}")
+            terms = load_json(os.path.join(index_dir, TERMS_FILE_NAME))[:manifest["n_terms"]]
+            segments = [
+                Segment.open(index_dir, entry["name"], entry["deletes_generation"]) for entry in manifest["segments"]
+            ]
+            index = cls(index_dir, config, terms, segments, manifest["next_segment"])
+            logging.info(f"Opened segmented index with {len(segments)} segments and {len(index)} documents")
+            return index
+
+        except Exception as e:
+            logging.error(f"Error while opening the segmented index at {index_dir}")
+            raise customException(e, sys)
+
+    def _changed(self):
+        # Cached statistics and id positions describe the previous state
+        self.generation += 1
+        self._statistics = None
+        self._positions = None
+
+    def index_term_ids(self, terms, add=False):
+        """
+        Index term ids of vocabulary terms, -1 for terms that are not
+        indexed: n-grams, and unknown terms unless add is set.
+        """
+        term_ids = np.full(len(terms), -1, dtype=np.int64)
+        n_terms = len(self.terms)
+        for position, term in enumerate(terms):
+            if " " in term:
+                continue
+            term_id = self.term_ids.get(term)
+            if term_id is None and add:
+                term_id = self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+            if term_id is not None:
+                term_ids[position] = term_id
+        if len(self.terms) > n_terms:
+            # The cached IDF does not cover the new terms
+            self._changed()
+        return term_ids
+
+    def to_index_terms(self, term_counts, terms, add=False):
+        """
+        Moves a CSR term-count matrix from vectorizer columns (terms is the
+        vocabulary in column order, or None for hashed features) to index
+        term ids, keeping the indexed terms only.
+        """
+        term_counts = sp.csr_matrix(term_counts)
+        columns = np.unique(term_counts.indices)
+        column_terms = [str(column) for column in columns] if terms is None else [terms[column] for column in columns]
+        remap = np.full(term_counts.shape[1], -1, dtype=np.int64)
+        remap[columns] = self.index_term_ids(column_terms, add=add)
+
+        term_ids = remap[term_counts.indices]
+        keep = term_ids >= 0
+        rows = np.repeat(np.arange(term_counts.shape[0]), np.diff(term_counts.indptr))
+        counts = sp.csr_matrix(
+            (term_counts.data[keep].astype(np.int32), (rows[keep], term_ids[keep])),
+            shape=(term_counts.shape[0], len(self.terms))
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def positions(self):
+        """
+        Segment position (in all_segments()) and row of every live id.
+        """
+        if self._positions is None:
+            positions = {}
+            for segment_position, segment in enumerate(self.all_segments()):
+                for row in segment.live_rows():
+                    positions[str(segment.ids[row])] = (segment_position, row)
+            self._positions = positions
+        return self._positions
+
+    def live_fingerprints(self):
+        with self.lock:
+            segments = self.all_segments()
+            return {
+                document_id: int(segments[segment_position].fingerprints[row])
+                for document_id, (segment_position, row) in self.positions().items()
+            }
+
+    def add(self, ids, term_counts, terms):
+        """
+        Adds (or, for ids already in the index, replaces) documents given
+        as term counts in vectorizer columns with the vocabulary terms.
+        They are searchable at once and written with the next flush.
+        """
+        ids = np.asarray(ids, dtype=str)
+        if len(np.unique(ids)) != len(ids):
+            raise customException("Segmented index ids must be unique.", sys)
+        with self.lock:
+            counts = self.to_index_terms(term_counts, terms, add=True)
+            self.delete(ids)
+            memory, live_rows = self.memory, self.memory.live_rows()
+            self.memory = Segment.from_counts(
+                None, sp.vstack([memory.live_counts(len(self.terms)), counts], format="csr"),
+                np.concatenate([memory.ids[live_rows], ids]),
+                np.concatenate([memory.fingerprints[live_rows], document_fingerprints(counts)])
+            )
+            self._changed()
+            full = len(self.memory) >= self.config.flush_docs
+        if full:
+            self.flush()
+
+    def delete(self, ids):
+        """
+        Withdraws documents by id. Returns the number of live documents
+        that were deleted.
+        """
+        with self.lock:
+            positions = self.positions()
+            segments = self.all_segments()
+            n_deleted = 0
+            for document_id in ids:
+                position = positions.get(str(document_id))
+                if position is None:
+                    continue
+                segment = segments[position[0]]
+                segment.deleted[position[1]] = True
+                if segment.name is not None:
+                    self.dirty.add(segment.name)
+                n_deleted += 1
+            if n_deleted:
+                self._changed()
+            return n_deleted
+
+    def sync(self, ids, term_counts, terms):
+        """
+        Makes the live documents equal to the given corpus: ids that are
+        gone are deleted, and new ids or ids whose counts changed are
+        (re-)added. Unchanged documents are not touched. Returns the
+        numbers of added and deleted documents.
+        """
+        ids = np.asarray(ids, dtype=str)
+        with self.lock:
+            fingerprints = document_fingerprints(self.to_index_terms(term_counts, terms, add=True))
+            live = self.live_fingerprints()
+        changed = np.fromiter(
+            (live.get(document_id) != int(fingerprint) for document_id, fingerprint in zip(ids, fingerprints)),
+            dtype=bool, count=len(ids)
+        )
+        n_deleted = self.delete(set(live) - set(ids.tolist()))
+        rows = np.flatnonzero(changed)
+        if len(rows):
+            self.add(ids[rows], sp.csr_matrix(term_counts)[rows], terms)
+        return len(rows), n_deleted
+
+    def flush(self):
+        """
+        Writes the buffered documents as a new segment and the changed
+        tombstones, then commits them with the manifest.
+        """
+        try:
+            with self.lock:
+                os.makedirs(self.index_dir, exist_ok=True)
+                memory = self.memory
+                if len(memory.live_rows()):
+                    live_rows = memory.live_rows()
+                    segment = Segment.from_counts(
+                        f"segment_{self.next_segment:06d}", memory.live_counts(len(self.terms)),
+                        memory.ids[live_rows], memory.fingerprints[live_rows]
+                    )
+                    self.next_segment += 1
+                    segment.write(self.index_dir)
+                    self.segments.append(segment)
+                    logging.info(f"Flushed {len(segment)} documents to {segment.name}")
+                self.memory = self._empty_memory_segment()
+                self._changed()
+                self.commit()
+
+            # Merges take the lock themselves; flush may not hold it here
+            if self.config.background_merges:
+                if len(self.segments) > self.config.max_segments:
+                    self.merge_in_background()
+            else:
+                self.maybe_merge()
+
+        except Exception as e:
+            logging.error("Error while flushing the segmented index")
+            raise customException(e, sys)
+
+    def commit(self):
+        """
+        Writes changed tombstones and new terms, then replaces the manifest,
+        and removes the files it no longer refers to. Called with the lock
+        held.
+        """
+        for segment in self.segments:
+            if segment.name in self.dirty:
+                segment.write_deletes(self.index_dir)
+        self.dirty = set()
+        if len(self.terms) != self.n_terms_saved:
+            _save_json(self.index_dir, TERMS_FILE_NAME, self.terms)
+            self.n_terms_saved = len(self.terms)
+
+        _save_json(self.index_dir, MANIFEST_FILE_NAME, {
+            "format_version": FORMAT_VERSION,
+            "n_terms": len(self.terms),
+            "next_segment": self.next_segment,
+            "segments": [
+                {"name": segment.name, "deletes_generation": segment.deletes_generation} for segment in self.segments
+            ],
+        })
+
+        # Searches that still hold a removed segment keep their memory maps
+        current = {segment.name: segment.deletes_generation for segment in self.segments}
+        for name in os.listdir(self.index_dir):
+            dir_path = os.path.join(self.index_dir, name)
+            if not name.startswith("segment_") or not os.path.isdir(dir_path):
+                continue
+            if name not in current:
+                # Left by a crash or merged away; a running merge's output is kept
+                if name not in self.merging:
+                    shutil.rmtree(dir_path, ignore_errors=True)
+                continue
+            for file_name in os.listdir(dir_path):
+                if file_name.startswith("deletes_") and file_name != f"deletes_{current[name]}.npy":
+                    os.remove(os.path.join(dir_path, file_name))
+
+    def merge_window(self):
+        """
+        Start and end of the merge_factor adjacent segments with the fewest
+        live documents, or None while there are at most max_segments.
+        """
+        if len(self.segments) <= self.config.max_segments:
+            return None
+        width = min(max(self.config.merge_factor, 2), len(self.segments))
+        sizes = np.array([len(segment) - int(segment.deleted.sum()) for segment in self.segments])
+        totals = np.convolve(sizes, np.ones(width, dtype=np.int64), mode="valid")
+        start = int(np.argmin(totals))
+        return start, start + width
+
+    def maybe_merge(self):
+        """
+        Merges adjacent segments until at most max_segments are left.
+        Documents keep their order, and deletes made while a merge runs
+        are carried over to the merged segment.
+        """
+        with self.merge_lock:
+            while True:
+                # 1. Pick the segments and take a snapshot of their tombstones
+                with self.lock:
+                    window = self.merge_window()
+                    if window is None:
+                        return
+                    sources = self.segments[window[0]:window[1]]
+                    snapshots = [segment.deleted.copy() for segment in sources]
+                    n_terms = len(self.terms)
+                    name = f"segment_{self.next_segment:06d}"
+                    self.next_segment += 1
+                    self.merging.add(name)
+
+                # 2. Write the merged segment without holding the lock
+                try:
+                    live_rows = [np.flatnonzero(~deleted) for deleted in snapshots]
+                    merged = Segment.from_counts(
+                        name,
+                        sp.vstack([
+                            sp.csr_matrix(
+                                (counts.data, counts.indices, counts.indptr), shape=(counts.shape[0], n_terms)
+                            ) for counts in (segment.counts.tocsr()[rows] for segment, rows in zip(sources, live_rows))
+                        ], format="csr"),
+                        np.concatenate([segment.ids[rows] for segment, rows in zip(sources, live_rows)]),
+                        np.concatenate([segment.fingerprints[rows] for segment, rows in zip(sources, live_rows)]),
+                    )
+                    merged.write(self.index_dir)
+                except Exception:
+                    with self.lock:
+                        self.merging.discard(name)
+                    raise
+
+                # 3. Swap it in, with the deletes made in the meantime
+                with self.lock:
+                    offset = 0
+                    for segment, rows in zip(sources, live_rows):
+                        merged.deleted[offset:offset + len(rows)] = segment.deleted[rows]
+                        offset += len(rows)
+                    start = self.segments.index(sources[0])
+                    self.segments[start:start + len(sources)] = [merged]
+                    self.dirty -= {segment.name for segment in sources}
+                    if merged.deleted.any():
+                        self.dirty.add(merged.name)
+                    self.merging.discard(name)
+                    self._changed()
+                    self.commit()
+                    logging.info(
+                        f"Merged {len(sources)} segments into {merged.name} "
+                        f"({len(merged)} documents); {len(self.segments)} segments left"
+                    )
+
+    def merge_in_background(self):
+        """
+        Runs maybe_merge() in a background thread (one at a time) and
+        returns the thread.
+        """
+        with self.lock:
+            if self.merge_thread is None or not self.merge_thread.is_alive():
+                self.merge_thread = threading.Thread(target=self._background_merge, daemon=True)
+                self.merge_thread.start()
+            return self.merge_thread
+
+    def _background_merge(self):
+        try:
+            self.maybe_merge()
+        except Exception:
+            # The index stays valid: the manifest still lists the sources
+            logging.exception("Background merge of the segmented index failed")
+
+    def wait_for_merges(self):
+        thread = self.merge_thread
+        if thread is not None:
+            thread.join()
+
+    def statistics(self):
+        """
+        IDF of every term and average length over all live documents,
+        cached until the next change.
+        """
+        with self.lock:
+            if self._statistics is None:
+                segments = self.all_segments()
+                n_terms = len(self.terms)
+                document_frequency = sum(segment.live_document_frequency(n_terms) for segment in segments)
+                doc_lengths = np.concatenate([segment.doc_lengths[segment.live_rows()] for segment in segments])
+                self._statistics = (
+                    self.generation,
+                    bm25_idf(np.asarray(document_frequency), len(doc_lengths)),
+                    average_length(doc_lengths),
+                )
+            return self._statistics
+
+    def search(self, query_terms, n=10):
+        """
+        The n live documents with the best BM25 score for a query given as
+        {term: count}, best first, as (ids, scores). Scores are divided by
+        the query's highest attainable score (the sum of its terms' IDF
+        times k1 + 1), so they lie in [0, 1). Equal scores keep the older
+        document first.
+        """
+        with self.lock:
+            segments = self.all_segments()
+            deleted = [segment.deleted.copy() for segment in segments]
+            statistics = self.statistics()
+            term_ids = self.index_term_ids(list(query_terms))
+
+        found = term_ids >= 0
+        query_tf = np.fromiter(query_terms.values(), dtype=np.float32, count=len(query_terms))[found]
+        # Scores sum the terms in term id order
+        order = np.argsort(term_ids[found])
+        terms, query_tf = term_ids[found][order], query_tf[order]
+        if not len(terms):
+            return np.zeros(0, dtype=str), np.zeros(0, dtype=np.float32)
+
+        scores, ids = [], []
+        for segment, segment_deleted in zip(segments, deleted):
+            live = ~segment_deleted
+            scores.append(segment.scores(terms, query_tf, statistics, self.config.k1, self.config.b)[live])
+            ids.append(segment.ids[live])
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+        positions, top_scores = select_top(np.arange(len(scores)), scores, n)
+        upper_bound = float(statistics[1][terms] @ query_tf) * (self.config.k1 + 1)
+        return ids[positions], top_scores / np.float32(upper_bound)
+
+
+def query_terms(query_counts, terms):
+    """
+    {term: count} of one row of vectorizer term counts, in the form
+    SegmentedIndex.search takes (terms as in to_index_terms).
+    """
+    query_counts = sp.csr_matrix(query_counts)
+    return {
+        str(column) if terms is None else terms[column]: float(count)
+        for column, count in zip(query_counts.indices, query_counts.data)
+    }
+
+
+_segmented_indexes = {}
+_segmented_indexes_lock = threading.Lock()
+
+
+def load_segmented_index(index_dir):
+    """
+    Opens the segmented index once per process and returns the cached
+    copy, or None if no index was built.
+    """
+    index = _segmented_indexes.get(index_dir)
+    if index is not None:
+        return index
+
+    with _segmented_indexes_lock:
+        if index_dir not in _segmented_indexes:
+            if not os.path.exists(os.path.join(index_dir, MANIFEST_FILE_NAME)):
+                return None
+            _segmented_indexes[index_dir] = SegmentedIndex.open(index_dir)
+        return _segmented_indexes[index_dir]
+
+
+class ResumeSegmentIndexer:
+    def __init__(self):
+        self.segmented_index_config = SegmentedIndexConfig()
+        logging.info("ResumeSegmentIndexer component initialized")
+
+    def initiate_segmented_index(self, term_counts_file_path, term_counts_index_file_path):
+        """
+        Syncs the segmented index in index_dir (seeded with the previous
+        version's segments, if any) with the resumes of the transformed
+        corpus: only new, changed and withdrawn resumes are written. Returns
+        the index directory.
+        """
+        try:
+            config = self.segmented_index_config
+            logging.info("Syncing the segmented resume index")
+
+            # 1. Resume rows of the cached term counts
+            index = load_json(term_counts_index_file_path)
+            resume_rows = np.flatnonzero((pd.Series(index['types']) == 'resume').to_numpy())
+            term_counts = load_sparse_matrix(term_counts_file_path)[resume_rows]
+
+            # 2. Add and delete the differences, then write them
+            segmented_index = SegmentedIndex.open(config.index_dir, config)
+            n_added, n_deleted = segmented_index.sync(
+                np.asarray(index['ids'])[resume_rows], term_counts, index.get('vocabulary')
+            )
+            segmented_index.flush()
+            # The directory is published as is: no merge may still be running
+            segmented_index.wait_for_merges()
+
+            logging.info(
+                f"Segmented index synced: {n_added} resumes added, {n_deleted} withdrawn, "
+                f"{len(segmented_index.segments)} segments"
+            )
+            return config.index_dir
+
+        except Exception as e:
+            logging.error("Error while syncing the segmented resume index")
+            raise customException(e, sys)
@@ -0,0 +1,316 @@
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import scipy.sparse as sp
+from dataclasses import dataclass
+from typing import Optional
+from sklearn.preprocessing import normalize
+from sklearn.utils.extmath import safe_sparse_dot
+from src.exception import customException
+from src.logger import logging
+
+
+@dataclass
+class TopKScores:
+    # (k, n_jobs): best resumes of every job, best first
+    job_scores: np.ndarray
+    job_resume_rows: np.ndarray
+    # (n_resumes, k): best jobs of every resume, best first (only if requested)
+    resume_scores: Optional[np.ndarray] = None
+    resume_job_rows: Optional[np.ndarray] = None
+    n_blocks: int = 0
+    block_rows: int = 0
+
+
+def _unit_rows(vectors, cosine=True):
+    # Without cosine the rows are scored as given (raw dot products)
+    if sp.issparse(vectors):
+        vectors = sp.csr_matrix(vectors)
+        return normalize(vectors) if cosine else vectors
+    return normalize(np.asarray(vectors)) if cosine else np.asarray(vectors)
+
+
+def _unit_columns(job_vectors, cosine=True):
+    # Unit-length job vectors as the (features, n_jobs) right-hand side of a block product
+    job_vectors_t = _unit_rows(job_vectors, cosine).T
+    return job_vectors_t.tocsr() if sp.issparse(job_vectors_t) else np.ascontiguousarray(job_vectors_t)
+
+
+def block_rows_for_budget(n_jobs, memory_budget_mb, itemsize=8):
+    """
+    Number of resume rows per block so that one block's product fits the
+    memory budget. Per row it holds, for every job, the sparse product's
+    value and int32 column index, the dense copy, its negated copy and
+    the int64 positions used for top-k selection.
+    """
+    bytes_per_row = max(n_jobs, 1) * (3 * itemsize + 12)
+    return max(1, int(memory_budget_mb * 2 ** 20 // bytes_per_row))
+
+
+def score_block(resume_block, job_vectors_t):
+    """
+    Dense (block rows, n_jobs) cosine scores of unit-length rows.
+    """
+    # safe_sparse_dot multiplies sparse inputs straight into a dense result
+    # when the installed sklearn supports it, skipping the sparse product
+    return np.asarray(safe_sparse_dot(resume_block, job_vectors_t, dense_output=True))
+
+
+def top_k_per_row(values, k):
+    """
+    Column positions of the k largest values of every row, best first.
+    Equal values keep the lower position first, also at the k-th place, so
+    the selection does not depend on how rows were split into blocks.
+    """
+    n_columns = values.shape[1]
+    if k >= n_columns:
+        return np.argsort(-values, axis=1, kind="stable")
+
+    positions = np.argpartition(-values, k - 1, axis=1)[:, :k]
+    kth_values = np.take_along_axis(values, positions, axis=1).min(axis=1)
+    # argpartition breaks ties at the k-th place arbitrarily; redo those rows
+    cut_ties = np.count_nonzero(values >= kth_values[:, None], axis=1) > k
+    for row in np.flatnonzero(cut_ties):
+        positions[row] = np.argsort(-values[row], kind="stable")[:k]
+
+    order = np.lexsort((positions, -np.take_along_axis(values, positions, axis=1)), axis=1)
+    return np.take_along_axis(positions, order, axis=1)
+
+
+def block_top_k(block, first_row, k_per_job, k_per_resume):
+    """
+    Top-k of one score block: per job over the block's resumes (rows are
+    offset by first_row) and, optionally, per resume over all jobs.
+    Returns (scores, rows) of shape (k, n_jobs) and (scores, job columns)
+    of shape (block rows, k), or None for the latter.
+    """
+    # Selecting along contiguous rows is much faster than along columns
+    block_t = np.ascontiguousarray(block.T)
+    local = top_k_per_row(block_t, min(k_per_job, block.shape[0]))
+    job_part = (np.take_along_axis(block_t, local, axis=1).T, local.T + first_row)
+
+    resume_part = None
+    if k_per_resume:
+        columns = top_k_per_row(block, min(k_per_resume, block.shape[1]))
+        resume_part = (np.take_along_axis(block, columns, axis=1), columns)
+
+    return job_part, resume_part
+
+
+def merge_job_top_k(current, part, k):
+    """
+    Merges a block's per-job candidates into the running top-k, best
+    first, with ties going to the lower resume row.
+    """
+    if current is None:
+        scores, rows = part
+    else:
+        scores = np.concatenate([current[0], part[0]])
+        rows = np.concatenate([current[1], part[1]])
+    order = np.lexsort((rows, -scores), axis=0)[:k]
+    return np.take_along_axis(scores, order, axis=0), np.take_along_axis(rows, order, axis=0)
+
+
+def _score_block_top_k(resume_vectors, job_vectors_t, first_row, block_rows, k_per_job, k_per_resume, cosine=True):
+    # Resume rows are normalised block by block to avoid copying the whole matrix
+    block = score_block(_unit_rows(resume_vectors[first_row:first_row + block_rows], cosine), job_vectors_t)
+    return block_top_k(block, first_row, k_per_job, k_per_resume)
+
+
+def _share_array(array):
+    shared = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shared.buf)[...] = array
+    return shared, (shared.name, array.dtype.str, array.shape)
+
+
+def share_matrix(matrix):
+    """
+    Copies a CSR or dense matrix into shared memory once. Returns the
+    SharedMemory blocks (to close and unlink) and a small picklable
+    descriptor that workers turn back into a matrix without copying.
+    """
+    if sp.issparse(matrix):
+        matrix = sp.csr_matrix(matrix)
+        parts = [_share_array(array) for array in (matrix.data, matrix.indices, matrix.indptr)]
+        return [shared for shared, _ in parts], ("csr", matrix.shape, [spec for _, spec in parts])
+    shared, spec = _share_array(np.ascontiguousarray(matrix))
+    return [shared], ("dense", matrix.shape, [spec])
+
+
+# Shared-memory attachments of a worker process, kept open across tasks
+_attached = {}
+
+
+def attach_matrix(descriptor):
+    kind, shape, specs = descriptor
+    arrays = []
+    for name, dtype, array_shape in specs:
+        if name not in _attached:
+            _attached[name] = shared_memory.SharedMemory(name=name)
+        arrays.append(np.ndarray(array_shape, dtype=np.dtype(dtype), buffer=_attached[name].buf))
+    if kind == "csr":
+        return sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+    return arrays[0]
+
+
+def _process_block_top_k(resume_descriptor, job_descriptor, first_row, block_rows, k_per_job, k_per_resume,
+                         cosine=True):
+    return _score_block_top_k(
+        attach_matrix(resume_descriptor), attach_matrix(job_descriptor),
+        first_row, block_rows, k_per_job, k_per_resume, cosine
+    )
+
+
+def _ordered_results(pool, n_workers, tasks):
+    """
+    Runs (function, *args) tasks on the pool and yields their results in
+    submission order, with at most 2 * n_workers tasks in flight so that
+    finished blocks never pile up in memory.
+    """
+    in_flight = deque()
+    for function, *args in tasks:
+        in_flight.append(pool.submit(function, *args))
+        if len(in_flight) >= 2 * n_workers:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def blocked_top_k(resume_vectors, job_vectors, k_per_job=10, k_per_resume=None, memory_budget_mb=256,
+                  n_workers=1, executor="thread", cosine=True):
+    """
+    Cosine top-k between resumes and jobs without materialising the full
+    resume x job matrix. Resume rows are scored one block at a time, with
+    the block size derived from memory_budget_mb, and only the running
+    top-k per job (and the top-k per resume of finished blocks) is kept, so
+    peak memory is the budget plus O(k * (n_jobs + n_resumes)).
+    Accepts sparse or dense vectors of either kind.
+
+    With n_workers > 1 blocks are scored concurrently on a "thread" pool
+    (the sparse and BLAS kernels release the GIL) or a "process" pool that
+    reads both matrices from shared memory. The budget is split between
+    the workers, and block results are merged in block order with ties
+    broken by row index, so the result does not depend on n_workers. (For
+    dense vectors BLAS may round a score differently for another block
+    size, which can swap two resumes whose scores agree to ~1e-16.)
+
+    With cosine=False the scores are the raw dot products of the rows,
+    e.g. BM25 term scores against normalised queries.
+    """
+    shared_blocks = []
+    try:
+        job_vectors_t = _unit_columns(job_vectors, cosine)
+        n_resumes, n_jobs = resume_vectors.shape[0], job_vectors_t.shape[1]
+        dtype = np.result_type(resume_vectors.dtype, job_vectors_t.dtype, np.float32)
+
+        n_workers = max(1, n_workers)
+        block_rows = min(
+            block_rows_for_budget(n_jobs, memory_budget_mb / n_workers, dtype.itemsize), max(n_resumes, 1)
+        )
+        k_per_job = min(k_per_job, n_resumes)
+        first_rows = range(0, n_resumes, block_rows)
+        task_args = (block_rows, k_per_job, k_per_resume, cosine)
+
+        if n_workers == 1:
+            pool = None
+            block_results = (
+                _score_block_top_k(resume_vectors, job_vectors_t, first_row, *task_args) for first_row in first_rows
+            )
+        elif executor == "process":
+            resume_shared, resume_descriptor = share_matrix(resume_vectors)
+            job_shared, job_descriptor = share_matrix(job_vectors_t)
+            shared_blocks = resume_shared + job_shared
+            pool = ProcessPoolExecutor(max_workers=n_workers)
+            block_results = _ordered_results(pool, n_workers, (
+                (_process_block_top_k, resume_descriptor, job_descriptor, first_row, *task_args)
+                for first_row in first_rows
+            ))
+        else:
+            pool = ThreadPoolExecutor(max_workers=n_workers)
+            block_results = _ordered_results(pool, n_workers, (
+                (_score_block_top_k, resume_vectors, job_vectors_t, first_row, *task_args)
+                for first_row in first_rows
+            ))
+
+        job_top = None
+        resume_parts = []
+        n_blocks = 0
+        try:
+            for job_part, resume_part in block_results:
+                job_top = merge_job_top_k(job_top, job_part, k_per_job)
+                if resume_part is not None:
+                    resume_parts.append(resume_part)
+                n_blocks += 1
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        result = TopKScores(
+            job_scores=job_top[0], job_resume_rows=job_top[1],
+            n_blocks=n_blocks, block_rows=block_rows
+        )
+        if resume_parts:
+            result.resume_scores = np.concatenate([scores for scores, _ in resume_parts])
+            result.resume_job_rows = np.concatenate([columns for _, columns in resume_parts])
+
+        logging.info(
+            f"Scored {n_resumes} resumes x {n_jobs} jobs in {n_blocks} blocks of "
+            f"{block_rows} rows (budget {memory_budget_mb} MiB, {n_workers} {executor} workers)"
+        )
+        return result
+
+    except Exception as e:
+        logging.error("Error during blocked similarity scoring")
+        raise customException(e, sys)
+
+    finally:
+        for shared in shared_blocks:
+            shared.close()
+            shared.unlink()
+
+
+def blocked_pairs_above(resume_vectors, job_vectors, min_score, memory_budget_mb=256, cosine=True):
+    """
+    All (resume row, job column, score) triples with a cosine score (or,
+    with cosine=False, dot product) of at least min_score, found block by
+    block so that the full resume x job matrix is never materialised.
+    Pairs are in row-major order.
+    """
+    try:
+        job_vectors_t = _unit_columns(job_vectors, cosine)
+        n_resumes, n_jobs = resume_vectors.shape[0], job_vectors_t.shape[1]
+        dtype = np.result_type(resume_vectors.dtype, job_vectors_t.dtype, np.float32)
+        block_rows = min(block_rows_for_budget(n_jobs, memory_budget_mb, dtype.itemsize), max(n_resumes, 1))
+
+        rows, columns, scores = [], [], []
+        for first_row in range(0, n_resumes, block_rows):
+            block = score_block(_unit_rows(resume_vectors[first_row:first_row + block_rows], cosine), job_vectors_t)
+            block_rows_kept, block_columns = np.nonzero(block >= min_score)
+            rows.append(block_rows_kept + first_row)
+            columns.append(block_columns)
+            scores.append(block[block_rows_kept, block_columns])
+
+        logging.info(f"Kept {sum(len(part) for part in scores)} of {n_resumes * n_jobs} pairs scoring >= {min_score}")
+        return np.concatenate(rows), np.concatenate(columns), np.concatenate(scores)
+
+    except Exception as e:
+        logging.error("Error during blocked threshold scoring")
+        raise customException(e, sys)
+
+
+def score_summary(scores):
+    """
+    Count, mean, spread and percentiles of a set of scores, for logging
+    instead of the scores themselves.
+    """
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    if not scores.size:
+        return {"count": 0}
+    p50, p90, p99 = np.percentile(scores, [50, 90, 99])
+    return {
+        "count": int(scores.size), "mean": round(float(scores.mean()), 2), "std": round(float(scores.std()), 2),
+        "min": round(float(scores.min()), 2), "p50": round(float(p50), 2), "p90": round(float(p90), 2),
+        "p99": round(float(p99), 2), "max": round(float(scores.max()), 2),
+    }
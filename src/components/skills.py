@@ -0,0 +1,159 @@
+import os
+import re
+import sys
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from src.exception import customException
+from src.logger import logging
+
+# Text and taxonomy phrases are normalized the same way: lower-cased and
+# split into tokens that keep the punctuation inside skill names ("c++",
+# "c#", "node.js", "asp.net"). Everything else ("/", "-", ",", brackets,
+# bullets) separates tokens, so "Scikit-learn" and "scikit learn" agree.
+SKILL_TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[.+#][^\W_]+)*[+#]*")
+
+
+def normalize_tokens(text):
+    """
+    Token sequence the skill automaton runs over.
+    """
+    return SKILL_TOKEN_PATTERN.findall(str(text).lower())
+
+
+@dataclass
+class SkillMatcherConfig:
+    # JSON object {"skills": {"<canonical name>": ["<alias>", ...]}, "alias_only": [...]}.
+    # Skills listed in alias_only have a name that is also an ordinary word
+    # or letter ("C" in "Vitamin C", "R" in "R&D") and only match by alias
+    taxonomy_file_path: str = os.path.join('data', 'skills', 'skills_taxonomy.json')
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the tokens of every phrase in a skill
+    taxonomy. Matching a document is one pass over its tokens, whatever
+    the number of phrases, and only whole-token phrases are reported.
+    """
+
+    def __init__(self, taxonomy, alias_only=()):
+        # taxonomy: canonical skill name -> list of aliases; the names of
+        # the skills in alias_only are not matched themselves
+        self.skills = list(taxonomy)
+        alias_only = set(alias_only)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+
+        n_phrases = 0
+        for skill_id, (skill, aliases) in enumerate(taxonomy.items()):
+            for phrase in aliases if skill in alias_only else [skill, *aliases]:
+                tokens = normalize_tokens(phrase)
+                if tokens:
+                    self._add_phrase(tokens, skill_id)
+                    n_phrases += 1
+        self._build_failure_links()
+        self.n_phrases = n_phrases
+
+    def _add_phrase(self, tokens, skill_id):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if skill_id not in self._outputs[state]:
+            self._outputs[state] += (skill_id,)
+
+    def _build_failure_links(self):
+        # Breadth-first, so the failure target of a state is always complete
+        # before it is used; outputs of the failure chain are merged in.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] += tuple(
+                    skill_id for skill_id in self._outputs[self._fail[next_state]]
+                    if skill_id not in self._outputs[next_state]
+                )
+
+    @property
+    def n_states(self):
+        return len(self._goto)
+
+    def match_ids(self, text):
+        """
+        Ids of the skills found in the text, in order of first occurrence.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = {}
+        state = 0
+        for token in normalize_tokens(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for skill_id in outputs[state]:
+                found.setdefault(skill_id, None)
+        return list(found)
+
+    def match(self, text):
+        """
+        Canonical names of the skills found in the text.
+        """
+        return [self.skills[skill_id] for skill_id in self.match_ids(text)]
+
+    def coverage(self, resume_text, jd_text):
+        """
+        Skills the job description asks for, split into those the resume
+        mentions and those it does not.
+        """
+        resume_skills = set(self.match_ids(resume_text))
+        required = self.match_ids(jd_text)
+        matched = [self.skills[skill_id] for skill_id in required if skill_id in resume_skills]
+        missing = [self.skills[skill_id] for skill_id in required if skill_id not in resume_skills]
+        return {
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "skill_coverage": round(100 * len(matched) / len(required), 2) if required else None,
+        }
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def load_skill_matcher(taxonomy_file_path=None):
+    """
+    Compiles the taxonomy once per process and returns the cached matcher.
+    """
+    taxonomy_file_path = taxonomy_file_path or SkillMatcherConfig().taxonomy_file_path
+    matcher = _matchers.get(taxonomy_file_path)
+    if matcher is not None:
+        return matcher
+
+    with _matchers_lock:
+        if taxonomy_file_path not in _matchers:
+            try:
+                with open(taxonomy_file_path, "r", encoding="utf-8") as file_obj:
+                    taxonomy = json.load(file_obj)
+                matcher = SkillMatcher(taxonomy["skills"], taxonomy.get("alias_only", ()))
+                logging.info(
+                    f"Compiled {matcher.n_phrases} skill phrases for {len(matcher.skills)} skills "
+                    f"into {matcher.n_states} automaton states"
+                )
+                _matchers[taxonomy_file_path] = matcher
+            except Exception as e:
+                logging.error(f"Error while loading skill taxonomy {taxonomy_file_path}")
+                raise customException(e, sys)
+        return _matchers[taxonomy_file_path]
@@ -0,0 +1,533 @@
+import heapq
+import numbers
+import os
+import sys
+from collections import Counter, deque
+from itertools import islice
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import (
+    CountVectorizer, HashingVectorizer, TfidfVectorizer
+)
+from sklearn.preprocessing import normalize
+from src.exception import customException
+from src.logger import logging
+
+
+def _batches(documents, batch_size):
+    """
+    Yields lists of at most batch_size documents from any iterable,
+    so generators over corpora larger than memory can be consumed.
+    """
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def compact_csr(matrix, dtype=None):
+    """
+    CSR matrix with its values in dtype (if given) and int32 indices and
+    indptr whenever the matrix is small enough for them, instead of the
+    int64 indices scipy falls back to after some operations.
+    """
+    matrix = sp.csr_matrix(matrix)
+    if dtype is not None and matrix.dtype != dtype:
+        matrix = matrix.astype(dtype)
+    int32_max = np.iinfo(np.int32).max
+    if matrix.nnz <= int32_max and max(matrix.shape) <= int32_max:
+        matrix.indices = matrix.indices.astype(np.int32, copy=False)
+        matrix.indptr = matrix.indptr.astype(np.int32, copy=False)
+    return matrix
+
+
+def smooth_idf(n_docs, document_frequency):
+    """
+    The IDF used by sklearn's TfidfTransformer with smooth_idf=True.
+    """
+    return np.log((1 + n_docs) / (1 + np.asarray(document_frequency, dtype=np.float64))) + 1
+
+
+def idf_from_document_frequency(n_docs, document_frequency, smooth=True):
+    """
+    sklearn's IDF formula for either value of smooth_idf.
+    """
+    if smooth:
+        return smooth_idf(n_docs, document_frequency)
+    return np.log(n_docs / np.asarray(document_frequency, dtype=np.float64)) + 1
+
+
+def document_frequency(term_counts):
+    """
+    Number of documents (rows) each column of a count matrix occurs in.
+    """
+    term_counts = sp.csr_matrix(term_counts)
+    term_counts.sum_duplicates()
+    return np.bincount(term_counts.indices, minlength=term_counts.shape[1])
+
+
+def set_idf(vectorizer, idf):
+    """
+    Sets the idf_ of a TfidfVectorizer whose vocabulary_ has been rebuilt.
+    """
+    # The inner TfidfTransformer remembers the old feature count; dropping it
+    # lets the idf_ setter build a fresh one for the new vocabulary
+    if hasattr(vectorizer, "_tfidf"):
+        del vectorizer._tfidf
+    vectorizer.idf_ = np.asarray(idf, dtype=vectorizer.dtype)
+    return vectorizer
+
+
+def apply_idf(term_counts, idf, norm="l2", sublinear_tf=False, dtype=np.float64):
+    """
+    Turns a raw term-count matrix into TF-IDF: optional sublinear tf,
+    a diagonal IDF rescale and row normalisation.
+    """
+    X = sp.csr_matrix(term_counts, dtype=dtype, copy=True)
+    if sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    X = X @ sp.diags(np.asarray(idf, dtype=dtype), format="csr")
+    if norm:
+        X = normalize(X, norm=norm, copy=False)
+    return compact_csr(X)
+
+
+def vocabulary_terms(vocabulary):
+    """
+    Returns the terms of a vocabulary_ dict as an array in column order.
+    """
+    terms = np.empty(len(vocabulary), dtype=object)
+    for term, index in vocabulary.items():
+        terms[index] = term
+    return terms
+
+
+def tfidf_from_counts(vectorizer, term_counts):
+    """
+    Rebuilds a vectorizer's TF-IDF output from cached raw term counts,
+    without touching any text.
+    """
+    return apply_idf(
+        term_counts, vectorizer.idf_, norm=vectorizer.norm,
+        sublinear_tf=vectorizer.sublinear_tf, dtype=vectorizer.dtype
+    )
+
+
+def ngram_budget_mask(terms, document_frequency, budgets):
+    """
+    Boolean mask keeping at most budgets[n] terms of each n-gram order n,
+    preferring the terms with the highest document frequency (ties go to
+    the term that comes first in terms).
+    """
+    orders = np.fromiter((term.count(" ") + 1 for term in terms), dtype=np.int64, count=len(terms))
+    keep = np.ones(len(terms), dtype=bool)
+    for order, budget in budgets.items():
+        if budget is None:
+            continue
+        candidates = np.flatnonzero(orders == order)
+        if len(candidates) > budget:
+            ranked = candidates[np.argsort(-document_frequency[candidates], kind="stable")]
+            keep[ranked[budget:]] = False
+    return keep
+
+
+def prune_ngram_orders(vectorizer, document_frequency, budgets):
+    """
+    Applies per-n-gram-order budgets to the vocabulary_ of a vectorizer,
+    given the document frequency of each of its columns. Returns the
+    indices of the kept columns.
+    """
+    terms = vocabulary_terms(vectorizer.vocabulary_)
+    kept = np.flatnonzero(ngram_budget_mask(terms, np.asarray(document_frequency), budgets))
+    vectorizer.vocabulary_ = {term: new_index for new_index, term in enumerate(terms[kept])}
+    logging.info(f"N-gram budgets pruned the vocabulary from {len(terms)} to {len(kept)} terms")
+    return kept
+
+
+def fit_idf_from_counts(vectorizer, term_counts):
+    """
+    Fits the IDF of a TfidfVectorizer from a raw term-count matrix whose
+    columns follow its vocabulary_ (the same step TfidfVectorizer.fit
+    performs after counting). The IDF is computed in float64 and cast to
+    the vectorizer's dtype, like every other fit path in this module.
+    """
+    idf = idf_from_document_frequency(
+        term_counts.shape[0], document_frequency(term_counts), vectorizer.smooth_idf
+    )
+    return set_idf(vectorizer, idf)
+
+
+def term_count_matrix(vectorizer, documents, dtype=np.int32):
+    """
+    Raw term counts of the documents in the column space of a fitted
+    vectorizer, i.e. its TF-IDF output before the IDF rescale and
+    normalisation.
+    """
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        return compact_csr(vectorizer.term_counts(documents), dtype)
+    counter = CountVectorizer(
+        analyzer=vectorizer.build_analyzer(), vocabulary=vectorizer.vocabulary_, dtype=dtype
+    )
+    return compact_csr(counter.transform(documents))
+
+
+def corpus_term_counts(vectorizer, documents, terms, dtype=np.int32):
+    """
+    Raw counts of every term the vectorizer's analyzer produces for the
+    documents, unpruned, in the columns of terms: the list of all terms
+    counted so far, to which unseen terms are appended. Whatever
+    vocabulary_ a later partial_fit admits, its counts for these documents
+    are a column selection of this matrix (see reindex_term_counts).
+    """
+    analyzer = vectorizer.build_analyzer()
+    term_ids = {term: index for index, term in enumerate(terms)}
+    indices, data, indptr = [], [], [0]
+    for document in documents:
+        for term, count in Counter(analyzer(document)).items():
+            index = term_ids.get(term)
+            if index is None:
+                index = term_ids[term] = len(terms)
+                terms.append(term)
+            indices.append(index)
+            data.append(count)
+        indptr.append(len(indices))
+    counts = sp.csr_matrix(
+        (np.asarray(data, dtype=dtype), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(terms))
+    )
+    counts.sort_indices()
+    return compact_csr(counts)
+
+
+def widen_columns(term_counts, n_columns):
+    """
+    CSR matrix with columns appended (empty) up to n_columns.
+    """
+    term_counts = sp.csr_matrix(term_counts)
+    return sp.csr_matrix(
+        (term_counts.data, term_counts.indices, term_counts.indptr), shape=(term_counts.shape[0], n_columns)
+    )
+
+
+def reindex_term_counts(term_counts, old_terms, new_vocabulary):
+    """
+    Moves the columns of a term-count matrix from an old vocabulary to a
+    new one. Terms missing from the new vocabulary are dropped and new
+    terms get empty columns, so the result is only complete when old_terms
+    covers every term of the documents (see corpus_term_counts).
+    """
+    term_counts = sp.csr_matrix(term_counts)
+    column_map = np.fromiter(
+        (new_vocabulary.get(term, -1) for term in old_terms), dtype=np.int64, count=len(old_terms)
+    )
+    new_columns = column_map[term_counts.indices]
+    rows = np.repeat(np.arange(term_counts.shape[0]), np.diff(term_counts.indptr))
+    kept = new_columns >= 0
+    return sp.csr_matrix(
+        (term_counts.data[kept], (rows[kept], new_columns[kept])),
+        shape=(term_counts.shape[0], len(new_vocabulary)),
+        dtype=term_counts.dtype,
+    )
+
+
+def strip_pruning_bookkeeping(vectorizer):
+    """
+    Drops the set of pruned terms that older sklearn versions keep in
+    stop_words_. It is only there for introspection and would otherwise
+    be pickled with the vectorizer. Pruning also leaves numpy integer
+    indices in vocabulary_, which pickle much larger than plain ints.
+    """
+    if hasattr(vectorizer, "stop_words_"):
+        del vectorizer.stop_words_
+    if hasattr(vectorizer, "_stop_words_id"):
+        # id() of an object in this process; meaningless after unpickling
+        # and it would make otherwise identical pickles differ
+        del vectorizer._stop_words_id
+    vectorizer.vocabulary_ = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+    return vectorizer
+
+
+def _spill_run(document_counts, term_totals, spill_dir, run_number):
+    """
+    Writes the in-memory counts to a term-sorted run file on disk.
+    """
+    run_path = os.path.join(spill_dir, f"run_{run_number:05d}.tsv")
+    with open(run_path, "w", encoding="utf-8") as run_file:
+        for term in sorted(document_counts):
+            run_file.write(f"{term}\t{document_counts[term]}\t{term_totals[term]}\n")
+    logging.info(f"Spilled {len(document_counts)} terms to {run_path}")
+    return run_path
+
+
+def _read_run(run_path):
+    with open(run_path, "r", encoding="utf-8") as run_file:
+        for line in run_file:
+            term, count, total = line.rstrip("\n").split("\t")
+            yield term, int(count), int(total)
+
+
+def _merged_counts(run_paths, document_counts, term_totals):
+    """
+    K-way merge of the spilled runs and the in-memory remainder, yielding
+    (term, document frequency, total count) once per term in sorted order.
+    """
+    in_memory = ((term, document_counts[term], term_totals[term]) for term in sorted(document_counts))
+    streams = [_read_run(path) for path in run_paths] + [in_memory]
+
+    current_term, current_count, current_total = None, 0, 0
+    for term, count, total in heapq.merge(*streams, key=lambda entry: entry[0]):
+        if term != current_term:
+            if current_term is not None:
+                yield current_term, current_count, current_total
+            current_term, current_count, current_total = term, 0, 0
+        current_count += count
+        current_total += total
+    if current_term is not None:
+        yield current_term, current_count, current_total
+
+
+def fit_tfidf_out_of_core(vectorizer, document_chunks, spill_dir, max_terms_in_memory=5000000,
+                          ngram_budgets=None):
+    """
+    Fits a TfidfVectorizer from an iterable of document chunks without
+    holding the corpus in memory. Document frequencies and total counts
+    are accumulated per chunk and spilled to sorted run files whenever
+    more than max_terms_in_memory distinct terms are held; the runs are
+    then merged in one streaming pass. min_df, max_df, max_features and
+    the n-gram budgets are applied the same way the in-memory fit applies
+    them, so vocabulary_ and idf_ come out identical.
+    """
+    try:
+        analyzer = vectorizer.build_analyzer()
+        document_counts, term_totals = Counter(), Counter()
+        run_paths = []
+        n_docs = 0
+
+        for chunk in document_chunks:
+            for document in chunk:
+                terms = Counter(analyzer(document))
+                term_totals.update(terms)
+                document_counts.update(terms.keys())
+                n_docs += 1
+            if len(document_counts) > max_terms_in_memory:
+                run_paths.append(_spill_run(document_counts, term_totals, spill_dir, len(run_paths)))
+                document_counts.clear()
+                term_totals.clear()
+
+        max_df, min_df = vectorizer.max_df, vectorizer.min_df
+        max_doc_count = max_df if isinstance(max_df, numbers.Integral) else max_df * n_docs
+        min_doc_count = min_df if isinstance(min_df, numbers.Integral) else min_df * n_docs
+        if max_doc_count < min_doc_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+
+        terms, counts, totals = [], [], []
+        for term, count, total in _merged_counts(run_paths, document_counts, term_totals):
+            if min_doc_count <= count <= max_doc_count:
+                terms.append(term)
+                counts.append(count)
+                totals.append(total)
+        document_counts.clear()
+        term_totals.clear()
+
+        terms = np.array(terms, dtype=object)
+        counts = np.array(counts, dtype=np.int64)
+        if vectorizer.max_features is not None and len(terms) > vectorizer.max_features:
+            # Same argsort call on the same array as CountVectorizer._limit_features,
+            # so ties between equally frequent terms are broken identically
+            totals = np.array(totals, dtype=np.float64)
+            kept = np.sort((-totals).argsort()[:vectorizer.max_features])
+            terms, counts = terms[kept], counts[kept]
+        if len(terms) == 0:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        if ngram_budgets:
+            kept = ngram_budget_mask(terms, counts, ngram_budgets)
+            terms, counts = terms[kept], counts[kept]
+
+        vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        vectorizer.fixed_vocabulary_ = False
+        set_idf(vectorizer, idf_from_document_frequency(n_docs, counts, vectorizer.smooth_idf))
+        logging.info(f"Out-of-core fit on {n_docs} documents with {len(run_paths)} spilled runs: "
+                     f"{len(terms)} terms")
+        return vectorizer
+
+    except Exception as e:
+        raise customException(e, sys)
+
+
+class HashingTfidfVectorizer(TransformerMixin, BaseEstimator):
+    """
+    TF-IDF vectorizer without a vocabulary.
+    N-grams are hashed into a fixed number of columns, and document
+    frequencies are accumulated per column in a streaming pass, so the
+    fitted state is just an array of n_features counts no matter how
+    large the corpus is.
+    """
+
+    def __init__(self, preprocessor=None, ngram_range=(1, 3), n_features=2 ** 20,
+                 norm="l2", sublinear_tf=False, batch_size=10000, dtype=np.float64):
+        self.preprocessor = preprocessor
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.batch_size = batch_size
+        self.dtype = dtype
+
+    def _hasher(self):
+        # Stateless, so it is rebuilt from the current params instead of being stored
+        return HashingVectorizer(
+            preprocessor=self.preprocessor,
+            ngram_range=self.ngram_range,
+            n_features=self.n_features,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float64,
+        )
+
+    def build_analyzer(self):
+        return self._hasher().build_analyzer()
+
+    def term_counts(self, raw_documents):
+        """
+        Returns the hashed raw term-count matrix of the documents.
+        """
+        return self._hasher().transform(raw_documents)
+
+    def partial_fit(self, raw_documents, y=None):
+        """
+        Folds a batch of documents into the document-frequency counts.
+        """
+        if not hasattr(self, "document_frequency_"):
+            self.n_docs_ = 0
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+
+        hasher = self._hasher()
+        for batch in _batches(raw_documents, self.batch_size):
+            counts = hasher.transform(batch).tocsr()
+            counts.sum_duplicates()
+            self.document_frequency_ += np.bincount(counts.indices, minlength=self.n_features)
+            self.n_docs_ += counts.shape[0]
+        return self
+
+    def fit(self, raw_documents, y=None):
+        """
+        Streams over the documents once, in batches of batch_size.
+        """
+        try:
+            for attribute in ("n_docs_", "document_frequency_"):
+                if hasattr(self, attribute):
+                    delattr(self, attribute)
+            self.partial_fit(raw_documents)
+            logging.info(f"Hashing vectorizer fitted on {self.n_docs_} documents")
+            return self
+        except Exception as e:
+            raise customException(e, sys)
+
+    @property
+    def idf_(self):
+        return smooth_idf(self.n_docs_, self.document_frequency_)
+
+    def transform(self, raw_documents):
+        if not hasattr(self, "document_frequency_"):
+            raise customException("HashingTfidfVectorizer is not fitted yet.", sys)
+        return apply_idf(
+            self.term_counts(raw_documents), self.idf_,
+            norm=self.norm, sublinear_tf=self.sublinear_tf, dtype=self.dtype
+        )
+
+
+class IncrementalTfidfVectorizer(TfidfVectorizer):
+    """
+    TfidfVectorizer whose IDF can be updated with partial_fit.
+    It stores the number of documents and the document frequency of
+    every term, so a new batch only has to be analysed once and folded
+    in. With window_batches set, only the most recent batches count
+    and older ones are subtracted again. vocabulary_ and idf_ are
+    rebuilt exactly as a full fit on the same documents would build them.
+    """
+
+    def __init__(self, *, window_batches=None, preprocessor=None, ngram_range=(1, 3),
+                 min_df=1, max_df=1.0, norm="l2", smooth_idf=True, sublinear_tf=False,
+                 dtype=np.float64):
+        super().__init__(
+            preprocessor=preprocessor, ngram_range=ngram_range, min_df=min_df,
+            max_df=max_df, norm=norm, smooth_idf=smooth_idf,
+            sublinear_tf=sublinear_tf, dtype=dtype
+        )
+        self.window_batches = window_batches
+
+    def _reset(self):
+        self.n_docs_ = 0
+        self.document_counts_ = Counter()
+        self.batches_ = deque()
+
+    def partial_fit(self, raw_documents, y=None):
+        """
+        Adds a batch of documents to the document counts, expires the
+        batches that fell out of the window and refreshes vocabulary_/idf_.
+        """
+        try:
+            if not hasattr(self, "document_counts_"):
+                self._reset()
+
+            analyzer = self.build_analyzer()
+            batch_counts = Counter()
+            n_batch_docs = 0
+            for document in raw_documents:
+                batch_counts.update(set(analyzer(document)))
+                n_batch_docs += 1
+
+            self.n_docs_ += n_batch_docs
+            self.document_counts_.update(batch_counts)
+            if self.window_batches is not None:
+                self.batches_.append((n_batch_docs, batch_counts))
+                while len(self.batches_) > self.window_batches:
+                    n_expired_docs, expired_counts = self.batches_.popleft()
+                    self.n_docs_ -= n_expired_docs
+                    self.document_counts_.subtract(expired_counts)
+                    # Counter.subtract keeps zero counts around, drop them
+                    for term in expired_counts:
+                        if self.document_counts_[term] <= 0:
+                            del self.document_counts_[term]
+
+            self._refresh_idf()
+            logging.info(f"Incremental vectorizer updated: {self.n_docs_} documents, "
+                         f"{len(self.vocabulary_)} terms")
+            return self
+
+        except Exception as e:
+            raise customException(e, sys)
+
+    def _refresh_idf(self):
+        max_count = self.max_df if isinstance(self.max_df, numbers.Integral) else self.max_df * self.n_docs_
+        min_count = self.min_df if isinstance(self.min_df, numbers.Integral) else self.min_df * self.n_docs_
+
+        terms = sorted(
+            term for term, count in self.document_counts_.items()
+            if min_count <= count <= max_count
+        )
+        if not terms:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        document_frequency = np.fromiter(
+            (self.document_counts_[term] for term in terms), dtype=np.float64, count=len(terms)
+        )
+        self.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        self.fixed_vocabulary_ = False
+        set_idf(self, idf_from_document_frequency(self.n_docs_, document_frequency, self.smooth_idf))
+
+    def fit(self, raw_documents, y=None):
+        """
+        Discards any accumulated counts and fits on the documents as one batch.
+        """
+        self._reset()
+        return self.partial_fit(raw_documents)
+
+    def fit_transform(self, raw_documents, y=None):
+        raw_documents = list(raw_documents)
+        return self.fit(raw_documents).transform(raw_documents)
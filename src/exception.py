@@ -14,7 +14,7 @@ def error_message_detail(error:Exception) -> str:
         return f"An error occurred: [{str(error)}]"
 
 class customException(Exception):
-    def __init__(self, error: Exception):
+    def __init__(self, error: Exception, error_detail: Any = None):
         formatted_message = error_message_detail(error)
         super().__init__(formatted_message)
         self.error_message = formatted_message
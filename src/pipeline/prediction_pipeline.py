@@ -2,17 +2,123 @@ import sys
 import os
 from src.exception import customException
 from src.logger import logging
-from src.utils import load_object
+from src.utils import load_json, load_object
 from sklearn.metrics.pairwise import cosine_similarity
 
 
 from src.components.Data_ingestion import extract_text
+from src.components.mapped_vectorizer import load_mapped_vectorizer
+from src.components.artifact_store import ArtifactStore
+from src.components.skills import SkillMatcherConfig, load_skill_matcher
+from src.components.score_distribution import RECORDED_SCORES_FILE_PATH, load_score_distributions, record_score
+from src.components.retrieval import (
+    CascadeConfig, bm25_document_matrix, bm25_query_matrix, load_bm25_index, load_cascade_ranker, query_term_counts
+)
+from src.components.segmented_index import load_segmented_index, query_terms
+from src.components.ann_index import load_ann_index
+from src.components.lsa import project
+
+# Holds no state but its config (the current version is read from the
+# pointer file on every call), so all requests share one
+_artifact_store = ArtifactStore()
 
 class PredictionPipeline:
-    def __init__(self):
-        
-        self.preprocessor_path = os.path.join('artifacts', 'preprocessor.pkl')
-        logging.info("PredictionPipeline initialized")
+    def __init__(self, scoring="sparse"):
+        # "sparse" scores with TF-IDF cosine; "bm25" with the BM25 index
+        # over the trained resumes (its IDF and average length)
+        self.scoring = scoring
+
+        # Paths inside the current published version; the flat artifacts/
+        # layout is used when no version has been published yet
+        artifact_store = _artifact_store
+        self.artifact_version = artifact_store.current_version()
+        self.preprocessor_path = artifact_store.resolve('preprocessor.pkl', os.path.join('artifacts', 'preprocessor.pkl'))
+        self.preprocessor_dir = artifact_store.resolve('preprocessor', os.path.join('artifacts', 'preprocessor'))
+        self.score_distributions_dir = artifact_store.resolve(
+            'score_distributions', os.path.join('artifacts', 'score_distributions')
+        )
+        self.bm25_index_dir = artifact_store.resolve('bm25_index', os.path.join('artifacts', 'bm25_index'))
+        self.term_counts_path = artifact_store.resolve('term_counts.npz', os.path.join('artifacts', 'term_counts.npz'))
+        self.term_counts_index_path = artifact_store.resolve(
+            'term_counts_index.json', os.path.join('artifacts', 'term_counts_index.json')
+        )
+        self.resume_segments_dir = artifact_store.resolve('resume_segments', os.path.join('artifacts', 'resume_segments'))
+        self.ann_index_dir = artifact_store.resolve('ann_index', os.path.join('artifacts', 'ann_index'))
+        self.lsa_path = artifact_store.resolve('lsa.pkl', os.path.join('artifacts', 'lsa.pkl'))
+        self._vocabulary = None
+        self._lsa = None
+        self.skill_taxonomy_path = SkillMatcherConfig().taxonomy_file_path
+        self.recorded_scores_path = RECORDED_SCORES_FILE_PATH
+        logging.info(f"PredictionPipeline initialized (artifact version: {self.artifact_version})")
+
+    def extract_texts(self, resume_file_bytes, resume_filename, jd_file_bytes, jd_filename):
+        """
+        Parses the text of the uploaded resume and job description (in-memory).
+        """
+        logging.info(f"Parsing resume text from: {resume_filename}")
+        resume_text = extract_text(resume_file_bytes, resume_filename)
+        if not resume_text:
+            raise customException(f"Could not extract text from resume: {resume_filename}", sys)
+
+        logging.info(f"Parsing job description text from: {jd_filename}")
+        jd_text = extract_text(jd_file_bytes, jd_filename)
+        if not jd_text:
+            raise customException(f"Could not extract text from job description: {jd_filename}", sys)
+
+        logging.info("Text extraction complete.")
+        return resume_text, jd_text
+
+    def load_vectorizer(self):
+        """
+        Loads the saved TF-IDF vectorizer (the "brain"). The memory-mapped
+        copy is preferred; the pickle is the fallback for older artifacts.
+        """
+        if os.path.exists(os.path.join(self.preprocessor_dir, 'config.json')):
+            logging.info(f"Loading preprocessor from: {self.preprocessor_dir}")
+            vectorizer = load_mapped_vectorizer(self.preprocessor_dir)
+        else:
+            logging.info(f"Loading preprocessor from: {self.preprocessor_path}")
+            vectorizer = load_object(file_path=self.preprocessor_path)
+        if not vectorizer:
+            raise customException("Could not load preprocessor model. Has the training pipeline been run?", sys)
+
+        logging.info("Preprocessor model loaded successfully.")
+        return vectorizer
+
+    def score_texts(self, resume_text, jd_text):
+        """
+        Similarity score between a resume text and a job description text,
+        as a percentage (e.g., 85.25).
+        """
+        # 1. Load the saved TF-IDF vectorizer
+        vectorizer = self.load_vectorizer()
+
+        if self.scoring == "bm25":
+            # BM25 of the resume for the job's terms, normalised to [0, 1)
+            logging.info("Calculating BM25 score...")
+            bm25_index = load_bm25_index(self.bm25_index_dir)
+            counts = query_term_counts(vectorizer, [resume_text, jd_text])
+            score = bm25_document_matrix(bm25_index, counts[0]) @ bm25_query_matrix(bm25_index, counts[1]).T
+            return round(float(score.toarray()[0][0]) * 100, 2)
+
+        # 2. Transform the two new text documents
+        documents = [resume_text, jd_text]
+
+        logging.info("Transforming new text into TF-IDF vectors...")
+        vectors = vectorizer.transform(documents)
+
+        # 3. Separate the vectors
+        resume_vector = vectors[0]
+        jd_vector = vectors[1]
+
+        # 4. Calculate Cosine Similarity between just these two vectors
+        logging.info("Calculating cosine similarity...")
+        score = cosine_similarity(resume_vector, jd_vector)
+
+        similarity_score = score[0][0]
+
+        # 5. Format as percentage
+        return round(similarity_score * 100, 2)
 
     def predict_score(self, resume_file_bytes, resume_filename, jd_file_bytes, jd_filename):
         """
@@ -30,56 +136,176 @@ class PredictionPipeline:
         try:
             logging.info("Prediction process started")
 
-            # 1. Load the saved TF-IDF vectorizer (the "brain")
-            logging.info(f"Loading preprocessor from: {self.preprocessor_path}")
-            vectorizer = load_object(file_path=self.preprocessor_path)
-            if not vectorizer:
-                raise customException("Could not load preprocessor model. Has the training pipeline been run?", sys)
+            resume_text, jd_text = self.extract_texts(resume_file_bytes, resume_filename, jd_file_bytes, jd_filename)
+            final_score = self.score_texts(resume_text, jd_text)
+            
+            logging.info(f"Prediction complete. Score: {final_score}%")
             
-            logging.info("Preprocessor model loaded successfully.")
+            return final_score
+
+        except Exception as e:
+            logging.error("Error during prediction")
+            raise customException(e, sys)
+
+    def predict_score_with_skills(self, resume_file_bytes, resume_filename, jd_file_bytes, jd_filename):
+        """
+        Same as predict_score, plus the job description's skills (from the
+        skill taxonomy) that the resume covers and misses.
+
+        Returns:
+            dict: {"score", "matched_skills", "missing_skills", "skill_coverage"}
+        """
+        try:
+            logging.info("Prediction process started")
+
+            resume_text, jd_text = self.extract_texts(resume_file_bytes, resume_filename, jd_file_bytes, jd_filename)
+            result = {"score": self.score_texts(resume_text, jd_text)}
+
+            logging.info("Matching skills...")
+            result.update(load_skill_matcher(self.skill_taxonomy_path).coverage(resume_text, jd_text))
+
+            logging.info(
+                f"Prediction complete. Score: {result['score']}%, "
+                f"{len(result['matched_skills'])} matched / {len(result['missing_skills'])} missing skills"
+            )
+            return result
 
-            # 2. Parse text from the uploaded files (in-memory)
-            logging.info(f"Parsing resume text from: {resume_filename}")
-            resume_text = extract_text(resume_file_bytes, resume_filename)
-            if not resume_text:
-                raise customException(f"Could not extract text from resume: {resume_filename}", sys)
+        except Exception as e:
+            logging.error("Error during prediction")
+            raise customException(e, sys)
 
+    def rank_resumes(self, jd_file_bytes, jd_filename, k=10, n_candidates=None):
+        """
+        The k best resumes of the trained corpus for an uploaded job
+        description, best first, as {"resume_id", "score"} dicts. BM25
+        picks n_candidates resumes (default from CascadeConfig) and only
+        those get the exact score of score_texts.
+        """
+        try:
             logging.info(f"Parsing job description text from: {jd_filename}")
             jd_text = extract_text(jd_file_bytes, jd_filename)
             if not jd_text:
                 raise customException(f"Could not extract text from job description: {jd_filename}", sys)
-            
-            logging.info("Text extraction complete.")
 
-            # 3. Transform the two new text documents
-            
-            documents = [resume_text, jd_text]
-            
-            logging.info("Transforming new text into TF-IDF vectors...")
-            vectors = vectorizer.transform(documents)
-            
-            # 4. Separate the vectors
-            resume_vector = vectors[0]
-            jd_vector = vectors[1]
+            cascade_config = CascadeConfig()
+            ranker = load_cascade_ranker(
+                self.bm25_index_dir, self.term_counts_path, self.load_vectorizer,
+                n_candidates=cascade_config.n_candidates, prune=cascade_config.prune
+            )
+            if ranker is None:
+                raise customException("No BM25 index found. Enable CascadeConfig and run the training pipeline.", sys)
 
-            # 5. Calculate Cosine Similarity between just these two vectors
-            logging.info("Calculating cosine similarity...")
-            score = cosine_similarity(resume_vector, jd_vector)
-            
-            
-            similarity_score = score[0][0]
-            
-            
+            ranking = ranker.rank(jd_text, k=k, n_candidates=n_candidates)
+            logging.info(f"Ranked resumes for {jd_filename}: {len(ranking)} results")
+            return ranking
 
-            # 6. Format as percentage
-            final_score = round(similarity_score * 100, 2)
-            
-            logging.info(f"Prediction complete. Score: {final_score}%")
-            
-            return final_score
+        except Exception as e:
+            logging.error("Error during resume ranking")
+            raise customException(e, sys)
+
+    def search_resumes(self, jd_file_bytes, jd_filename, k=10):
+        """
+        The k best resumes of the segmented index for an uploaded job
+        description by BM25 alone, best first, as {"resume_id", "score"}
+        dicts. Resumes added or withdrawn since training are included.
+        """
+        try:
+            logging.info(f"Parsing job description text from: {jd_filename}")
+            jd_text = extract_text(jd_file_bytes, jd_filename)
+            if not jd_text:
+                raise customException(f"Could not extract text from job description: {jd_filename}", sys)
+
+            segmented_index = load_segmented_index(self.resume_segments_dir)
+            if segmented_index is None:
+                raise customException(
+                    "No segmented index found. Enable SegmentedIndexConfig and run the training pipeline.", sys
+                )
+
+            # Vectorizer columns to terms, as the index was synced with
+            if self._vocabulary is None:
+                self._vocabulary = (load_json(self.term_counts_index_path).get('vocabulary'),)
+            counts = query_term_counts(self.load_vectorizer(), [jd_text])
+            ids, scores = segmented_index.search(query_terms(counts, self._vocabulary[0]), n=k)
+
+            ranking = [
+                {"resume_id": str(resume_id), "score": round(float(score) * 100, 2)}
+                for resume_id, score in zip(ids, scores)
+            ]
+            logging.info(f"Searched resumes for {jd_filename}: {len(ranking)} results")
+            return ranking
 
         except Exception as e:
-            logging.error("Error during prediction")
+            logging.error("Error during resume search")
+            raise customException(e, sys)
+
+    def similar_resumes(self, jd_file_bytes, jd_filename, k=10):
+        """
+        The k resumes of the trained corpus most similar to an uploaded job
+        description, best first, as {"resume_id", "score"} dicts. The LSH
+        index picks the candidates (its recall@k is checked when it is
+        built) and they are scored by exact cosine similarity of the
+        indexed vectors.
+        """
+        try:
+            logging.info(f"Parsing job description text from: {jd_filename}")
+            jd_text = extract_text(jd_file_bytes, jd_filename)
+            if not jd_text:
+                raise customException(f"Could not extract text from job description: {jd_filename}", sys)
+
+            ann_index = load_ann_index(self.ann_index_dir)
+            if ann_index is None:
+                raise customException("No LSH index found. Enable AnnIndexConfig and run the training pipeline.", sys)
+
+            # The job as the same kind of vector as the indexed resumes
+            vectors = self.load_vectorizer().transform([jd_text])
+            if ann_index.metadata.get("vectors") == "lsa":
+                if self._lsa is None:
+                    self._lsa = load_object(file_path=self.lsa_path)
+                vectors = project(self._lsa, vectors)
+            [(ids, scores)], _ = ann_index.query(vectors, k=k)
+
+            ranking = [
+                {"resume_id": str(resume_id), "score": round(float(score) * 100, 2)}
+                for resume_id, score in zip(ids, scores)
+            ]
+            logging.info(f"Similar resumes for {jd_filename}: {len(ranking)} results")
+            return ranking
+
+        except Exception as e:
+            logging.error("Error during similar resume search")
+            raise customException(e, sys)
+
+    def percentile_rank(self, job_id, score, record=False, resume_key=None):
+        """
+        Percentage of the applicants of a trained job that score below score
+        (e.g. 83.0 for "better than 83% of applicants"), or None if the job
+        has no saved score distribution or it was computed with another
+        scoring mode than this pipeline's. With record=True the score of the
+        resume identified by resume_key is recorded on disk and joins the
+        job's distribution at the next training run; ranks only use the
+        published distributions, so every serving process agrees.
+        """
+        try:
+            distributions = load_score_distributions(self.score_distributions_dir)
+            if distributions is None:
+                logging.info(f"No score distributions at {self.score_distributions_dir}")
+                return None
+            if distributions.scoring != self.scoring:
+                # A cosine score ranked among BM25 or LSA scores means nothing
+                logging.info(f"Score distributions were computed with {distributions.scoring} scoring, "
+                             f"not {self.scoring}")
+                return None
+
+            rank = distributions.percentile_rank(job_id, score)
+            if record and rank is not None:
+                if not resume_key:
+                    raise customException("Recording a score needs the resume_key of the resume.", sys)
+                record_score(job_id, resume_key, score, self.scoring, self.recorded_scores_path)
+            logging.info(f"Score {score}% ranks at the {rank} percentile of job {job_id}")
+            return rank
+
+        except Exception as e:
+            logging.error("Error during percentile ranking")
             raise customException(e, sys)
 
 if __name__ == "__main__":
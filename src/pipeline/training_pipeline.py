@@ -1,9 +1,41 @@
+import os
 import sys
+import time
+import shutil
+from dataclasses import asdict
 from src.exception import customException
 from src.logger import logging
 from src.components.Data_ingestion import DataIngestion
 from src.components.Data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.components.ann_index import ResumeIndexer
+from src.components.retrieval import CandidateIndexer
+from src.components.segmented_index import ResumeSegmentIndexer
+from src.components.artifact_store import ArtifactStore, MANIFEST_FILE_NAME, file_sha256
+
+# Files of the current version that are not copied into an update: scores,
+# LSA vectors and the resume index of the previous corpus would be stale.
+# The score store is kept: it tracks which model computed each score itself
+STALE_AFTER_UPDATE = (
+    MANIFEST_FILE_NAME, 'ats_scores.csv', 'ats_scores.npy', 'ats_scores.parquet',
+    'ats_top_k.csv', 'ats_top_k_per_resume.csv', 'score_distributions', 'lsa.pkl', 'lsa_vectors.npy', 'ann_index',
+    'bm25_index',
+)
+# Kept when the update does not refit: new documents are projected onto them
+LSA_FILES = ('lsa.pkl', 'lsa_vectors.npy')
+# Immutable once written, so a new version links them instead of copying
+SEGMENTED_INDEX_DIR_NAME = 'resume_segments'
+# Its files are replaced, never rewritten, so it is linked as well
+SCORE_STORE_DIR_NAME = 'score_store'
+
+
+def link_or_copy(src, dst):
+    # Hard link; copy across file systems
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 
 class TrainingPipeline:
     def __init__(self):
@@ -11,40 +43,263 @@ class TrainingPipeline:
         self.data_ingestion = DataIngestion()
         self.data_transformation = DataTransformation()
         self.model_trainer = ModelTrainer()
+        self.resume_indexer = ResumeIndexer()
+        self.candidate_indexer = CandidateIndexer()
+        self.resume_segment_indexer = ResumeSegmentIndexer()
+        self.artifact_store = ArtifactStore()
+
+    def stage_artifact_paths(self, staging_dir):
+        """
+        Points every artifact the components write at the staging directory
+        of the version being built.
+        """
+        transformation_config = self.data_transformation.transformation_config
+        transformation_config.preprocessor_obj_file_path = os.path.join(staging_dir, 'preprocessor.pkl')
+        transformation_config.preprocessor_dir = os.path.join(staging_dir, 'preprocessor')
+        transformation_config.term_counts_file_path = os.path.join(staging_dir, 'term_counts.npz')
+        transformation_config.term_counts_index_file_path = os.path.join(staging_dir, 'term_counts_index.json')
+        transformation_config.corpus_term_counts_file_path = os.path.join(staging_dir, 'corpus_term_counts.npz')
+        transformation_config.corpus_terms_file_path = os.path.join(staging_dir, 'corpus_terms.json')
+        transformation_config.lsa_obj_file_path = os.path.join(staging_dir, 'lsa.pkl')
+        transformation_config.lsa_vectors_file_path = os.path.join(staging_dir, 'lsa_vectors.npy')
+        trainer_config = self.model_trainer.model_trainer_config
+        scores_file_name = os.path.basename(trainer_config.scores_file_path)
+        trainer_config.scores_file_path = os.path.join(staging_dir, scores_file_name)
+        trainer_config.top_k_scores_file_path = os.path.join(staging_dir, 'ats_top_k.csv')
+        trainer_config.top_k_per_resume_file_path = os.path.join(staging_dir, 'ats_top_k_per_resume.csv')
+        trainer_config.lsa_vectors_file_path = transformation_config.lsa_vectors_file_path
+        trainer_config.term_counts_index_file_path = transformation_config.term_counts_index_file_path
+        trainer_config.term_counts_file_path = transformation_config.term_counts_file_path
+        trainer_config.preprocessor_dir = transformation_config.preprocessor_dir
+        trainer_config.lsa_obj_file_path = transformation_config.lsa_obj_file_path
+        if trainer_config.score_distributions_dir:
+            trainer_config.score_distributions_dir = os.path.join(staging_dir, 'score_distributions')
+        if trainer_config.score_store_dir:
+            trainer_config.score_store_dir = os.path.join(staging_dir, SCORE_STORE_DIR_NAME)
+        self.resume_indexer.ann_index_config.index_dir = os.path.join(staging_dir, 'ann_index')
+        self.candidate_indexer.cascade_config.index_dir = os.path.join(staging_dir, 'bm25_index')
+        # BM25 scoring writes the same index the cascade uses
+        cascade_config = self.candidate_indexer.cascade_config
+        trainer_config.bm25_index_dir = cascade_config.index_dir
+        trainer_config.bm25_k1, trainer_config.bm25_b = cascade_config.k1, cascade_config.b
+        self.resume_segment_indexer.segmented_index_config.index_dir = os.path.join(staging_dir, SEGMENTED_INDEX_DIR_NAME)
+
+    def seed_score_store(self, staging_dir):
+        """
+        Links the score store of the current version into the version being
+        built, so that scores of an unchanged model are reused without
+        copying the grid. ScoreStore.save replaces its files instead of
+        rewriting them, so the current version keeps its own.
+        """
+        store_dir = self.model_trainer.model_trainer_config.score_store_dir
+        current_version = self.artifact_store.current_version()
+        if not store_dir or current_version is None:
+            return
+        source = os.path.join(self.artifact_store.version_dir(current_version), SCORE_STORE_DIR_NAME)
+        if os.path.isdir(source):
+            shutil.copytree(source, store_dir, copy_function=link_or_copy)
+            logging.info(f"Score store seeded from artifact version {current_version}")
+
+    def seed_segmented_index(self, staging_dir):
+        """
+        Links the segmented index of the current version into the version
+        being built, so that only the changed resumes are written. Segment
+        files are never modified, so both versions can share them; hard
+        links fall back to copies across file systems.
+        """
+        config = self.resume_segment_indexer.segmented_index_config
+        current_version = self.artifact_store.current_version()
+        if not config.enabled or current_version is None:
+            return
+        source = os.path.join(self.artifact_store.version_dir(current_version), SEGMENTED_INDEX_DIR_NAME)
+        if not os.path.isdir(source):
+            return
+        shutil.copytree(source, config.index_dir, copy_function=link_or_copy)
+        logging.info(f"Segmented index seeded from artifact version {current_version}")
+
+    def build_resume_index(self, preprocessor_obj_path):
+        transformation_config = self.data_transformation.transformation_config
+        return self.resume_indexer.initiate_index_building(
+            preprocessor_obj_path,
+            transformation_config.term_counts_file_path,
+            transformation_config.term_counts_index_file_path,
+            transformation_config.lsa_vectors_file_path
+        )
+
+    def build_bm25_index(self, preprocessor_obj_path):
+        transformation_config = self.data_transformation.transformation_config
+        return self.candidate_indexer.initiate_bm25_index(
+            preprocessor_obj_path,
+            transformation_config.term_counts_file_path,
+            transformation_config.term_counts_index_file_path
+        )
+
+    def build_segmented_index(self):
+        transformation_config = self.data_transformation.transformation_config
+        return self.resume_segment_indexer.initiate_segmented_index(
+            transformation_config.term_counts_file_path,
+            transformation_config.term_counts_index_file_path
+        )
 
     def run_pipeline(self):
         """
         Executes the full training pipeline step-by-step.
+        All artifacts are written to a new version directory, which becomes
+        the served version only once every step has succeeded.
         """
+        staging_dir = self.artifact_store.create_staging_dir()
         try:
             logging.info("Training pipeline started...")
+            self.stage_artifact_paths(staging_dir)
+            self.seed_score_store(staging_dir)
+            self.seed_segmented_index(staging_dir)
+            stage_timings = {}
 
             # Step 1: Data Ingestion
-           
+
             logging.info("Starting Data Ingestion...")
+            start = time.perf_counter()
             processed_data_path = self.data_ingestion.initiate_data_ingestion()
+            stage_timings['data_ingestion'] = time.perf_counter() - start
             logging.info(f"Data Ingestion completed. Processed data at: {processed_data_path}")
 
             # Step 2: Data Transformation
-            
+
             logging.info("Starting Data Transformation...")
+            start = time.perf_counter()
             preprocessor_obj_path = self.data_transformation.initiate_data_transformation(processed_data_path)
+            stage_timings['data_transformation'] = time.perf_counter() - start
             logging.info(f"Data Transformation completed. Preprocessor at: {preprocessor_obj_path}")
 
             # Step 3: Model Training (Scoring)
-            
+
             logging.info("Starting Model Training (Scoring)...")
+            start = time.perf_counter()
             self.model_trainer.initiate_model_training(processed_data_path, preprocessor_obj_path)
+            stage_timings['model_training'] = time.perf_counter() - start
             logging.info("Model Training (Scoring) completed.")
 
-            logging.info("Training pipeline finished successfully.")
+            # Step 4 (optional): Approximate nearest-neighbour index over the resumes
+            if self.resume_indexer.ann_index_config.enabled:
+                logging.info("Starting Resume Index building...")
+                start = time.perf_counter()
+                self.build_resume_index(preprocessor_obj_path)
+                stage_timings['resume_indexing'] = time.perf_counter() - start
+                logging.info("Resume Index building completed.")
+
+            # Step 4b (optional): BM25 candidate index for the two-stage ranking cascade
+            if self.candidate_indexer.cascade_config.enabled:
+                logging.info("Starting BM25 Index building...")
+                start = time.perf_counter()
+                self.build_bm25_index(preprocessor_obj_path)
+                stage_timings['bm25_indexing'] = time.perf_counter() - start
+                logging.info("BM25 Index building completed.")
+
+            # Step 4c (optional): segmented BM25 index, synced with the new corpus
+            if self.resume_segment_indexer.segmented_index_config.enabled:
+                logging.info("Starting Segmented Index sync...")
+                start = time.perf_counter()
+                self.build_segmented_index()
+                stage_timings['segmented_indexing'] = time.perf_counter() - start
+                logging.info("Segmented Index sync completed.")
+
+            # Step 5: Publish the version and make it current
+            version = self.artifact_store.publish(
+                staging_dir,
+                stage_timings=stage_timings,
+                metadata={
+                    'processed_data_sha256': file_sha256(processed_data_path),
+                    # Settings only; the artifact paths point at the staging directory
+                    'data_transformation_config': {
+                        key: value
+                        for key, value in asdict(self.data_transformation.transformation_config).items()
+                        if not key.endswith(('_file_path', '_dir'))
+                    },
+                }
+            )
+
+            logging.info(f"Training pipeline finished successfully. Artifact version: {version}")
+            return version
 
         except Exception as e:
+            self.artifact_store.discard_staging_dir(staging_dir)
             logging.error("Training pipeline failed.")
             raise customException(e, sys)
 
+    def run_update_pipeline(self, new_data_path):
+        """
+        Folds new documents into the current incremental vectorizer
+        (see DataTransformation.update_data_transformation), re-scores the
+        corpus and publishes the result as a new version. The current
+        version is left untouched.
+        """
+        current_version = self.artifact_store.current_version()
+        if current_version is None:
+            raise customException("No published artifact version to update. Run the training pipeline first.", sys)
+
+        staging_dir = self.artifact_store.create_staging_dir()
+        try:
+            logging.info(f"Update pipeline started from artifact version {current_version}")
+            current_dir = self.artifact_store.version_dir(current_version)
+            stale = STALE_AFTER_UPDATE
+            if not self.data_transformation.transformation_config.refit_on_update:
+                stale = tuple(name for name in stale if name not in LSA_FILES)
+            for name in os.listdir(current_dir):
+                # Linked or rebuilt below when enabled
+                if name in stale or name in (SCORE_STORE_DIR_NAME, SEGMENTED_INDEX_DIR_NAME):
+                    continue
+                source = os.path.join(current_dir, name)
+                if os.path.isdir(source):
+                    shutil.copytree(source, os.path.join(staging_dir, name))
+                else:
+                    shutil.copy2(source, os.path.join(staging_dir, name))
+            self.stage_artifact_paths(staging_dir)
+            self.seed_score_store(staging_dir)
+            self.seed_segmented_index(staging_dir)
+
+            start = time.perf_counter()
+            preprocessor_obj_path = self.data_transformation.update_data_transformation(new_data_path)
+            stage_timings = {'data_transformation_update': time.perf_counter() - start}
+
+            # Scoring works on the cached term counts, so the whole updated
+            # corpus is re-scored without reading any old text
+            start = time.perf_counter()
+            self.model_trainer.initiate_model_training(new_data_path, preprocessor_obj_path)
+            stage_timings['model_training'] = time.perf_counter() - start
+
+            if self.resume_indexer.ann_index_config.enabled:
+                start = time.perf_counter()
+                self.build_resume_index(preprocessor_obj_path)
+                stage_timings['resume_indexing'] = time.perf_counter() - start
+
+            if self.candidate_indexer.cascade_config.enabled:
+                start = time.perf_counter()
+                self.build_bm25_index(preprocessor_obj_path)
+                stage_timings['bm25_indexing'] = time.perf_counter() - start
+
+            if self.resume_segment_indexer.segmented_index_config.enabled:
+                start = time.perf_counter()
+                self.build_segmented_index()
+                stage_timings['segmented_indexing'] = time.perf_counter() - start
+
+            version = self.artifact_store.publish(
+                staging_dir,
+                stage_timings=stage_timings,
+                metadata={
+                    'parent_version': current_version,
+                    'new_data_sha256': file_sha256(new_data_path),
+                }
+            )
+            logging.info(f"Update pipeline finished successfully. Artifact version: {version}")
+            return version
+
+        except Exception as e:
+            self.artifact_store.discard_staging_dir(staging_dir)
+            logging.error("Update pipeline failed.")
+            raise customException(e, sys)
+
 
 if __name__ == "__main__":
-    
+
     pipeline = TrainingPipeline()
-    pipeline.run_pipeline()
\ No newline at end of file
+    pipeline.run_pipeline()
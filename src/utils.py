@@ -1,6 +1,8 @@
 import os
 import sys
+import json
 import pickle
+import scipy.sparse as sp
 from src.exception import customException
 from src.logger import logging
 
@@ -32,4 +34,62 @@ def load_object(file_path):
         return obj
 
     except Exception as e:
-        raise customException(e, sys)
\ No newline at end of file
+        raise customException(e, sys)
+
+def save_sparse_matrix(file_path, matrix):
+    """
+    Saves a scipy sparse matrix to a compressed .npz file.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        sp.save_npz(file_path, sp.csr_matrix(matrix))
+
+        logging.info(f"Sparse matrix {matrix.shape} saved to {file_path}")
+
+    except Exception as e:
+        raise customException(e, sys)
+
+def load_sparse_matrix(file_path):
+    """
+    Loads a scipy sparse matrix saved with save_sparse_matrix.
+    """
+    try:
+        matrix = sp.load_npz(file_path).tocsr()
+
+        logging.info(f"Sparse matrix {matrix.shape} loaded from {file_path}")
+        return matrix
+
+    except Exception as e:
+        raise customException(e, sys)
+
+def save_json(file_path, obj):
+    """
+    Saves a JSON-serialisable object to a file.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        with open(file_path, "w", encoding="utf-8") as file_obj:
+            json.dump(obj, file_obj)
+
+        logging.info(f"JSON saved to {file_path}")
+
+    except Exception as e:
+        raise customException(e, sys)
+
+def load_json(file_path):
+    """
+    Loads an object from a JSON file.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as file_obj:
+            obj = json.load(file_obj)
+
+        logging.info(f"JSON loaded from {file_path}")
+        return obj
+
+    except Exception as e:
+        raise customException(e, sys)
@@ -0,0 +1,112 @@
+import os
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from src.components.ann_index import LSHIndex, ResumeIndexer
+from src.components.lsa import fit_lsa, project
+from src.components.vectorizers import term_count_matrix, tfidf_from_counts
+from src.exception import customException
+from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.utils import load_json, save_json, save_object, save_sparse_matrix
+
+TOPICS = [
+    "python machine learning models pandas sql",
+    "java spring backend microservices kubernetes",
+    "nurse patient care hospital clinical",
+    "sales account management negotiation clients",
+]
+JOB = "backend engineer with java and kubernetes"
+
+
+def corpus(rng, n_resumes=80, n_jobs=12):
+    words = " ".join(TOPICS).split()
+    texts = [
+        f"{TOPICS[row % len(TOPICS)]} {' '.join(rng.choice(words, size=6))}"
+        for row in range(n_resumes + n_jobs)
+    ]
+    types = ["resume"] * n_resumes + ["job_description"] * n_jobs
+    return texts, [f"doc{row}" for row in range(len(texts))], types
+
+
+def write_artifacts(dir_path, texts, ids, types):
+    vectorizer = TfidfVectorizer().fit(texts)
+    term_counts = term_count_matrix(vectorizer, texts)
+    paths = {name: os.path.join(dir_path, name) for name in (
+        "preprocessor.pkl", "term_counts.npz", "term_counts_index.json", "lsa.pkl", "lsa_vectors.npy"
+    )}
+    save_object(paths["preprocessor.pkl"], vectorizer)
+    save_sparse_matrix(paths["term_counts.npz"], term_counts)
+    save_json(paths["term_counts_index.json"], {"ids": ids, "types": types})
+    svd, lsa_vectors = fit_lsa(tfidf_from_counts(vectorizer, term_counts), 8)
+    save_object(paths["lsa.pkl"], svd)
+    np.save(paths["lsa_vectors.npy"], lsa_vectors)
+    return vectorizer, svd, paths
+
+
+def build_index(indexer, paths):
+    return indexer.initiate_index_building(
+        paths["preprocessor.pkl"], paths["term_counts.npz"],
+        paths["term_counts_index.json"], paths["lsa_vectors.npy"]
+    )
+
+
+@pytest.mark.parametrize("vectors", ["tfidf", "lsa"])
+def test_similar_resumes_served_from_checked_index(tmp_path, monkeypatch, vectors):
+    monkeypatch.chdir(tmp_path)
+    texts, ids, types = corpus(np.random.default_rng(0))
+    vectorizer, svd, paths = write_artifacts(str(tmp_path), texts, ids, types)
+
+    # Few bits and several probed tables: every resume is a candidate
+    indexer = ResumeIndexer()
+    config = indexer.ann_index_config
+    config.index_dir, config.vectors, config.n_bits, config.min_recall = str(tmp_path / "ann_index"), vectors, 2, 1.0
+    index_dir = build_index(indexer, paths)
+    report = load_json(os.path.join(index_dir, "recall_report.json"))
+    assert report["recall_at_k"] == 1.0
+
+    pipeline = PredictionPipeline()
+    pipeline.ann_index_dir, pipeline.lsa_path = index_dir, paths["lsa.pkl"]
+    monkeypatch.setattr(pipeline, "load_vectorizer", lambda: vectorizer)
+    ranking = pipeline.similar_resumes(JOB.encode(), "job.txt", k=5)
+
+    # Same resumes and scores as exact cosine similarity over all of them
+    job_vector = vectorizer.transform([JOB])
+    resume_vectors = vectorizer.transform(texts[:types.count("resume")])
+    if vectors == "lsa":
+        job_vector, resume_vectors = project(svd, job_vector), project(svd, resume_vectors)
+    exact = cosine_similarity(resume_vectors, job_vector).ravel()
+    top = np.argsort(-exact, kind="stable")[:5]
+    assert [result["resume_id"] for result in ranking] == [ids[row] for row in top]
+    assert [result["score"] for result in ranking] == pytest.approx(list(exact[top] * 100), abs=0.01)
+
+
+def test_index_build_fails_below_min_recall(tmp_path):
+    rng = np.random.default_rng(0)
+    n_resumes, n_jobs = 500, 20
+    ids = [f"doc{row}" for row in range(n_resumes + n_jobs)]
+    types = ["resume"] * n_resumes + ["job_description"] * n_jobs
+    save_json(str(tmp_path / "index.json"), {"ids": ids, "types": types})
+    np.save(tmp_path / "lsa_vectors.npy", rng.standard_normal((len(ids), 32)).astype(np.float32))
+
+    # One table of 16 bits and no probes: nearly every resume has its own bucket
+    indexer = ResumeIndexer()
+    config = indexer.ann_index_config
+    config.index_dir, config.n_tables, config.n_bits, config.n_probes = str(tmp_path / "ann_index"), 1, 16, 0
+    with pytest.raises(customException, match="below min_recall"):
+        indexer.initiate_index_building(None, None, str(tmp_path / "index.json"), str(tmp_path / "lsa_vectors.npy"))
+    assert load_json(str(tmp_path / "ann_index" / "recall_report.json"))["recall_at_k"] < config.min_recall
+
+
+def test_saved_index_answers_like_the_built_one(tmp_path):
+    rng = np.random.default_rng(1)
+    items, queries = rng.standard_normal((300, 16)), rng.standard_normal((10, 16))
+    index = LSHIndex(16, n_tables=4, n_bits=6).add(items, [f"r{row}" for row in range(300)])
+    index.metadata = {"vectors": "lsa"}
+    index.save(str(tmp_path))
+
+    loaded = LSHIndex.load(str(tmp_path))
+    assert loaded.metadata == {"vectors": "lsa"}
+    for (ids, scores), (loaded_ids, loaded_scores) in zip(index.query(queries)[0], loaded.query(queries)[0]):
+        np.testing.assert_array_equal(loaded_ids, ids)
+        np.testing.assert_array_equal(loaded_scores, scores)
@@ -0,0 +1,96 @@
+import os
+import logging
+import pytest
+from src.components.artifact_store import ArtifactStore
+from src.exception import customException
+from src.pipeline.prediction_pipeline import PredictionPipeline
+
+
+def artifact_store(tmp_path):
+    store = ArtifactStore()
+    store.store_config.root_dir = str(tmp_path)
+    store.store_config.versions_dir = str(tmp_path / "versions")
+    store.store_config.pointer_file_path = str(tmp_path / "current")
+    return store
+
+
+def publish(store, content):
+    staging_dir = store.create_staging_dir()
+    os.makedirs(os.path.join(staging_dir, "preprocessor"))
+    with open(os.path.join(staging_dir, "preprocessor", "config.json"), "w") as file_obj:
+        file_obj.write(content)
+    return store.publish(staging_dir)
+
+
+def test_publish_switches_the_pointer_and_rolls_back(tmp_path):
+    store = artifact_store(tmp_path)
+    assert store.current_version() is None
+    assert store.resolve("preprocessor", "fallback") == "fallback"
+
+    first = publish(store, "one")
+    second = publish(store, "two")
+    assert store.current_version() == second
+    assert store.resolve("preprocessor") == os.path.join(store.version_dir(second), "preprocessor")
+    # Identical content is the same version
+    assert publish(store, "one") == first
+    assert store.list_versions() == [second, first]
+
+    store.set_current_version(first)
+    assert store.current_version() == first
+    with pytest.raises(customException, match="not published"):
+        store.set_current_version("0" * 16)
+    assert store.current_version() == first
+    # No temporary pointer files are left behind
+    assert sorted(os.listdir(tmp_path)) == ["current", "versions"]
+
+
+def test_interrupted_pointer_switch_keeps_the_previous_version(tmp_path, monkeypatch):
+    store = artifact_store(tmp_path)
+    first = publish(store, "one")
+
+    def crash(src, dst):
+        raise OSError("crashed before the rename")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(customException):
+        publish(store, "two")
+    monkeypatch.undo()
+
+    # The new version is on disk but readers still see the old one, whole
+    assert store.current_version() == first
+    assert store.verify(first) == []
+
+
+def test_gc_never_deletes_the_current_version(tmp_path):
+    store = artifact_store(tmp_path)
+    versions = [publish(store, str(i)) for i in range(4)]
+    store.set_current_version(versions[0])
+
+    removed = store.gc(keep_versions=1)
+
+    assert sorted(removed) == sorted(versions[1:3])
+    assert store.list_versions() == [versions[3], versions[0]]
+    assert store.current_version() == versions[0]
+    assert store.gc(keep_versions=0) == [versions[3]]
+    assert store.list_versions() == [versions[0]]
+
+
+def test_verify_reports_changed_and_missing_files(tmp_path):
+    store = artifact_store(tmp_path)
+    version = publish(store, "one")
+    assert store.verify(version) == []
+
+    version_dir = store.version_dir(version)
+    with open(os.path.join(version_dir, "preprocessor", "config.json"), "w") as file_obj:
+        file_obj.write("tampered")
+    assert store.verify(version) == ["preprocessor/config.json"]
+    os.remove(os.path.join(version_dir, "preprocessor", "config.json"))
+    assert store.verify(version) == ["preprocessor/config.json"]
+
+
+def test_prediction_pipelines_share_one_artifact_store(caplog):
+    # A pipeline is built for every request
+    with caplog.at_level(logging.INFO):
+        PredictionPipeline()
+        PredictionPipeline()
+    assert "ArtifactStore initialized" not in caplog.text
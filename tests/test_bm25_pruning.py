@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from src.components.retrieval import BM25Index
+
+
+def zipf_term_counts(n_docs, n_terms, doc_length, rng):
+    probabilities = 1 / np.arange(1, n_terms + 1)
+    columns = rng.choice(n_terms, size=n_docs * doc_length, p=probabilities / probabilities.sum())
+    rows = np.repeat(np.arange(n_docs), doc_length)
+    counts = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(n_docs, n_terms))
+    counts.sum_duplicates()
+    return counts
+
+
+def build_index(seed):
+    rng = np.random.default_rng(seed)
+    term_counts = zipf_term_counts(1500, 3000, 80, rng)
+    # Copies of some resumes score exactly alike, so the n-th place is tied
+    copies = rng.choice(term_counts.shape[0], size=300)
+    term_counts = sp.vstack([term_counts, term_counts[np.repeat(copies, 2)]], format="csr")
+    queries = zipf_term_counts(20, 3000, 25, rng)
+    return BM25Index.build(term_counts, np.arange(term_counts.shape[0]).astype(str)), queries
+
+
+def assert_same_top(index, query, n):
+    expected_positions, expected_scores = index.top(query, n)
+    positions, scores = index.top(query, n, prune=True)
+    np.testing.assert_array_equal(positions, expected_positions)
+    np.testing.assert_array_equal(scores, expected_scores)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_pruned_top_equals_exhaustive(seed):
+    index, queries = build_index(seed)
+    n_pruned = 0
+    for i in range(queries.shape[0]):
+        for n in (1, 5, 10, 100, 1000):
+            assert_same_top(index, queries[i], n)
+            _, _, n_scored = index.top_pruned(queries[i], n)
+            n_pruned += n_scored < int(np.diff(index.postings.indptr)[index.query_terms(queries[i])[0]].sum())
+    # Pruning actually skipped postings, so the comparison is not trivial
+    assert n_pruned
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_pruned_top_equals_exhaustive_with_ties_at_nth_place(seed):
+    index, queries = build_index(seed)
+    n_tied = 0
+    for i in range(queries.shape[0]):
+        scores = np.sort(index.scores(queries[i]))[::-1]
+        scores = scores[scores > 0]
+        # n such that the n-th and the (n+1)-th best scores are equal
+        tied = np.flatnonzero(scores[:-1] == scores[1:])[:5] + 1
+        for n in tied:
+            assert_same_top(index, queries[i], int(n))
+        n_tied += len(tied)
+    assert n_tied
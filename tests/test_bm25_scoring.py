@@ -0,0 +1,70 @@
+import math
+from collections import Counter
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.components.retrieval import BM25Index, query_term_counts
+from src.components.vectorizers import term_count_matrix, vocabulary_terms
+from src.pipeline.prediction_pipeline import PredictionPipeline
+
+RESUMES = [
+    "python developer building data pipelines in python",
+    "machine learning engineer python models",
+    "nurse caring for patients in a busy hospital ward",
+    "sales manager growing accounts and clients",
+    "data engineer building sql pipelines and python tooling for data teams",
+]
+# Not indexed: scored with the corpus statistics of the index
+NEW_RESUME = "python data engineer and nurse"
+JOBS = ["python data engineer", "hospital nurse", "pastry chef", "data data python"]
+
+
+def textbook_bm25(resume, job, analyzer, k1=1.2, b=0.75):
+    # Okapi BM25 with the Lucene IDF over the unigrams of RESUMES,
+    # divided by the job's highest attainable score
+    corpus = [Counter(term for term in analyzer(text) if " " not in term) for text in RESUMES]
+    avg_length = sum(sum(counts.values()) for counts in corpus) / len(corpus)
+    counts = Counter(term for term in analyzer(resume) if " " not in term)
+    length = sum(counts.values())
+    score = upper_bound = 0.0
+    for term, query_tf in Counter(term for term in analyzer(job) if " " not in term).items():
+        df = sum(term in document for document in corpus)
+        if not df:
+            continue
+        idf = math.log(1 + (len(corpus) - df + 0.5) / (df + 0.5))
+        tf = counts[term]
+        score += query_tf * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        upper_bound += query_tf * idf * (k1 + 1)
+    return score / upper_bound if upper_bound else 0.0
+
+
+def test_score_texts_bm25_equals_index_scores(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(RESUMES)
+    term_counts = term_count_matrix(vectorizer, RESUMES)
+    bm25_index = BM25Index.build(
+        term_counts, np.array([f"r{row}" for row in range(len(RESUMES))]),
+        terms=vocabulary_terms(vectorizer.vocabulary_)
+    )
+    bm25_index.save(str(tmp_path / "bm25_index"))
+
+    pipeline = PredictionPipeline(scoring="bm25")
+    pipeline.bm25_index_dir = str(tmp_path / "bm25_index")
+    monkeypatch.setattr(pipeline, "load_vectorizer", lambda: vectorizer)
+    analyzer = vectorizer.build_analyzer()
+
+    for job in JOBS:
+        query_counts = query_term_counts(vectorizer, [job])
+        terms, query_tf = bm25_index.query_terms(query_counts)
+        upper_bound = float(bm25_index.idf[terms] @ query_tf) * (bm25_index.k1 + 1)
+        index_scores = bm25_index.scores(query_counts) / upper_bound if upper_bound else np.zeros(len(RESUMES))
+
+        for row, resume in enumerate(RESUMES):
+            score = pipeline.score_texts(resume, job)
+            # Rounding to two decimals may differ by one step in float32
+            assert score == pytest.approx(index_scores[row] * 100, abs=0.01)
+            assert score == pytest.approx(textbook_bm25(resume, job, analyzer) * 100, abs=0.01)
+        assert pipeline.score_texts(NEW_RESUME, job) == pytest.approx(
+            textbook_bm25(NEW_RESUME, job, analyzer) * 100, abs=0.01
+        )
+    assert pipeline.score_texts(RESUMES[0], "pastry chef") == 0.0
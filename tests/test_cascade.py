@@ -0,0 +1,86 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.components.retrieval import BM25Index, CascadeRanker, query_term_counts
+from src.components.vectorizers import term_count_matrix, vocabulary_terms
+from src.pipeline.prediction_pipeline import PredictionPipeline
+
+
+# Every resume mentions machine and learning, so max_df=0.8 prunes both
+# unigrams while keeping the bigram "machine learning"
+RESUMES = [
+    "machine learning engineer building models",
+    "machine learning researcher in vision",
+    "learning to operate the machine shop",
+    "machine operator always learning safety",
+    "learning sales and machine maintenance",
+]
+JOBS = [
+    "machine learning",
+    "machine learning engineer for vision models",
+    "sales operator for the machine shop",
+    "pastry chef",
+]
+
+
+def build_ranker(n_candidates):
+    vectorizer = TfidfVectorizer(ngram_range=(1, 3), max_df=0.8).fit(RESUMES)
+    term_counts = term_count_matrix(vectorizer, RESUMES)
+    ids = np.array([f"r{row}" for row in range(len(RESUMES))])
+    bm25_index = BM25Index.build(term_counts, ids, terms=vocabulary_terms(vectorizer.vocabulary_))
+    return CascadeRanker(bm25_index, vectorizer, term_counts, n_candidates=n_candidates)
+
+
+def test_cascade_keeps_ngram_only_matches():
+    ranker = build_ranker(n_candidates=100)
+    query_counts = query_term_counts(ranker.vectorizer, ["machine learning"])
+    assert not len(ranker.bm25_index.top(query_counts, 100)[0])
+
+    positions, scores, _ = ranker.rank_counts(query_counts, k=10)
+    expected_positions, expected_scores = ranker.brute_force_counts(query_counts, k=10)
+    expected = expected_scores > 0
+    assert expected.sum() == 2
+    np.testing.assert_array_equal(positions, expected_positions[expected])
+    np.testing.assert_array_equal(scores, expected_scores[expected])
+
+
+def test_cascade_equals_brute_force_when_candidates_cover_matches():
+    ranker = build_ranker(n_candidates=len(RESUMES))
+    for job in JOBS:
+        query_counts = query_term_counts(ranker.vectorizer, [job])
+        positions, scores, _ = ranker.rank_counts(query_counts, k=len(RESUMES))
+        expected_positions, expected_scores = ranker.brute_force_counts(query_counts, k=len(RESUMES))
+        expected = expected_scores > 0
+        np.testing.assert_array_equal(positions[scores > 0], expected_positions[expected])
+        np.testing.assert_array_equal(scores[scores > 0], expected_scores[expected])
+
+
+def test_cascade_scores_equal_score_texts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ranker = build_ranker(n_candidates=len(RESUMES))
+    pipeline = PredictionPipeline()
+    monkeypatch.setattr(pipeline, "load_vectorizer", lambda: ranker.vectorizer)
+
+    for job in JOBS:
+        for result in ranker.rank(job, k=len(RESUMES)):
+            resume = RESUMES[int(result["resume_id"][1:])]
+            assert result["score"] == pipeline.score_texts(resume, job)
+
+
+def test_shared_column_candidates_equal_a_full_scan():
+    rng = np.random.default_rng(0)
+    n_resumes, n_terms = 400, 300
+    term_counts = sp.random(n_resumes, n_terms, density=0.02, format="csr", random_state=rng, dtype=np.float64)
+    term_counts.data = np.ceil(term_counts.data * 3)
+    bm25_index = BM25Index.build(term_counts, np.arange(n_resumes).astype(str))
+    ranker = CascadeRanker(bm25_index, None, term_counts)
+
+    for _ in range(20):
+        query_counts = sp.random(1, n_terms, density=0.03, format="csr", random_state=rng, dtype=np.float64)
+        candidates = rng.choice(n_resumes, size=5, replace=False)
+        shared = (term_counts[:, query_counts.indices].toarray() > 0).sum(axis=1).astype(np.float64)
+        shared[candidates] = 0
+        # Most shared columns first, ties by position; resumes sharing none are left out
+        expected = np.lexsort((np.arange(n_resumes), -shared))[:30]
+        expected = expected[shared[expected] > 0]
+        np.testing.assert_array_equal(ranker.shared_column_candidates(query_counts, candidates, 35), expected)
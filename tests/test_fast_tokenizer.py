@@ -0,0 +1,38 @@
+import pickle
+import pytest
+from src.components.fast_tokenizer import FastTokenizer, agreement_report
+
+TEXTS = [
+    "Built and deployed machine learning models with Python and SQL.",
+    "Managed teams of engineers; mentored juniors and led hiring.",
+    "Experienced nurse caring for patients in busy hospitals.",
+    "Developing REST APIs in Node.js, C++ and C# for payment systems.",
+    "She doesn't like meetings, but she's running the weekly planning sessions.",
+    "Analyzed datasets, wrote reports and presented findings to stakeholders.",
+]
+# Unseen documents made of words of TEXTS
+HELD_OUT = ["Engineers built models and managed patients' reports.", "Running APIs in Python for hospitals"]
+
+
+def test_fast_tokenizer_maps_lemmas_and_drops_stop_words():
+    tokenizer = FastTokenizer({"running": "run", "services": "service"}, {"the", "and", "with"})
+    text = "The team's C++ and Node.js services, running (2022-present)! Don't stop."
+    expected = "team 's c++ node.js service run 2022 present do n't stop"
+    assert tokenizer(text) == expected
+    # Second call goes through the memoised chunks
+    assert tokenizer(text) == expected
+    assert pickle.loads(pickle.dumps(tokenizer))(text) == expected
+
+
+def test_fast_tokenizer_agrees_with_spacy_lemmas():
+    spacy = pytest.importorskip("spacy")
+    from src.components.Data_transformation import SPACY_MODEL_NAME, spacy_tokenize_corpus
+
+    if not spacy.util.is_package(SPACY_MODEL_NAME):
+        pytest.skip(f"spaCy model {SPACY_MODEL_NAME} is not installed")
+
+    tokenizer = FastTokenizer.from_corpus(TEXTS)
+    report = agreement_report(tokenizer, TEXTS, spacy_tokenize_corpus(TEXTS))
+    assert report["exact_match_rate"] == 1.0
+    report = agreement_report(tokenizer, HELD_OUT, spacy_tokenize_corpus(HELD_OUT))
+    assert report["mean_token_jaccard"] >= 0.9
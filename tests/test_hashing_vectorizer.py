@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from src.components.fast_tokenizer import FastTokenizer
+from src.components.vectorizers import HashingTfidfVectorizer
+
+RESUMES = [
+    "Data scientist with Python, SQL and machine learning experience",
+    "Built machine learning pipelines in Python for fraud detection",
+    "Cafe manager: scheduling, ordering and customer service",
+    "Senior engineer working on distributed data platforms and SQL engines",
+    "Researcher in computer vision and deep learning",
+    "Python developer building data pipelines",
+    "Customer service lead for a busy cafe",
+]
+JOBS = [
+    "Machine learning engineer, Python and SQL",
+    "Barista wanted for a busy cafe",
+    "",
+    "Quantum chromodynamics lattice simulations",
+]
+PREPROCESSOR = FastTokenizer({"pipelines": "pipeline"}, ("and", "for", "with", "in", "on", "a"))
+
+
+@pytest.mark.parametrize("sublinear_tf", [False, True])
+def test_hashing_tfidf_equals_hashing_vectorizer_with_idf(sublinear_tf):
+    # Few columns, so some n-grams share a column
+    vectorizer = HashingTfidfVectorizer(
+        preprocessor=PREPROCESSOR, n_features=2 ** 6, sublinear_tf=sublinear_tf, batch_size=3
+    ).fit(RESUMES)
+
+    hasher = HashingVectorizer(
+        preprocessor=PREPROCESSOR, ngram_range=(1, 3), n_features=2 ** 6, alternate_sign=False, norm=None
+    )
+    transformer = TfidfTransformer(sublinear_tf=sublinear_tf).fit(hasher.transform(RESUMES))
+    np.testing.assert_allclose(vectorizer.idf_, transformer.idf_, rtol=1e-12)
+
+    expected = transformer.transform(hasher.transform(JOBS + RESUMES)).toarray()
+    np.testing.assert_allclose(vectorizer.transform(JOBS + RESUMES).toarray(), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_partial_fit_batches_equal_one_fit():
+    vectorizer = HashingTfidfVectorizer(preprocessor=PREPROCESSOR, n_features=2 ** 10).fit(RESUMES)
+    streamed = HashingTfidfVectorizer(preprocessor=PREPROCESSOR, n_features=2 ** 10)
+    for start in range(0, len(RESUMES), 2):
+        streamed.partial_fit(RESUMES[start:start + 2])
+
+    assert streamed.n_docs_ == len(RESUMES)
+    np.testing.assert_array_equal(streamed.document_frequency_, vectorizer.document_frequency_)
+    assert (streamed.transform(JOBS) != vectorizer.transform(JOBS)).nnz == 0
+
+    # A second fit starts over instead of adding to the counts
+    vectorizer.fit(RESUMES)
+    assert vectorizer.n_docs_ == len(RESUMES)
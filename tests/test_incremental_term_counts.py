@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.Data_transformation import DataTransformation
+from src.components.fast_tokenizer import FastTokenizer
+from src.components.vectorizers import IncrementalTfidfVectorizer, term_count_matrix, tfidf_from_counts
+from src.exception import customException
+from src.utils import load_object, load_sparse_matrix, save_object
+
+OLD_DOCS = ["apple banana", "apple cherry", "banana durian"]
+NEW_DOCS = ["banana cherry", "cherry elder", "apple elder"]
+
+
+def vectorizer(**params):
+    # No lemmas or stop words, so the documents are their own tokens
+    return IncrementalTfidfVectorizer(preprocessor=FastTokenizer({}, ()), ngram_range=(1, 1), **params)
+
+
+def fitted_transformation(tmp_path, vectorizer, documents):
+    # What initiate_data_transformation saves, without the spaCy tokenization
+    transformation = DataTransformation()
+    config = transformation.transformation_config
+    config.preprocessor_obj_file_path = str(tmp_path / "preprocessor.pkl")
+    config.preprocessor_dir = str(tmp_path / "preprocessor")
+    config.term_counts_file_path = str(tmp_path / "term_counts.npz")
+    config.term_counts_index_file_path = str(tmp_path / "term_counts_index.json")
+    config.corpus_term_counts_file_path = str(tmp_path / "corpus_term_counts.npz")
+    config.corpus_terms_file_path = str(tmp_path / "corpus_terms.json")
+    term_counts = transformation.fit_vectorizer(vectorizer, documents)
+    save_object(config.preprocessor_obj_file_path, vectorizer)
+    df = pd.DataFrame({"id": [f"doc{i}" for i in range(len(documents))], "type": "resume"})
+    transformation.save_term_counts(term_counts, vectorizer, df)
+    return transformation
+
+
+def update(transformation, tmp_path, documents, start):
+    new_data_path = tmp_path / f"new_{start}.csv"
+    pd.DataFrame({
+        "id": [f"doc{start + i}" for i in range(len(documents))], "type": "resume", "text": documents
+    }).to_csv(new_data_path, index=False)
+    transformation.update_data_transformation(str(new_data_path))
+    config = transformation.transformation_config
+    return load_object(config.preprocessor_obj_file_path), load_sparse_matrix(config.term_counts_file_path)
+
+
+@pytest.mark.parametrize("vectorizer_params", [{"min_df": 2}, {"max_df": 0.5}])
+def test_cached_counts_follow_terms_admitted_by_partial_fit(tmp_path, vectorizer_params):
+    transformation = fitted_transformation(tmp_path, vectorizer(**vectorizer_params), OLD_DOCS)
+
+    fitted, cached = update(transformation, tmp_path, NEW_DOCS, len(OLD_DOCS))
+
+    expected = term_count_matrix(fitted, OLD_DOCS + NEW_DOCS)
+    assert cached.shape == expected.shape
+    assert (cached != expected).nnz == 0
+    np.testing.assert_allclose(
+        tfidf_from_counts(fitted, cached[:len(OLD_DOCS)]).toarray(), fitted.transform(OLD_DOCS).toarray()
+    )
+
+
+def test_cached_counts_keep_terms_forgotten_by_the_window(tmp_path):
+    # "durian" leaves the window with the first batch and comes back later
+    transformation = fitted_transformation(tmp_path, vectorizer(window_batches=1), OLD_DOCS)
+    update(transformation, tmp_path, NEW_DOCS, len(OLD_DOCS))
+    assert "durian" not in load_object(transformation.transformation_config.preprocessor_obj_file_path).vocabulary_
+
+    returning = ["durian fig"]
+    fitted, cached = update(transformation, tmp_path, returning, len(OLD_DOCS) + len(NEW_DOCS))
+
+    assert "durian" in fitted.vocabulary_
+    expected = term_count_matrix(fitted, OLD_DOCS + NEW_DOCS + returning)
+    assert (cached != expected).nnz == 0
+
+
+
+@pytest.mark.parametrize("ids", [["doc2", "doc3"], ["doc3", "doc3"]])
+def test_update_rejects_existing_and_repeated_ids(tmp_path, ids):
+    # doc2 is already indexed; doc3 is new but given twice
+    transformation = fitted_transformation(tmp_path, vectorizer(), OLD_DOCS)
+    config = transformation.transformation_config
+    new_data_path = tmp_path / "new.csv"
+    pd.DataFrame({"id": ids, "type": "resume", "text": NEW_DOCS[:2]}).to_csv(new_data_path, index=False)
+
+    with pytest.raises(customException, match="already indexed or repeated"):
+        transformation.update_data_transformation(str(new_data_path))
+
+    # Nothing was folded in or appended
+    assert load_object(config.preprocessor_obj_file_path).n_docs_ == len(OLD_DOCS)
+    assert load_sparse_matrix(config.term_counts_file_path).shape[0] == len(OLD_DOCS)
+
+
+@pytest.mark.parametrize("pruning", [{"max_features": 1000}, {"ngram_budgets": {2: 100}}])
+def test_incremental_vectorizer_rejects_vocabulary_caps(pruning):
+    transformation = DataTransformation()
+    transformation.transformation_config.vectorizer = "incremental"
+    for name, value in pruning.items():
+        setattr(transformation.transformation_config, name, value)
+
+    with pytest.raises(customException, match="not supported with vectorizer='incremental'"):
+        transformation.get_data_transformer_object(preprocessor=FastTokenizer({}, ()))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from src.components.lsa import dense_scores, fit_lsa, project, ranking_report
+
+DOCUMENTS = [
+    "python machine learning models pandas sql",
+    "machine learning engineer python deep learning",
+    "java spring backend microservices kubernetes",
+    "backend java developer kubernetes docker",
+    "nurse patient care hospital clinical",
+    "clinical nurse hospital ward patient",
+    "sales account management negotiation clients",
+    "account executive sales clients revenue",
+]
+
+
+def tfidf():
+    return TfidfVectorizer().fit_transform(DOCUMENTS)
+
+
+def test_lsa_vectors_are_unit_float32_rows():
+    matrix = tfidf()
+    svd, vectors = fit_lsa(matrix, 4)
+    assert vectors.shape == (len(DOCUMENTS), 4)
+    assert vectors.dtype == np.float32 and vectors.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1, rtol=1e-6)
+
+    # New rows land where the fitted ones did; an empty row stays zero
+    new_rows = sp.vstack([matrix[:3], sp.csr_matrix((1, matrix.shape[1]))], format="csr")
+    projected = project(svd, new_rows)
+    assert projected.shape == (4, 4) and projected.dtype == np.float32
+    np.testing.assert_allclose(projected[:3], vectors[:3], atol=1e-5)
+    np.testing.assert_array_equal(projected[3], 0)
+
+
+def test_lsa_components_are_capped_below_the_feature_count():
+    matrix = tfidf()[:, :5]
+    _, vectors = fit_lsa(matrix, 50)
+    assert vectors.shape == (len(DOCUMENTS), 4)
+
+
+def test_dense_scores_are_cosines_and_keep_the_ranking():
+    _, vectors = fit_lsa(tfidf(), 4)
+    resumes, jobs = vectors[::2], vectors[1::2]
+    scores = dense_scores(resumes, jobs)
+    assert scores.shape == (len(resumes), len(jobs))
+    np.testing.assert_allclose(scores, cosine_similarity(resumes, jobs), atol=1e-6)
+
+    # Each job's nearest resume is the one on the same topic
+    np.testing.assert_array_equal(scores.argmax(axis=0), np.arange(len(jobs)))
+    report = ranking_report(scores, scores, k=2)
+    assert report["mean_spearman"] == pytest.approx(1.0)
+    assert report["top_2_overlap"] == 1.0 and report["mean_abs_score_diff"] == 0.0
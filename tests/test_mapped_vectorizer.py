@@ -0,0 +1,86 @@
+import json
+import os
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.components import mapped_vectorizer
+from src.components.fast_tokenizer import FastTokenizer
+from src.components.mapped_vectorizer import blake2b_term_hashes, load_mapped_vectorizer, save_mapped_vectorizer
+from src.components.vectorizers import HashingTfidfVectorizer
+
+RESUMES = [
+    "Data scientist with Python, SQL and machine learning experience",
+    "Built machine learning pipelines in Python for fraud detection",
+    "Café manager: scheduling, ordering and customer service",
+    "Senior engineer working on distributed data platforms and SQL engines",
+    "Researcher in computer vision and deep learning",
+]
+JOBS = [
+    "Machine learning engineer, Python and SQL",
+    "Barista wanted for a busy café",
+    "",
+    "Quantum chromodynamics lattice simulations",
+    RESUMES[3],
+]
+
+
+def fit_vectorizer(kind):
+    tokenizer = FastTokenizer({"built": "build", "pipelines": "pipeline"}, ("and", "for", "with", "in", "on"))
+    if kind == "hashing":
+        return HashingTfidfVectorizer(preprocessor=tokenizer, n_features=2 ** 12).fit(RESUMES)
+    if kind == "float32_l1":
+        return TfidfVectorizer(preprocessor=tokenizer, ngram_range=(1, 2), norm="l1", dtype=np.float32).fit(RESUMES)
+    return TfidfVectorizer(preprocessor=tokenizer, ngram_range=(1, 3), sublinear_tf=True).fit(RESUMES)
+
+
+def assert_same_transform(vectorizer, dir_path):
+    mapped = load_mapped_vectorizer(str(dir_path))
+    expected, actual = vectorizer.transform(JOBS + RESUMES), mapped.transform(JOBS + RESUMES)
+    assert actual.shape == expected.shape and actual.dtype == expected.dtype
+    assert (actual != expected).nnz == 0
+
+
+@pytest.mark.parametrize("kind", ["vocabulary", "float32_l1", "hashing"])
+def test_mapped_transform_equals_pickled_vectorizer(tmp_path, kind):
+    vectorizer = fit_vectorizer(kind)
+    save_mapped_vectorizer(str(tmp_path), vectorizer)
+    assert_same_transform(vectorizer, tmp_path)
+
+
+def test_mapped_transform_resolves_hash_collisions(tmp_path, monkeypatch):
+    # Four hash values for the whole vocabulary: almost every lookup has
+    # to step past terms with the same hash
+    hash_terms = mapped_vectorizer.term_hashes
+    monkeypatch.setattr(mapped_vectorizer, "term_hashes", lambda *args: hash_terms(*args) % np.uint64(4))
+    vectorizer = fit_vectorizer("vocabulary")
+    save_mapped_vectorizer(str(tmp_path), vectorizer)
+    assert_same_transform(vectorizer, tmp_path)
+
+
+def test_mapped_transform_reads_format_version_1(tmp_path):
+    vectorizer = fit_vectorizer("vocabulary")
+    save_mapped_vectorizer(str(tmp_path), vectorizer)
+
+    # Rewrite the hashes the way version 1 computed them
+    with open(os.path.join(tmp_path, "terms.bin"), "rb") as terms_file:
+        term_bytes = np.frombuffer(terms_file.read(), dtype=np.uint8)
+    hashes = blake2b_term_hashes(term_bytes, np.load(os.path.join(tmp_path, "term_offsets.npy")))
+    order = np.argsort(hashes, kind="stable")
+    np.save(os.path.join(tmp_path, "term_hashes.npy"), hashes[order])
+    np.save(os.path.join(tmp_path, "term_columns.npy"), order.astype(np.int32))
+    with open(os.path.join(tmp_path, "config.json"), "r", encoding="utf-8") as file_obj:
+        config = json.load(file_obj)
+    with open(os.path.join(tmp_path, "config.json"), "w", encoding="utf-8") as file_obj:
+        json.dump({**config, "format_version": 1}, file_obj)
+
+    assert_same_transform(vectorizer, tmp_path)
+
+
+def test_term_columns_of_known_and_unknown_terms(tmp_path):
+    vectorizer = TfidfVectorizer(preprocessor=FastTokenizer({}, ()), ngram_range=(1, 2)).fit(
+        ["python sql", "machine learning café"]
+    )
+    save_mapped_vectorizer(str(tmp_path), vectorizer)
+    terms = ["python", "machine learning", "café", "cafe", "unknown", "python sql", "sql python"]
+    expected = [vectorizer.vocabulary_.get(term, -1) for term in terms]
+    np.testing.assert_array_equal(load_mapped_vectorizer(str(tmp_path)).term_columns(terms), expected)
@@ -0,0 +1,19 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.components.vectorizers import fit_tfidf_out_of_core
+
+
+def test_out_of_core_fit_equals_in_memory_fit(tmp_path):
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(40)]
+    documents = [" ".join(rng.choice(words, size=rng.integers(3, 15))) for _ in range(200)]
+    chunks = [documents[start:start + 17] for start in range(0, len(documents), 17)]
+    params = dict(ngram_range=(1, 2), min_df=2, max_df=0.9)
+
+    expected = TfidfVectorizer(**params).fit(documents)
+    # A tiny in-memory limit forces spilled runs and their merge
+    fitted = fit_tfidf_out_of_core(TfidfVectorizer(**params), iter(chunks), str(tmp_path), max_terms_in_memory=20)
+
+    assert fitted.vocabulary_ == expected.vocabulary_
+    np.testing.assert_allclose(fitted.idf_, expected.idf_)
+    assert (fitted.transform(documents) != expected.transform(documents)).nnz == 0
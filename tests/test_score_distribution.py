@@ -0,0 +1,64 @@
+import numpy as np
+from src.components.score_distribution import ScoreDistributions, record_score
+from src.pipeline.prediction_pipeline import PredictionPipeline
+
+
+def distributions():
+    # Two trained jobs with four applicants each
+    return ScoreDistributions.from_score_grid(["j1", "j2"], np.array([
+        [10, 50], [20, 60], [30, 70], [40, 80]
+    ], dtype=np.float32), "sparse")
+
+
+def test_add_ignores_jobs_without_a_distribution():
+    scores = distributions()
+
+    assert not scores.add("made-up", 55)
+    assert scores.pending == {}
+    assert scores.percentile_rank("made-up", 55) is None
+
+
+def test_recorded_scores_are_deduplicated_capped_and_limited_to_trained_jobs(tmp_path):
+    path = str(tmp_path / "recorded_scores.csv")
+    record_score("j1", "resume-a", 5, "sparse", path)
+    record_score("j1", "resume-a", 45, "sparse", path)  # repeat submission: only the latest counts
+    record_score("j1", "resume-b", 35, "sparse", path)
+    record_score("j1", "resume-c", 25, "sparse", path)
+    record_score("made-up", "resume-a", 99, "sparse", path)
+    record_score("j1", "resume-d", 99, "bm25", path)  # another scoring mode
+
+    scores = distributions()
+    assert scores.percentile_rank("j1", 35) == 75.0
+    assert scores.add_recorded(path, max_per_job=2) == 2
+    scores.merge_pending()
+
+    # resume-b (35) and resume-c (25) were submitted last; resume-a counts with 45, not 5
+    np.testing.assert_array_equal(scores.job_scores("j1"), [10, 20, 25, 30, 35, 40])
+
+    scores = distributions()
+    assert scores.add_recorded(path) == 3
+    scores.merge_pending()
+    np.testing.assert_array_equal(scores.job_scores("j1"), [10, 20, 25, 30, 35, 40, 45])
+    np.testing.assert_array_equal(scores.job_scores("j2"), [50, 60, 70, 80])
+    assert scores.job_ids == ["j1", "j2"]
+
+
+def test_recording_stops_when_the_file_is_full(tmp_path):
+    path = str(tmp_path / "recorded_scores.csv")
+    assert record_score("j1", "resume-a", 5, "sparse", path, max_file_mb=1e-5)
+    assert not record_score("j1", "resume-b", 6, "sparse", path, max_file_mb=1e-5)
+
+
+def test_percentile_rank_needs_the_serving_scoring_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scores = distributions()
+    scores.scoring = "lsa"
+    scores.save(str(tmp_path / "lsa"))
+    distributions().save(str(tmp_path / "sparse"))
+
+    pipeline = PredictionPipeline()
+    pipeline.score_distributions_dir = str(tmp_path / "lsa")
+    assert pipeline.percentile_rank("j1", 35) is None
+    pipeline.score_distributions_dir = str(tmp_path / "sparse")
+    assert pipeline.percentile_rank("j1", 35) == 75.0
+    assert ScoreDistributions.load(str(tmp_path / "lsa")).scoring == "lsa"
@@ -0,0 +1,105 @@
+import os
+import shutil
+import numpy as np
+import scipy.sparse as sp
+from src.components.score_store import ScoreStore, row_fingerprints
+
+
+def model_score(resume_id, job_id, version):
+    # Deterministic stand-in for a scoring model
+    return np.float32(sum(map(ord, f"{resume_id}|{job_id}|{version}")) % 1000 / 10)
+
+
+def refresh(store, resume_ids, job_ids, version, computed):
+    def score_fn(rows, columns):
+        computed.extend((store.resume_ids[row], store.job_ids[column]) for row in rows for column in columns)
+        return np.array([
+            [model_score(store.resume_ids[row], store.job_ids[column], version) for column in columns]
+            for row in rows
+        ], dtype=np.float32)
+
+    return store.refresh(resume_ids, job_ids, version, score_fn)
+
+
+def assert_full_recompute(store, resume_ids, job_ids, version):
+    expected = np.array([[model_score(r, j, version) for j in job_ids] for r in resume_ids], dtype=np.float32)
+    np.testing.assert_array_equal(store.resume_ids, resume_ids)
+    np.testing.assert_array_equal(store.job_ids, job_ids)
+    np.testing.assert_array_equal(store.scores, expected)
+
+
+def test_refresh_equals_full_recompute(tmp_path):
+    resumes, jobs = [f"r{i}" for i in range(6)], [f"j{i}" for i in range(4)]
+    store, computed = ScoreStore(), []
+    assert refresh(store, resumes, jobs, "v1", computed) == (24, 0)
+    assert_full_recompute(store, resumes, jobs, "v1")
+    store.save(tmp_path)
+
+    # Appended resumes and jobs: only their cells are computed
+    store, computed = ScoreStore.load(tmp_path), []
+    resumes, jobs = resumes + ["r6", "r7"], jobs + ["j4"]
+    n_computed, n_reused = refresh(store, resumes, jobs, "v1", computed)
+    assert_full_recompute(store, resumes, jobs, "v1")
+    assert all(resume in ("r6", "r7") or job == "j4" for resume, job in computed)
+    assert n_reused == 24 and n_computed + n_reused == 8 * 5
+    store.save(tmp_path)
+
+    # Deleted ids (and a reordering): nothing is computed
+    store, computed = ScoreStore.load(tmp_path), []
+    resumes, jobs = ["r7", "r0", "r2", "r5"], ["j4", "j1", "j3"]
+    assert refresh(store, resumes, jobs, "v1", computed) == (0, 12)
+    assert_full_recompute(store, resumes, jobs, "v1")
+    store.save(tmp_path)
+
+    # A new model version: every cell is computed again
+    store, computed = ScoreStore.load(tmp_path), []
+    resumes = resumes + ["r8"]
+    assert refresh(store, resumes, jobs, "v2", computed) == (15, 0)
+    assert_full_recompute(store, resumes, jobs, "v2")
+    store.save(tmp_path)
+    assert ScoreStore.load(tmp_path).model_versions == ["v2"]
+
+
+def test_edited_documents_are_scored_again(tmp_path):
+    resumes, jobs = ["r0", "r1", "r2"], ["j0", "j1"]
+    term_counts = sp.csr_matrix(np.array([[1, 0, 2], [0, 3, 0], [1, 1, 1], [2, 0, 0], [0, 0, 4]]))
+    fingerprints = row_fingerprints(term_counts)
+    store = ScoreStore()
+    store.refresh(resumes, jobs, "v1", lambda rows, columns: np.zeros((len(rows), len(columns))),
+                  fingerprints[:3], fingerprints[3:])
+    store.save(tmp_path)
+
+    # r1 and j0 are edited under the same ids
+    edited = term_counts.tolil()
+    edited[1, 0], edited[3, 2] = 5, 1
+    edited_fingerprints = row_fingerprints(edited.tocsr())
+    assert (edited_fingerprints != fingerprints).tolist() == [False, True, False, True, False]
+
+    store, computed = ScoreStore.load(tmp_path), []
+
+    def score_fn(rows, columns):
+        computed.extend((store.resume_ids[row], store.job_ids[column]) for row in rows for column in columns)
+        return np.ones((len(rows), len(columns)))
+
+    assert store.refresh(resumes, jobs, "v1", score_fn, edited_fingerprints[:3], edited_fingerprints[3:]) == (4, 2)
+    assert sorted(computed) == [("r0", "j0"), ("r1", "j0"), ("r1", "j1"), ("r2", "j0")]
+
+
+def test_saving_a_linked_store_leaves_the_source_intact(tmp_path):
+    resumes, jobs = [f"r{i}" for i in range(4)], ["j0", "j1"]
+    store = ScoreStore()
+    refresh(store, resumes, jobs, "v1", [])
+    store.save(tmp_path / "v1")
+    shutil.copytree(tmp_path / "v1", tmp_path / "v2", copy_function=os.link)
+
+    # Nothing to compute: the store does not need saving
+    store = ScoreStore.load(tmp_path / "v2")
+    assert refresh(store, resumes, jobs, "v1", []) == (0, 8)
+    assert not store.modified
+
+    store = ScoreStore.load(tmp_path / "v2")
+    refresh(store, resumes + ["r4"], jobs, "v2", [])
+    store.save(tmp_path / "v2")
+
+    assert_full_recompute(ScoreStore.load(tmp_path / "v1"), resumes, jobs, "v1")
+    assert_full_recompute(ScoreStore.load(tmp_path / "v2"), resumes + ["r4"], jobs, "v2")
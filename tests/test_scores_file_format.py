@@ -0,0 +1,43 @@
+import importlib.util
+import pytest
+from src.components.model_trainer import ModelTrainer
+from src.exception import customException
+
+
+def trainer(scores_file_path):
+    model_trainer = ModelTrainer()
+    model_trainer.model_trainer_config.scores_file_path = scores_file_path
+    return model_trainer
+
+
+def test_unsupported_scores_file_is_rejected_before_scoring():
+    with pytest.raises(customException, match="Unsupported scores file"):
+        trainer("artifacts/ats_scores.xlsx").initiate_model_training("missing.csv", "missing.pkl")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+def test_parquet_without_pyarrow_is_rejected_before_scoring():
+    with pytest.raises(customException, match="needs pyarrow"):
+        trainer("artifacts/ats_scores.parquet").initiate_model_training("missing.csv", "missing.pkl")
+
+
+@pytest.mark.parametrize("options, rejected", [
+    ({}, "resume x job grid"),
+    ({"scores_file_path": "artifacts/ats_scores.npy", "score_store_dir": "artifacts/score_store"}, "score_store_dir"),
+    ({"scores_file_path": "artifacts/ats_scores.npy"}, "score_distributions_dir"),
+])
+def test_top_k_rejects_outputs_that_need_every_score(options, rejected):
+    model_trainer = trainer("artifacts/ats_scores.csv")
+    model_trainer.model_trainer_config.top_k_per_job = 10
+    for name, value in options.items():
+        setattr(model_trainer.model_trainer_config, name, value)
+
+    with pytest.raises(customException, match=rejected):
+        model_trainer.initiate_model_training("missing.csv", "missing.pkl")
+
+
+def test_top_k_accepts_long_format_without_store_or_distributions():
+    model_trainer = trainer("artifacts/ats_scores.npy")
+    model_trainer.model_trainer_config.top_k_per_job = 10
+    model_trainer.model_trainer_config.score_distributions_dir = None
+    model_trainer.check_top_k_options()
@@ -0,0 +1,97 @@
+import numpy as np
+import scipy.sparse as sp
+from src.components.retrieval import BM25Index
+from src.components.segmented_index import SegmentedIndex, SegmentedIndexConfig, query_terms
+
+N_TERMS = 300
+# The last columns are bigrams, which neither index scores
+TERMS = [f"t{column}" for column in range(N_TERMS - 20)] + [f"t{column} t{column + 1}" for column in range(20)]
+
+
+def zipf_term_counts(rng, n_docs, doc_length=40):
+    probabilities = 1 / np.arange(1, N_TERMS + 1)
+    columns = rng.choice(N_TERMS, size=n_docs * doc_length, p=probabilities / probabilities.sum())
+    rows = np.repeat(np.arange(n_docs), doc_length)
+    counts = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(n_docs, N_TERMS))
+    counts.sum_duplicates()
+    return counts
+
+
+class LiveCorpus:
+    # The live documents in the order the segmented index keeps them:
+    # added (or replaced) documents go last, merges keep the order
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, ids, term_counts):
+        for document_id, row in zip(ids, range(term_counts.shape[0])):
+            self.counts.pop(document_id, None)
+            self.counts[document_id] = term_counts[row]
+
+    def delete(self, ids):
+        for document_id in ids:
+            self.counts.pop(document_id, None)
+
+    def bm25_index(self):
+        ids = np.array(list(self.counts))
+        return BM25Index.build(sp.vstack(list(self.counts.values()), format="csr"), ids, terms=TERMS)
+
+
+def assert_same_search(segmented, corpus, queries, n=10):
+    monolithic = corpus.bm25_index()
+    assert len(segmented) == len(monolithic)
+    for i in range(queries.shape[0]):
+        ids, scores = segmented.search(query_terms(queries[i], TERMS), n)
+        positions, expected_scores = monolithic.top(queries[i], n)
+        # search scales by the query's highest attainable score
+        terms, query_tf = monolithic.query_terms(queries[i])
+        upper_bound = float(monolithic.idf[terms] @ query_tf) * (monolithic.k1 + 1)
+        np.testing.assert_array_equal(ids, monolithic.ids[positions])
+        np.testing.assert_allclose(scores, expected_scores / upper_bound, rtol=1e-5)
+
+
+def test_segmented_search_equals_bm25_over_live_documents(tmp_path):
+    rng = np.random.default_rng(0)
+    config = SegmentedIndexConfig(
+        index_dir=str(tmp_path), flush_docs=15, max_segments=3, merge_factor=2, background_merges=False
+    )
+    segmented, corpus = SegmentedIndex.open(str(tmp_path), config), LiveCorpus()
+    queries = zipf_term_counts(rng, 20, doc_length=8)
+
+    # 1. Batches of adds; once 15 documents wait they are flushed as a
+    # segment, and segments are merged once there are more than 3
+    for start, end in zip(range(0, 150, 20), [*range(20, 150, 20), 150]):
+        ids = np.array([f"resume{row}" for row in range(start, end)])
+        term_counts = zipf_term_counts(rng, len(ids))
+        segmented.add(ids, term_counts, TERMS)
+        corpus.add(ids, term_counts)
+    # The last 10 documents are still in the in-memory segment
+    assert len(segmented.memory) == 10
+    assert segmented.next_segment - 1 > len(segmented.segments)
+    assert_same_search(segmented, corpus, queries)
+
+    # 2. Withdrawn resumes, in written segments and in memory
+    withdrawn = [f"resume{row}" for row in rng.choice(150, size=25, replace=False)]
+    assert segmented.delete(withdrawn) == 25
+    corpus.delete(withdrawn)
+    assert_same_search(segmented, corpus, queries)
+
+    # 3. A sync: withdrawn, edited and new resumes
+    live_ids = list(corpus.counts)
+    gone, edited, new = live_ids[:10], live_ids[10:20], [f"resume{150 + row}" for row in range(15)]
+    changes = zipf_term_counts(rng, len(edited) + len(new))
+    corpus.delete(gone)
+    corpus.add(edited + new, changes)
+    ids = np.array(list(corpus.counts))
+    assert segmented.sync(ids, sp.vstack(list(corpus.counts.values()), format="csr"), TERMS) == (25, 10)
+    assert_same_search(segmented, corpus, queries)
+
+    # 4. Flushed and merged down to max_segments
+    segmented.flush()
+    assert len(segmented.segments) <= config.max_segments
+    assert_same_search(segmented, corpus, queries)
+
+    # 5. Reopened from disk
+    reopened = SegmentedIndex.open(str(tmp_path), config)
+    assert [segment.name for segment in reopened.segments] == [segment.name for segment in segmented.segments]
+    assert_same_search(reopened, corpus, queries)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+from src.components.similarity import blocked_pairs_above, blocked_top_k
+
+
+def random_vectors(n_rows, n_features=50, density=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = sp.random(n_rows, n_features, density=density, format="csr", random_state=rng, dtype=np.float64)
+    vectors.data = np.round(vectors.data * 4) + 1
+    return vectors
+
+
+def exhaustive_top_k(resumes, jobs, k):
+    # Every score at once; ties go to the lower resume row
+    scores = (normalize(resumes) @ normalize(jobs).T).toarray()
+    rows = np.argsort(-scores, axis=0, kind="stable")[:k]
+    return np.take_along_axis(scores, rows, axis=0), rows, scores
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    resumes = random_vectors(120, seed=1)
+    # Repeated rows tie with their originals, also at the k-th place
+    resumes = sp.vstack([resumes, resumes[::7], resumes[3:4]], format="csr")
+    jobs = random_vectors(15, seed=2)
+    return resumes, jobs
+
+
+@pytest.mark.parametrize("memory_budget_mb", [0.0001, 0.01, 256])
+@pytest.mark.parametrize("n_workers,executor", [(1, "thread"), (3, "thread"), (2, "process")])
+def test_blocked_top_k_matches_exhaustive_scoring(corpus, memory_budget_mb, n_workers, executor):
+    resumes, jobs = corpus
+    k = 10
+    expected_scores, expected_rows, scores = exhaustive_top_k(resumes, jobs, k)
+
+    result = blocked_top_k(
+        resumes, jobs, k_per_job=k, k_per_resume=3, memory_budget_mb=memory_budget_mb,
+        n_workers=n_workers, executor=executor
+    )
+
+    assert memory_budget_mb == 256 or result.n_blocks > 1
+    np.testing.assert_array_equal(result.job_resume_rows, expected_rows)
+    np.testing.assert_allclose(result.job_scores, expected_scores, rtol=1e-12)
+    expected_jobs = np.argsort(-scores, axis=1, kind="stable")[:, :3]
+    np.testing.assert_array_equal(result.resume_job_rows, expected_jobs)
+    np.testing.assert_allclose(result.resume_scores, np.take_along_axis(scores, expected_jobs, axis=1), rtol=1e-12)
+
+
+def test_blocked_top_k_dot_products_of_dense_vectors():
+    # Small integers: every product is exact, whatever the block size
+    rng = np.random.default_rng(3)
+    resumes, jobs = rng.integers(0, 3, size=(80, 6)).astype(float), rng.integers(0, 3, size=(7, 6)).astype(float)
+    scores = resumes @ jobs.T
+    expected_rows = np.argsort(-scores, axis=0, kind="stable")[:5]
+
+    result = blocked_top_k(resumes, jobs, k_per_job=5, memory_budget_mb=0.0005, cosine=False)
+
+    assert result.n_blocks > 1
+    np.testing.assert_array_equal(result.job_resume_rows, expected_rows)
+    np.testing.assert_array_equal(result.job_scores, np.take_along_axis(scores, expected_rows, axis=0))
+
+
+def test_blocked_pairs_above_matches_exhaustive_scoring(corpus):
+    resumes, jobs = corpus
+    _, _, scores = exhaustive_top_k(resumes, jobs, 1)
+
+    rows, columns, pair_scores = blocked_pairs_above(resumes, jobs, 0.3, memory_budget_mb=0.0001)
+
+    expected_rows, expected_columns = np.nonzero(scores >= 0.3)
+    np.testing.assert_array_equal(rows, expected_rows)
+    np.testing.assert_array_equal(columns, expected_columns)
+    np.testing.assert_allclose(pair_scores, scores[expected_rows, expected_columns], rtol=1e-12)
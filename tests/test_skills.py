@@ -0,0 +1,47 @@
+from src.components.skills import SkillMatcherConfig, load_skill_matcher
+
+
+def test_ordinary_words_are_not_reported_as_missing_skills():
+    matcher = load_skill_matcher(SkillMatcherConfig().taxonomy_file_path)
+    jd_text = (
+        "Please send your CV to our R&D team. Vitamin C perks, a swift hiring process "
+        "and a visit to the power transformers plant every 3 ts."
+    )
+
+    coverage = matcher.coverage("I know python", jd_text)
+
+    assert coverage["missing_skills"] == []
+    assert coverage["skill_coverage"] is None
+
+
+def test_ambiguous_skills_still_match_by_alias():
+    matcher = load_skill_matcher(SkillMatcherConfig().taxonomy_file_path)
+    jd_text = "Python and C programming, statistics in R programming, Hugging Face models"
+
+    coverage = matcher.coverage("Python, ANSI C, RStudio", jd_text)
+
+    assert coverage["matched_skills"] == ["Python", "C", "R"]
+    assert coverage["missing_skills"] == ["Statistics", "Hugging Face"]
+
+
+def test_common_words_and_abbreviations_are_not_skills():
+    matcher = load_skill_matcher(SkillMatcherConfig().taxonomy_file_path)
+    jd_text = (
+        "Dose 5 ml twice a day; see the dl list. Include js in the subject line. "
+        "Spark new ideas, rust-proof the ruby-red flask in the lab, snowflake decorations, "
+        "free Java coffee. React quickly, carry the torch and enjoy a restful weekend."
+    )
+
+    assert matcher.match(jd_text) == []
+
+
+def test_ambiguous_tech_skills_match_by_unambiguous_aliases():
+    matcher = load_skill_matcher(SkillMatcherConfig().taxonomy_file_path)
+    jd_text = (
+        "Machine learning with PySpark and Spark SQL on Snowflake SQL; services in "
+        "core Java, Ruby on Rails, Rust programming and a Python Flask API; UI in React.js."
+    )
+
+    assert matcher.match(jd_text) == [
+        "Machine Learning", "Spark", "SQL", "Snowflake", "Java", "Ruby", "Rust", "Python", "Flask", "React"
+    ]